@@ -78,6 +78,12 @@ let s:RESOLVE_UP_FRONT = 1
 let s:RESOLVE_ON_DEMAND = 2
 let s:resolve_completions = s:RESOLVE_NONE
 
+" Lines changed in the buffers whose identifiers are collected in Vim, by
+" buffer number. When there are more than s:max_line_changes changes, they are
+" no longer recorded and the buffer is read again.
+let s:line_changes = {}
+let s:max_line_changes = 1000
+
 function! s:StartMessagePoll()
   if s:pollers.receive_messages.id < 0
     let s:pollers.receive_messages.id = timer_start(
@@ -189,8 +195,23 @@ function! youcompleteme#Enable()
     autocmd CompleteDone * call s:OnCompleteDone()
     autocmd CompleteChanged * call s:OnCompleteChanged()
     autocmd BufEnter,WinEnter * call s:UpdateMatches()
+    if exists( '##WinScrolled' )
+      autocmd WinScrolled * call s:OnWinScrolled()
+    endif
+    autocmd VimResized * call s:OnVimResized()
+    " BufNew and not BufAdd: unlisted buffers, e.g. created by bufadd(), don't
+    " trigger BufAdd.
+    autocmd BufNew,BufWipeout,BufFilePost,DirChanged *
+          \ call s:OnBufferNamesChanged()
   augroup END
 
+  " Identifiers can be completed in the first loaded file while the server is
+  " starting.
+  if s:AllowedToCompleteInCurrentBuffer()
+    call s:SetUpCompleteopt()
+    call s:EnableCompletingInCurrentBuffer()
+  endif
+
   " The FileType event is not triggered for the first loaded file. We wait until
   " the server is ready to manually run the s:OnFileTypeSet function.
   let s:pollers.server_ready.id = timer_start(
@@ -208,6 +229,18 @@ function! youcompleteme#Enable()
           \   'combine':   1,
           \   'priority':  50,
           \ } )
+
+    " Diagnostic highlights. Errors have a higher priority so that they are
+    " displayed over warnings.
+    for [ prop_type, priority ] in [ [ 'YcmWarningSection', 0 ],
+                                   \ [ 'YcmErrorSection', 1 ] ]
+      call prop_type_delete( prop_type )
+      call prop_type_add( prop_type, {
+            \   'highlight': prop_type,
+            \   'combine':   1,
+            \   'priority':  priority,
+            \ } )
+    endfor
   endif
 endfunction
 
@@ -239,6 +272,45 @@ function! youcompleteme#GetWarningCount()
 endfunction
 
 
+function! youcompleteme#GetDiagnosticCounts()
+  return py3eval( 'ycm_state.GetDiagnosticCounts()' )
+endfunction
+
+
+function! youcompleteme#TrackLineChanges( bufnr )
+  let s:line_changes[ a:bufnr ] = []
+  return listener_add( function( 's:OnLinesChanged' ), a:bufnr )
+endfunction
+
+
+function! youcompleteme#PopLineChanges( bufnr )
+  call listener_flush( a:bufnr )
+  let changes = get( s:line_changes, a:bufnr, 0 )
+  let s:line_changes[ a:bufnr ] = []
+  return changes
+endfunction
+
+
+function! youcompleteme#StopTrackingLineChanges( bufnr, listener_id )
+  call listener_remove( a:listener_id )
+  silent! unlet s:line_changes[ a:bufnr ]
+endfunction
+
+
+function! s:OnLinesChanged( bufnr, start, end, added, changes )
+  let line_changes = get( s:line_changes, a:bufnr, 0 )
+  if type( line_changes ) != v:t_list
+    return
+  endif
+  if len( line_changes ) + len( a:changes ) > s:max_line_changes
+    let s:line_changes[ a:bufnr ] = 0
+    return
+  endif
+  call extend( line_changes, map( copy( a:changes ),
+        \ '[ v:val.lnum, v:val.end, v:val.added ]' ) )
+endfunction
+
+
 function! s:SetUpPython() abort
   py3 << EOF
 import os.path as p
@@ -691,6 +763,11 @@ function! s:OnBufferEnter()
 endfunction
 
 
+function! s:OnBufferNamesChanged()
+  py3 vimsupport.ClearBufferNumberCache()
+endfunction
+
+
 function! s:OnBufferUnload()
   " Expanding <abuf> returns the unloaded buffer number as a string but we want
   " it as a true number for the getbufvar function.
@@ -708,6 +785,16 @@ function! s:UpdateMatches()
 endfunction
 
 
+function! s:OnWinScrolled()
+  py3 ycm_state.OnWinScrolled()
+endfunction
+
+
+function! s:OnVimResized()
+  py3 ycm_state.OnVimResized()
+endfunction
+
+
 function! s:PollServerReady( timer_id )
   if !py3eval( 'ycm_state.IsServerAlive()' )
     py3 ycm_state.NotifyUserIfServerCrashed()
@@ -971,7 +1058,8 @@ function! s:RequestCompletion()
   py3 ycm_state.SendCompletionRequest(
         \ vimsupport.GetBoolValue( 's:force_semantic' ) )
 
-  if py3eval( 'ycm_state.CompletionRequestReady()' )
+  if py3eval( 'ycm_state.CompletionRequestReady() or '
+            \ 'ycm_state.CompletionRequestDeferred()' )
     " We can't call complete() syncrhounsouly in the TextChangedI/TextChangedP
     " autocommmands (it's designed to be used async only completion). The result
     " (somewhat oddly) is that the completion menu is shown, but ctrl-n doesn't
@@ -998,7 +1086,8 @@ function! s:RequestSemanticCompletion()
     call s:StopPoller( s:pollers.completion )
     py3 ycm_state.SendCompletionRequest( True )
 
-    if py3eval( 'ycm_state.CompletionRequestReady()' )
+    if py3eval( 'ycm_state.CompletionRequestReady() or '
+              \ 'ycm_state.CompletionRequestDeferred()' )
       " We can't call complete() syncrhounsouly in the TextChangedI/TextChangedP
       " autocommmands (it's designed to be used async only completion). The
       " result (somewhat oddly) is that the completion menu is shown, but ctrl-n
@@ -1022,6 +1111,11 @@ endfunction
 
 
 function! s:PollCompletion( ... )
+  " Slow omnifuncs are only run once we are back in the main loop so that the
+  " keystroke that triggered them is not held up. A new keystroke stops this
+  " poller before the omnifunc is called.
+  py3 ycm_state.RunDeferredCompletionRequest()
+
   if !py3eval( 'ycm_state.CompletionRequestReady()' )
     let s:pollers.completion.id = timer_start(
           \ s:pollers.completion.wait_milliseconds,
@@ -1148,6 +1242,37 @@ function! s:UpdateSignatureHelp()
 endfunction
 
 
+" Create the signature help popup if |win_id| is 0 or update it. Arguments that
+" are v:null did not change since the last update.
+function! youcompleteme#UpdateSignatureHelpPopup(
+      \ win_id, lines, options, syntax, cursor_line )
+  let win_id = a:win_id
+  if win_id == 0
+    let win_id = popup_create( a:lines, a:options )
+  else
+    if a:lines isnot v:null
+      call popup_settext( win_id, a:lines )
+    endif
+    if a:options isnot v:null
+      call popup_move( win_id, a:options )
+    endif
+  endif
+  call popup_show( win_id )
+
+  let commands = []
+  if a:syntax isnot v:null
+    call add( commands, 'set syntax=' . a:syntax . ' cursorline' )
+  endif
+  if a:cursor_line isnot v:null
+    call add( commands, 'call cursor( [ ' . a:cursor_line . ', 1 ] )' )
+  endif
+  if !empty( commands )
+    call win_execute( win_id, join( commands, ' | ' ) )
+  endif
+  return win_id
+endfunction
+
+
 function! s:ClearSignatureHelp()
   if !s:ShouldUseSignatureHelp()
     return
@@ -1178,6 +1303,8 @@ function! s:SetUpCommands()
         \                                      <line2>,
         \                                      <f-args>)
   command! YcmDiags call s:ShowDiagnostics()
+  command! -nargs=? -complete=custom,youcompleteme#DiagnosticKindsComplete
+        \ YcmProjectDiags call s:ShowProjectDiagnostics( <q-args> )
   command! YcmShowDetailedDiagnostic call s:ShowDetailedDiagnostic()
   command! YcmForceCompileAndDiagnostics call s:ForceCompileAndDiagnostics()
 endfunction
@@ -1322,6 +1449,16 @@ function! s:ShowDiagnostics()
 endfunction
 
 
+function! s:ShowProjectDiagnostics( kind )
+  py3 ycm_state.ShowProjectDiagnostics( vim.eval( 'a:kind' ) )
+endfunction
+
+
+function! youcompleteme#DiagnosticKindsComplete( arglead, cmdline, cursorpos )
+  return "error\nwarning"
+endfunction
+
+
 function! s:ShowDetailedDiagnostic()
   py3 ycm_state.ShowDetailedDiagnostic()
 endfunction
@@ -1335,8 +1472,11 @@ endfunction
 if exists( '*popup_atcursor' )
   function s:Hover()
     if !py3eval( 'ycm_state.NativeFiletypeCompletionUsable()' )
-      " Cancel the autocommand if it happens to have been set
-      call s:DisableAutoHover()
+      " Cancel the autocommand if it happens to have been set, unless the
+      " server has yet to say if it has a semantic completer.
+      if !py3eval( 'ycm_state.NativeFiletypeCompletionPending()' )
+        call s:DisableAutoHover()
+      endif
       return
     endif
 
@@ -129,6 +129,15 @@ let g:ycm_key_detailed_diagnostics =
 let g:ycm_cache_omnifunc =
       \ get( g:, 'ycm_cache_omnifunc', 1 )
 
+let g:ycm_omnifunc_time_budget_ms =
+      \ get( g:, 'ycm_omnifunc_time_budget_ms', 100 )
+
+let g:ycm_cache_server_capabilities =
+      \ get( g:, 'ycm_cache_server_capabilities', 1 )
+
+let g:ycm_cache_syntax_keywords =
+      \ get( g:, 'ycm_cache_syntax_keywords', 1 )
+
 let g:ycm_log_level =
       \ get( g:, 'ycm_log_level',
       \ get( g:, 'ycm_server_log_level', 'info' ) )
@@ -155,6 +164,9 @@ let g:ycm_enable_diagnostic_highlighting =
       \ get( g:, 'ycm_enable_diagnostic_highlighting',
       \ get( g:, 'syntastic_enable_highlighting', 1 ) )
 
+let g:ycm_viewport_diagnostics_threshold =
+      \ get( g:, 'ycm_viewport_diagnostics_threshold', 1000 )
+
 let g:ycm_echo_current_diagnostic =
       \ get( g:, 'ycm_echo_current_diagnostic',
       \ get( g:, 'syntastic_echo_current_error', 1 ) )
@@ -109,6 +109,14 @@ class Buffer:
     self._diag_interface.OnCursorMoved()
 
 
+  def OnWinScrolled( self ):
+    self._diag_interface.OnWinScrolled()
+
+
+  def OnVimResized( self ):
+    self._diag_interface.OnVimResized()
+
+
   def GetErrorCount( self ):
     return self._diag_interface.GetErrorCount()
 
@@ -117,8 +125,13 @@ class Buffer:
     return self._diag_interface.GetWarningCount()
 
 
+  def GetDiagnosticCounts( self ):
+    return self._diag_interface.GetDiagnosticCounts()
+
+
   def UpdateFromFileTypes( self, filetypes ):
     self._filetypes = filetypes
+    self._diag_interface.UpdateFromFileTypes( filetypes )
     self._async_diags = not any( x in DIAGNOSTIC_UI_FILETYPES
       for x in filetypes )
 
@@ -0,0 +1,115 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+
+# A character starts a word if it is the first one of the text, an uppercase
+# letter following a lowercase one or an alphanumeric character following a
+# non-alphanumeric one (e.g. an underscore).
+WORD_BOUNDARY_REGEX = re.compile( r'^.|(?<=[a-z])[A-Z]|(?<=[\W_])[^\W_]' )
+
+
+def FilterAndSortCandidates( candidates, sort_property, query,
+                             max_candidates = 0 ):
+  """Filter and sort |candidates| the way ycmd's filter_and_sort_candidates
+  handler does, without leaving Vim. Candidates are strings or dictionaries
+  whose |sort_property| key is the text to match against |query|.
+
+  A candidate matches if the characters of the query appear in order in its
+  text. Lowercase query characters match both cases, uppercase ones only
+  themselves. Matches are ranked by, in order:
+   - the first character of the text being matched;
+   - all the query characters matching word boundaries, then the ratio of the
+     word boundary characters of the text that are matched;
+   - the sum of the indexes of the matched characters (earlier is better);
+   - the length of the text (shorter is better);
+   - the text being lowercase;
+   - the text itself.
+
+  Candidates with an empty text are skipped. If the query is empty, the other
+  candidates are returned in their original order. At most |max_candidates|
+  candidates are returned, all of them if it is 0."""
+  if not query:
+    return _Truncate( [ candidate for candidate in candidates
+                        if ( candidate[ sort_property ] if sort_property else
+                             candidate ) ],
+                      max_candidates )
+
+  query_chars = _QueryChars( query )
+  ranked = []
+  for index, candidate in enumerate( candidates ):
+    text = candidate[ sort_property ] if sort_property else candidate
+    positions = _MatchPositions( text, query_chars )
+    if positions:
+      ranked.append( ( _MatchKey( text, positions ), index, candidate ) )
+
+  ranked.sort( key = lambda item: item[ : 2 ] )
+  return _Truncate( [ candidate for _, _, candidate in ranked ],
+                    max_candidates )
+
+
+def _QueryChars( query ):
+  """Return the characters of |query| with the other character they match, if
+  any: the uppercase version of lowercase characters."""
+  query_chars = []
+  for char in query:
+    upper = char.upper() if char.islower() else None
+    query_chars.append( ( char, upper if upper and len( upper ) == 1 else
+                                None ) )
+  return query_chars
+
+
+def _MatchPositions( text, query_chars ):
+  """Return the positions of the first characters of |text| matching the query
+  characters in order, or None if they don't all match. The text is scanned
+  once, so this is linear in its length."""
+  positions = []
+  start = 0
+  for char, upper in query_chars:
+    position = text.find( char, start )
+    if upper is not None:
+      upper_position = text.find( upper, start,
+                                  position if position >= 0 else len( text ) )
+      if upper_position >= 0:
+        position = upper_position
+    if position < 0:
+      return None
+    positions.append( position )
+    start = position + 1
+  return positions
+
+
+def _MatchKey( text, positions ):
+  word_boundaries = { boundary.start()
+                      for boundary in WORD_BOUNDARY_REGEX.finditer( text ) }
+  matched_word_boundaries = sum( 1 for position in positions
+                                 if position in word_boundaries )
+  all_word_boundaries = matched_word_boundaries == len( positions )
+  return ( positions[ 0 ] != 0,
+           not all_word_boundaries,
+           -matched_word_boundaries / len( word_boundaries )
+             if all_word_boundaries else 0,
+           sum( positions ),
+           len( text ),
+           not text.islower(),
+           text )
+
+
+def _Truncate( candidates, max_candidates ):
+  if max_candidates > 0:
+    return candidates[ : max_candidates ]
+  return candidates
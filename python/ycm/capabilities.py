@@ -0,0 +1,185 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import logging
+import os
+import time
+from ycm import paths
+
+_logger = logging.getLogger( __name__ )
+
+# Whether the server has a semantic completer for the filetype. It answers True
+# or False.
+SEMANTIC_COMPLETION = 'semantic_completion'
+# Whether the server supports signature help for the filetype. It answers
+# 'YES', 'NO' or 'PENDING' while it doesn't know yet.
+SIGNATURE_HELP = 'signature_help'
+
+# States of a capability for a filetype:
+#  - UNKNOWN: not requested yet or the request failed;
+#  - PENDING: requested, waiting for the answer of the server;
+#  - YES, NO: the answer of the server.
+UNKNOWN = 'UNKNOWN'
+PENDING = 'PENDING'
+YES = 'YES'
+NO = 'NO'
+
+# Capabilities that couldn't be requested are not requested again for this
+# many seconds.
+RETRY_FAILED_AFTER = 10
+
+CAPABILITIES_FILE = paths.PathToCacheFile( 'capabilities.json' )
+
+
+class CapabilityCache:
+  """Capabilities of the server by filetype. Each one goes through the UNKNOWN,
+  PENDING and YES or NO states as it is requested in the background and
+  answered by the server. The answers are kept for the lifetime of the server.
+  Failed requests go back to UNKNOWN and are not sent again for
+  RETRY_FAILED_AFTER seconds.
+
+  If |path| is set, the answers are also saved to this file with |server_key|.
+  When the key matches, the saved answers are used until the server answers,
+  so that semantic completion is available as soon as Vim starts."""
+
+  def __init__( self, path = None, server_key = None ):
+    self._states = {}
+    self._failures = {}
+    self._path = path
+    self._server_key = server_key
+    self._saved_states = self._Load()
+
+
+  def State( self, capability, filetype ):
+    return self._states.get( ( capability, filetype ), UNKNOWN )
+
+
+  def Available( self, capability, filetype ):
+    """Whether the server has |capability| for |filetype|, according to the
+    saved answer until it answers."""
+    state = self._states.get( ( capability, filetype ) )
+    if state is None or state == PENDING:
+      state = self._saved_states.get( capability, {} ).get( filetype )
+    return state == YES
+
+
+  def Failed( self, capability, filetype ):
+    """Whether requesting |capability| for |filetype| failed recently."""
+    failure_time = self._failures.get( ( capability, filetype ) )
+    return ( failure_time is not None and
+             time.monotonic() - failure_time < RETRY_FAILED_AFTER )
+
+
+  def Poll( self, capability, filetype, requests ):
+    """Advance the state of |capability| for |filetype| and return it.
+    |requests| maps filetypes to the requests for |capability|; it creates and
+    starts them for missing filetypes."""
+    key = ( capability, filetype )
+    state = self._states.get( key, UNKNOWN )
+    if state == UNKNOWN:
+      if self.Failed( capability, filetype ):
+        return UNKNOWN
+      # Missing requests are sent when looked up.
+      requests[ filetype ]
+      state = self._states[ key ] = PENDING
+
+    if state == PENDING:
+      request = requests[ filetype ]
+      if request.Done():
+        state = self._OnResponse( capability, filetype, request, requests )
+    return state
+
+
+  def _OnResponse( self, capability, filetype, request, requests ):
+    key = ( capability, filetype )
+    response = request.Response()
+    if response is None:
+      # Send a new request once it can be retried.
+      self._failures[ key ] = time.monotonic()
+      del requests[ filetype ]
+      del self._states[ key ]
+      return UNKNOWN
+
+    if response == PENDING:
+      # The server doesn't know yet. Ask again.
+      request.Start( filetype )
+      return PENDING
+
+    self._failures.pop( key, None )
+    state = YES if response is True or response == YES else NO
+    self._states[ key ] = state
+    if self._saved_states.get( capability, {} ).get( filetype ) != state:
+      self._saved_states.setdefault( capability, {} )[ filetype ] = state
+      self._Save()
+    return state
+
+
+  def _Load( self ):
+    if not self._path:
+      return {}
+    try:
+      with open( self._path ) as capabilities_file:
+        saved = json.load( capabilities_file )
+      if saved[ 'server_key' ] == self._server_key:
+        return saved[ 'capabilities' ]
+    except FileNotFoundError:
+      pass
+    except ( OSError, ValueError, KeyError, TypeError ):
+      _logger.exception( 'Error while loading capabilities' )
+    return {}
+
+
+  def _Save( self ):
+    if not self._path:
+      return
+    try:
+      paths.WriteFileAtomically( self._path, json.dumps( {
+        'server_key': self._server_key,
+        'capabilities': self._saved_states } ) )
+    except OSError:
+      _logger.exception( 'Error while saving capabilities' )
+
+
+def ServerKey( user_options ):
+  """Identify the capabilities of the server. They depend on the version of
+  ycmd, on the completers installed, on the global extra conf file and on the
+  language servers configured by the user."""
+  return hashlib.sha1( json.dumps( [
+    _FileContents( os.path.join( paths.DIR_OF_YCMD, 'CORE_VERSION' ) ),
+    # Installing a completer adds it there.
+    _ModificationTime( os.path.join( paths.DIR_OF_YCMD, 'third_party' ) ),
+    user_options.get( 'global_ycm_extra_conf' ),
+    _ModificationTime( user_options.get( 'global_ycm_extra_conf' ) ),
+    user_options.get( 'language_server' )
+  ] ).encode() ).hexdigest()
+
+
+def _FileContents( path ):
+  try:
+    with open( path ) as f:
+      return f.read()
+  except OSError:
+    return None
+
+
+def _ModificationTime( path ):
+  try:
+    return os.path.getmtime( os.path.expanduser( path ) )
+  except ( OSError, TypeError ):
+    return None
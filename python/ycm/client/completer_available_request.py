@@ -18,26 +18,34 @@
 from ycm.client.base_request import BaseRequest, BuildRequestData
 
 
+class CompleterAvailableByFileType( dict ):
+  def __missing__( self, filetype ):
+    request = CompleterAvailableRequest( filetype )
+    request.Start()
+    self[ filetype ] = request
+    return request
+
+
 class CompleterAvailableRequest( BaseRequest ):
   def __init__( self, filetypes ):
     super( CompleterAvailableRequest, self ).__init__()
     self.filetypes = filetypes
-    self._response = None
+    self._response_future = None
 
 
   def Start( self ):
     request_data = BuildRequestData()
     request_data.update( { 'filetypes': self.filetypes } )
-    self._response = self.PostDataToHandler( request_data,
-                                             'semantic_completion_available' )
+    self._response_future = self.PostDataToHandlerAsync(
+      request_data, 'semantic_completion_available' )
 
 
-  def Response( self ):
-    return self._response
+  def Done( self ):
+    return bool( self._response_future ) and self._response_future.done()
 
 
-def SendCompleterAvailableRequest( filetypes ):
-  request = CompleterAvailableRequest( filetypes )
-  # This is a blocking call.
-  request.Start()
-  return request.Response()
+  def Response( self ):
+    if not self._response_future:
+      return None
+    return self.HandleFuture( self._response_future,
+                              display_message = False )
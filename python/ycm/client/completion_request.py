@@ -17,6 +17,7 @@
 
 import json
 import logging
+from collections import defaultdict
 from ycmd.utils import ToUnicode
 from ycm.client.base_request import ( BaseRequest,
                                       DisplayServerException,
@@ -33,6 +34,11 @@ class CompletionRequest( BaseRequest ):
     self.request_data = request_data
     self._response_future = None
     self._complete_done_item = None # complete_done item cache
+    # The raw response, its conversion to Vim completion items and the index
+    # used to match v:completed_item are computed at most once per request.
+    self._raw_response = None
+    self._vim_completions = None
+    self._completion_index = None
 
 
   def Start( self ):
@@ -57,9 +63,13 @@ class CompletionRequest( BaseRequest ):
     if not self._response_future:
       return NO_COMPLETIONS
 
+    if self._raw_response is not None:
+      return self._raw_response
+
     response = self.HandleFuture( self._response_future,
                                   truncate_message = True )
     if not response:
+      self._raw_response = NO_COMPLETIONS
       return NO_COMPLETIONS
 
     # Vim may not be able to convert the 'errors' entry to its internal format
@@ -72,13 +82,31 @@ class CompletionRequest( BaseRequest ):
 
     response[ 'line' ] = self.request_data[ 'line_num' ]
     response[ 'column' ] = self.request_data[ 'column_num' ]
+    self._raw_response = response
     return response
 
 
+  def _VimCompletions( self ):
+    if self._vim_completions is None:
+      self._vim_completions = _ConvertCompletionDatasToVimDatas(
+          self._RawResponse()[ 'completions' ] )
+    return self._vim_completions
+
+
+  def _CompletionIndex( self ):
+    if self._completion_index is None:
+      self._completion_index = _BuildCompletionIndex(
+          self._RawResponse()[ 'completions' ],
+          self._VimCompletions() )
+    return self._completion_index
+
+
   def Response( self ):
-    response = self._RawResponse()
-    response[ 'completions' ] = _ConvertCompletionDatasToVimDatas(
-        response[ 'completions' ] )
+    response = dict( self._RawResponse() )
+    # The items are copied because callers are free to modify them (e.g. to
+    # number the abbr) while the cached ones back the completed item index.
+    response[ 'completions' ] = [ dict( item )
+                                  for item in self._VimCompletions() ]
     # FIXME: Do we really need to do this AdjustCandidateInsertionText ? I feel
     # like Vim should do that for us
     response[ 'completions' ] = base.AdjustCandidateInsertionText(
@@ -113,7 +141,9 @@ class CompletionRequest( BaseRequest ):
     # multiple possibilities, which is essentially unresolvable.
     if 'user_data' not in completed_item:
       completions = self._RawResponse()[ 'completions' ]
-      return _FilterToMatchingCompletions( completed_item, completions )
+      return _FilterToMatchingCompletions( completed_item,
+                                           completions,
+                                           self._CompletionIndex() )
 
     if completed_item[ 'user_data' ]:
       return [ json.loads( completed_item[ 'user_data' ] ) ]
@@ -168,20 +198,29 @@ def _GetFixItCompletion( extra_data ):
   return extra_data.get( 'fixits' )
 
 
-def _FilterToMatchingCompletions( completed_item, completions ):
-  """Filter to completions matching the item Vim said was completed"""
-  match_keys = [ 'word', 'abbr', 'menu', 'info' ]
-  matched_completions = []
-  for completion in completions:
-    item = ConvertCompletionDataToVimData( completion )
+def _CompletionMatchKey( item ):
+  return tuple( ToUnicode( item.get( key, "" ) )
+                for key in ( 'word', 'abbr', 'menu', 'info' ) )
+
+
+def _BuildCompletionIndex( completions, vim_completions ):
+  """Map the match key of each Vim completion item to the extra data of the
+  completions producing it, in order."""
+  index = defaultdict( list )
+  for completion, item in zip( completions, vim_completions ):
+    index[ _CompletionMatchKey( item ) ].append(
+      completion.get( 'extra_data', {} ) )
+  return index
 
-    def matcher( key ):
-      return ( ToUnicode( completed_item.get( key, "" ) ) ==
-               ToUnicode( item.get( key, "" ) ) )
 
-    if all( matcher( i ) for i in match_keys ):
-      matched_completions.append( completion.get( 'extra_data', {} ) )
-  return matched_completions
+def _FilterToMatchingCompletions( completed_item, completions, index = None ):
+  """Filter to completions matching the item Vim said was completed. |index|
+  is the result of _BuildCompletionIndex for |completions|; it is built if not
+  given."""
+  if index is None:
+    index = _BuildCompletionIndex(
+      completions, _ConvertCompletionDatasToVimDatas( completions ) )
+  return list( index.get( _CompletionMatchKey( completed_item ), [] ) )
 
 
 def _GetCompletionInfoField( completion_data ):
@@ -19,17 +19,26 @@ from ycm.client.completion_request import CompletionRequest
 
 
 class OmniCompletionRequest( CompletionRequest ):
-  def __init__( self, omni_completer, request_data ):
+  def __init__( self, omni_completer, request_data, deferred = False ):
     super( OmniCompletionRequest, self ).__init__( request_data )
     self._omni_completer = omni_completer
+    self._deferred = deferred
+    self._results = None
 
 
   def Start( self ):
+    # A deferred request is run later by calling Run, once Vim has had a chance
+    # to process the keystroke that triggered it.
+    if not self._deferred:
+      self.Run()
+
+
+  def Run( self ):
     self._results = self._omni_completer.ComputeCandidates( self.request_data )
 
 
   def Done( self ):
-    return True
+    return self._results is not None
 
   def Wait( self , timeout = None):
       return True
@@ -22,20 +22,48 @@ from ycm.client.completion_request import ConvertCompletionDataToVimData
 
 import logging
 import json
+import time
+from collections import OrderedDict
 _logger = logging.getLogger( __name__ )
 
 
+# Number of completion items resolved on each side of the selected one. They
+# are resolved along with it so that moving through the completion menu finds
+# their details already there.
+RESOLVE_AROUND_SELECTION = 5
+
+
 class ResolveCompletionRequest( BaseRequest ):
-  def __init__( self, request_data ):
+  """Resolve the items of |resolves|, a list of ( cache key, resolve data )
+  pairs whose first one is the selected item. The requests for the items not
+  already in |cache| are all sent at once by |resolver|, a function taking the
+  request data and returning a future of the response. By default, it posts
+  the request data to the resolve_completion handler of the server."""
+
+  def __init__( self, request_data, resolves, cache, resolver = None ):
     super().__init__()
     self.request_data = request_data
+    self._resolves = resolves
+    self._cache = cache
+    self._resolver = resolver or self._PostToServer
+    self._key = None
+    self._resolved = None
+    self._response = None
+
 
   def Start( self ):
-    self._response_future = self.PostDataToHandlerAsync( self.request_data,
-                                                         'resolve_completion' )
+    for key, resolve in self._resolves:
+      resolved = self._cache.Get( key )
+      if resolved is None:
+        resolved = self._cache.Add( key, self._resolver(
+          dict( self.request_data, resolve = resolve ) ) )
+      if self._resolved is None:
+        self._key = key
+        self._resolved = resolved
+
 
   def Done( self ):
-    return bool( self._response_future ) and self._response_future.done()
+    return bool( self._resolved ) and self._resolved.future.done()
 
 
   def OnCompleteDone( self ):
@@ -46,7 +74,25 @@ class ResolveCompletionRequest( BaseRequest ):
 
 
   def Response( self ):
-    response = self.HandleFuture( self._response_future,
+    if self._response is None:
+      self._response = self._resolved.response
+    if self._response is None:
+      self._response = self._HandleResponse( self._resolved.future )
+      if self._response[ 'completion' ]:
+        self._resolved.response = self._response
+      else:
+        # Failed and empty resolves are not kept; the item is resolved again
+        # the next time it is selected.
+        self._cache.Drop( self._key, self._resolved )
+    return self._response
+
+
+  def _PostToServer( self, request_data ):
+    return self.PostDataToHandlerAsync( request_data, 'resolve_completion' )
+
+
+  def _HandleResponse( self, future ):
+    response = self.HandleFuture( future,
                                   truncate_message = True,
                                   display_message = True )
 
@@ -66,27 +112,147 @@ class ResolveCompletionRequest( BaseRequest ):
     return response
 
 
-def ResolveCompletionItem( completion_request, item ):
+class ResolvedCompletions:
+  """Resolve requests sent for completion items, by item. Successful responses
+  are kept across completion requests so that an item completed again shows
+  its details immediately. At most |max_entries| items are kept, the least
+  recently selected ones being dropped first, and each of them for at most
+  |ttl| seconds."""
+
+  MAX_ENTRIES = 256
+  TTL = 30 * 60
+
+  def __init__( self, max_entries = MAX_ENTRIES, ttl = TTL ):
+    self._entries = OrderedDict()
+    self._max_entries = max_entries
+    self._ttl = ttl
+
+
+  def Get( self, key ):
+    entry = self._entries.get( key )
+    if entry is None:
+      return None
+    if time.monotonic() - entry.time > self._ttl:
+      del self._entries[ key ]
+      return None
+    self._entries.move_to_end( key )
+    return entry
+
+
+  def Add( self, key, future ):
+    entry = ResolvedCompletion( future )
+    self._entries[ key ] = entry
+    self._entries.move_to_end( key )
+    while len( self._entries ) > self._max_entries:
+      self._entries.popitem( last = False )
+    return entry
+
+
+  def Drop( self, key, entry ):
+    """Forget |entry| if it is still the one of |key|."""
+    if self._entries.get( key ) is entry:
+      del self._entries[ key ]
+
+
+  def DropPending( self ):
+    """Forget the requests that are still in flight. Resolve data are only
+    valid for the completion request that returned them and the server may
+    handle these requests after the next one."""
+    for key in [ key for key, entry in self._entries.items()
+                 if not entry.future.done() ]:
+      del self._entries[ key ]
+
+
+  def Clear( self ):
+    self._entries.clear()
+
+
+  def __len__( self ):
+    return len( self._entries )
+
+
+class ResolvedCompletion:
+  __slots__ = ( 'future', 'response', 'time' )
+
+  def __init__( self, future ):
+    self.future = future
+    self.response = None
+    self.time = time.monotonic()
+
+
+def ResolveCompletionItem( completion_request,
+                           item,
+                           completions,
+                           cache,
+                           resolver = None ):
+  """Resolve |item|, the selected item of the completion menu, along with the
+  items around it in |completions|, the items of the menu. Return the request
+  for |item| or None if it can't be resolved."""
   if not completion_request.Done():
     return None
+
+  resolve = _ResolveData( item )
+  if resolve is None:
+    return None
+
+  request_data = completion_request.request_data
+  scope = _ResolveScope( request_data )
+  resolves = [ ( _ResolveKey( scope, item, resolve ), resolve ) ]
+  for other_item in _ItemsAroundSelection( item, completions ):
+    other_resolve = _ResolveData( other_item )
+    if other_resolve is not None:
+      resolves.append( ( _ResolveKey( scope, other_item, other_resolve ),
+                         other_resolve ) )
+
+  resolve_request = ResolveCompletionRequest( request_data,
+                                              resolves,
+                                              cache,
+                                              resolver )
+  resolve_request.Start()
+  return resolve_request
+
+
+def _ResolveData( item ):
   try:
-    completion_extra_data = json.loads( item[ 'user_data' ] )
+    return json.loads( item[ 'user_data' ] )[ 'resolve' ]
   except KeyError:
     return None
   except ( TypeError, json.JSONDecodeError ):
     # Can happen with the omni completer
     return None
 
-  request_data = completion_request.request_data
-  try:
-    # Note: We mutate the request_data inside the original completion request
-    # and pass it into the new request object. this is just a big efficiency
-    # saving. The request_data for a Done() request is almost certainly no
-    # longer needed.
-    request_data[ 'resolve' ] = completion_extra_data[ 'resolve' ]
-  except KeyError:
-    return None
 
-  resolve_request = ResolveCompletionRequest( request_data )
-  resolve_request.Start()
-  return resolve_request
+def _ResolveScope( request_data ):
+  filepath = request_data[ 'filepath' ]
+  filetypes = request_data[ 'file_data' ][ filepath ][ 'filetypes' ]
+  return ( filetypes[ 0 ],
+           request_data.get( 'completer_target', 'filetype_default' ) )
+
+
+def _ResolveKey( scope, item, resolve ):
+  # Resolve data may be reused by the server for other items in later
+  # completion requests (e.g. it is the index of the item for LSP completers)
+  # so the item itself is part of the key.
+  return ( scope,
+           json.dumps( resolve, sort_keys = True ),
+           item[ 'word' ],
+           item.get( 'menu', '' ),
+           item.get( 'kind', '' ) )
+
+
+def _ItemsAroundSelection( item, completions ):
+  user_data = item[ 'user_data' ]
+  for index, completion in enumerate( completions ):
+    if completion.get( 'user_data' ) == user_data:
+      break
+  else:
+    return []
+
+  # Closest items first.
+  items = []
+  for distance in range( 1, RESOLVE_AROUND_SELECTION + 1 ):
+    if index + distance < len( completions ):
+      items.append( completions[ index + distance ] )
+    if index - distance >= 0:
+      items.append( completions[ index - distance ] )
+  return items
@@ -69,6 +69,23 @@ class SignatureHelpRequest( BaseRequest ):
     return response.get( 'signature_help' ) or {}
 
 
+class TrackedSignatureHelpRequest( BaseRequest ):
+  """Signature help computed in Vim from the last response of the server. See
+  signature_help.ActiveParameterTracker."""
+
+  def __init__( self, signature_info ):
+    super( TrackedSignatureHelpRequest, self ).__init__()
+    self._signature_info = signature_info
+
+
+  def Reset( self ):
+    self._signature_info = {}
+
+
+  def Response( self ):
+    return self._signature_info
+
+
 class SignatureHelpAvailableRequest( BaseRequest ):
   def __init__( self, filetype ):
     super( SignatureHelpAvailableRequest, self ).__init__()
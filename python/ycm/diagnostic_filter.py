@@ -19,13 +19,33 @@ import re
 
 
 class DiagnosticFilter:
-  def __init__( self, config_or_filters ):
-    self._filters : list = config_or_filters
+  """Reject the diagnostics whose text matches one of |regexes| (ignoring case)
+  or whose kind is one of |levels| ('error' or 'warning'). The regexes are
+  combined into a single pattern so that a diagnostic is filtered in a single
+  pass, whatever the number of filters."""
+
+  def __init__( self, regexes = (), levels = () ):
+    self._words_pattern, self._patterns = _CombineRegexes( regexes )
+    self._rejected_kinds = frozenset( level.upper() for level in levels )
 
 
   def IsAllowed( self, diagnostic ):
-    return not any( filterMatches( diagnostic )
-                    for filterMatches in self._filters )
+    if self._rejected_kinds and diagnostic[ 'kind' ] in self._rejected_kinds:
+      return False
+    text = diagnostic[ 'text' ]
+    if self._words_pattern and self._words_pattern.search( text.lower() ):
+      return False
+    return not any( pattern.search( text ) for pattern in self._patterns )
+
+
+  def Filter( self, diagnostics ):
+    """Return the list of allowed |diagnostics|."""
+    if ( not self._words_pattern and
+         not self._patterns and
+         not self._rejected_kinds ):
+      return list( diagnostics )
+    return [ diagnostic for diagnostic in diagnostics
+             if self.IsAllowed( diagnostic ) ]
 
 
   @staticmethod
@@ -56,12 +76,12 @@ class _MasterDiagnosticFilter:
 
     # build a new DiagnosticFilter merging all filters
     #  for the provided filetypes
-    spec = []
+    spec = { 'regex': [], 'level': [] }
     for filetype in filetypes:
-      type_specific = self._all_filters.get( filetype, [] )
-      spec.extend( type_specific )
+      for filter_type, values in self._all_filters.get( filetype, {} ).items():
+        spec[ filter_type ].extend( values )
 
-    new_filter = DiagnosticFilter( spec )
+    new_filter = DiagnosticFilter( spec[ 'regex' ], spec[ 'level' ] )
     self._cache[ cache_key ] = new_filter
     return new_filter
 
@@ -73,15 +93,6 @@ def _ListOf( config_entry ):
   return [ config_entry ]
 
 
-def CompileRegex( raw_regex ):
-  pattern = re.compile( raw_regex, re.IGNORECASE )
-
-  def FilterRegex( diagnostic ):
-    return pattern.search( diagnostic[ 'text' ] ) is not None
-
-  return FilterRegex
-
-
 def CompileLevel( level ):
   # valid kinds are WARNING and ERROR;
   #  expected input levels are `warning` and `error`
@@ -94,20 +105,56 @@ def CompileLevel( level ):
   return FilterLevel
 
 
-FILTER_COMPILERS = { 'regex' : CompileRegex,
-                     'level' : CompileLevel }
+FILTER_TYPES = [ 'regex', 'level' ]
+
+REGEX_SPECIAL_CHARACTERS = re.compile( r'[.^$*+?{}\[\]\\|()]' )
 
 
 def _CompileFilters( config ):
-  """Given a filter config dictionary, return a list of compiled filters"""
-  filters = []
+  """Given a filter config dictionary, return the lists of values of each
+  filter type"""
+  filters = {}
 
   for filter_type, filter_pattern in config.items():
-    compiler = FILTER_COMPILERS.get( filter_type )
+    if filter_type in FILTER_TYPES:
+      filters[ filter_type ] = _ListOf( filter_pattern )
 
-    if compiler is not None:
-      for filter_config in _ListOf( filter_pattern ):
-        compiledFilter = compiler( filter_config )
-        filters.append( compiledFilter )
+  # Report invalid regexes when reading the options.
+  for regex in filters.get( 'regex', [] ):
+    re.compile( regex )
 
   return filters
+
+
+def _CombineRegexes( regexes ):
+  """Return a pattern searching for any of the |regexes| that are plain words
+  in lowercase text, or None, and the compiled patterns searching for any of
+  the other ones. Searching with re.IGNORECASE is much slower so plain words
+  are searched in lowercase text instead. Regexes with groups can't be
+  combined without changing the meaning of their backreferences and are kept
+  apart."""
+  words = []
+  combinable = []
+  patterns = []
+  for regex in regexes:
+    pattern = re.compile( regex, re.IGNORECASE )
+    if not REGEX_SPECIAL_CHARACTERS.search( regex ):
+      words.append( re.escape( regex.lower() ) )
+    elif pattern.groups:
+      patterns.append( pattern )
+    else:
+      combinable.append( regex )
+
+  words_pattern = re.compile( '|'.join( words ) ) if words else None
+
+  if len( combinable ) == 1:
+    patterns.append( re.compile( combinable[ 0 ], re.IGNORECASE ) )
+  elif combinable:
+    try:
+      patterns.append( re.compile(
+        '|'.join( f'(?:{ regex })' for regex in combinable ), re.IGNORECASE ) )
+    except re.error:
+      # e.g. global flags that are no longer at the start of the pattern.
+      patterns.extend( re.compile( regex, re.IGNORECASE )
+                       for regex in combinable )
+  return words_pattern, patterns
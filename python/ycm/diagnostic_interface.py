@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
 
+import vim
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from ycm import vimsupport
 from ycm.diagnostic_filter import DiagnosticFilter, CompileLevel
@@ -26,10 +28,26 @@ class DiagnosticInterface:
     self._user_options = user_options
     self._diagnostics = []
     self._diag_filter = DiagnosticFilter.CreateFromOptions( user_options )
+    # The filter for the filetypes of the buffer. None until they are known.
+    self._diag_filter_for_buffer = None
     # Line and column numbers are 1-based
     self._line_to_diags = defaultdict( list )
+    # Number of diagnostics in the buffer, by severity.
+    self._counts = { 'error': 0, 'warning': 0 }
+    # Sorted line numbers of the diagnostics.
+    self._diag_lines = []
+    # Ranges of lines whose diagnostics are rendered when there are too many
+    # to render them all, None otherwise.
+    self._rendered_ranges = None
+    # Text echoed for the diagnostics of each line, truncated to the width of
+    # Vim. None until it is computed again.
+    self._echo_text_for_line = None
     self._previous_diag_line_number = -1
     self._diag_message_needs_clearing = False
+    self._properties_need_update = False
+    # Signs placed in the buffer by their key. None until the signs are first
+    # updated.
+    self._placed_signs = None
 
 
   def OnCursorMoved( self ):
@@ -40,12 +58,28 @@ class DiagnosticInterface:
         self._EchoDiagnosticForLine( line )
 
 
+  def OnVimResized( self ):
+    # The text is truncated again on the next echo.
+    self._echo_text_for_line = None
+
+
+  def OnWinScrolled( self ):
+    if self._RenderVisibleLines():
+      self._UpdateMatches()
+
+
   def GetErrorCount( self ):
-    return self._DiagnosticsCount( _DiagnosticIsError )
+    return self._counts[ 'error' ]
 
 
   def GetWarningCount( self ):
-    return self._DiagnosticsCount( _DiagnosticIsWarning )
+    return self._counts[ 'warning' ]
+
+
+  def GetDiagnosticCounts( self ):
+    """Return the number of errors and warnings in the buffer as a dictionary
+    with 'error' and 'warning' keys."""
+    return dict( self._counts )
 
 
   def PopulateLocationList( self ):
@@ -57,25 +91,40 @@ class DiagnosticInterface:
 
   def UpdateWithNewDiagnostics( self, diags ):
     self._diagnostics = [ _NormalizeDiagnostic( x ) for x in
-                            self._ApplyDiagnosticFilter( diags ) ]
+                            self._DiagnosticFilterForBuffer().Filter( diags ) ]
     self._ConvertDiagListToDict()
+    self._properties_need_update = True
+
+    threshold = self._user_options[ 'viewport_diagnostics_threshold' ]
+    self._rendered_ranges = None
+    if ( threshold > 0 and
+         len( self._diagnostics ) > threshold and
+         vimsupport.VimSupportsWinScrolled() ):
+      self._UpdateRenderedRanges()
 
+    self._echo_text_for_line = None
     if self._user_options[ 'echo_current_diagnostic' ]:
+      self._UpdateEchoText()
       self._EchoDiagnostic()
 
     if self._user_options[ 'enable_diagnostic_signs' ]:
       self._UpdateSigns()
 
-    self.UpdateMatches()
+    self._UpdateMatches()
 
     if self._user_options[ 'always_populate_location_list' ]:
       self._UpdateLocationLists()
 
 
-  def _ApplyDiagnosticFilter( self, diags ):
-    filetypes = vimsupport.GetBufferFiletypes( self._bufnr )
-    diag_filter = self._diag_filter.SubsetForTypes( filetypes )
-    return filter( diag_filter.IsAllowed, diags )
+  def UpdateFromFileTypes( self, filetypes ):
+    self._diag_filter_for_buffer = self._diag_filter.SubsetForTypes(
+      filetypes )
+
+
+  def _DiagnosticFilterForBuffer( self ):
+    if self._diag_filter_for_buffer is None:
+      self.UpdateFromFileTypes( vimsupport.GetBufferFiletypes( self._bufnr ) )
+    return self._diag_filter_for_buffer
 
 
   def _EchoDiagnostic( self ):
@@ -87,28 +136,82 @@ class DiagnosticInterface:
   def _EchoDiagnosticForLine( self, line_num ):
     self._previous_diag_line_number = line_num
 
-    diags = self._line_to_diags[ line_num ]
-    if not diags:
+    if self._echo_text_for_line is None:
+      self._UpdateEchoText()
+    text = self._echo_text_for_line.get( line_num )
+    if text is None:
       if self._diag_message_needs_clearing:
         # Clear any previous diag echo
         vimsupport.PostVimMessage( '', warning = False )
         self._diag_message_needs_clearing = False
       return
 
-    first_diag = diags[ 0 ]
-    text = first_diag[ 'text' ]
-    if first_diag.get( 'fixit_available', False ):
-      text += ' (FixIt)'
-
-    vimsupport.PostVimMessage( text, warning = False, truncate = True )
+    vimsupport.EchoTruncatedMessage( text )
     self._diag_message_needs_clearing = True
 
 
-  def _DiagnosticsCount( self, predicate ):
-    count = 0
-    for diags in self._line_to_diags.values():
-      count += sum( 1 for d in diags if predicate( d ) )
-    return count
+  def _UpdateEchoText( self ):
+    width = vimsupport.GetIntValue( '&columns' )
+    self._echo_text_for_line = {}
+    for line_num, diags in self._line_to_diags.items():
+      if not diags:
+        continue
+      first_diag = diags[ 0 ]
+      text = first_diag[ 'text' ]
+      if first_diag.get( 'fixit_available', False ):
+        text += ' (FixIt)'
+      self._echo_text_for_line[ line_num ] = vimsupport.TruncateMessage(
+        text, width )
+
+
+  def _RenderVisibleLines( self ):
+    """Only the diagnostics around the visible lines are rendered. Render those
+    of the lines that are now visible. Return whether the rendered lines
+    changed."""
+    if self._rendered_ranges is None or not self._UpdateRenderedRanges():
+      return False
+
+    if self._user_options[ 'enable_diagnostic_signs' ]:
+      self._UpdateSigns()
+
+    self._properties_need_update = True
+    return True
+
+
+  def _UpdateRenderedRanges( self ):
+    """Render the diagnostics of the lines displayed by the windows of the
+    buffer and of one screen of lines above and below them. Return whether the
+    rendered ranges changed. When no window of the current tab page shows the
+    buffer, the rendered ranges are kept; they are updated when it is entered
+    (see UpdateMatches)."""
+    visible_ranges = vimsupport.GetVisibleLineRanges( self._bufnr )
+    if not visible_ranges:
+      if self._rendered_ranges is None:
+        self._rendered_ranges = []
+        return True
+      return False
+    if self._rendered_ranges is not None and all(
+        any( first >= rendered_first and last <= rendered_last
+             for rendered_first, rendered_last in self._rendered_ranges )
+        for first, last in visible_ranges ):
+      return False
+
+    self._rendered_ranges = [
+      ( max( first - ( last - first + 1 ), 1 ), last + ( last - first + 1 ) )
+      for first, last in visible_ranges ]
+    return True
+
+
+  def _LinesToRender( self ):
+    if self._rendered_ranges is None:
+      return self._diag_lines
+
+    lines = set()
+    for first, last in self._rendered_ranges:
+      lines.update( self._diag_lines[
+        bisect_left( self._diag_lines, first ) :
+        bisect_right( self._diag_lines, last ) ] )
+    return sorted( lines )
 
 
   def _UpdateLocationLists( self ):
@@ -118,65 +221,118 @@ class DiagnosticInterface:
 
 
   def UpdateMatches( self ):
+    # The buffer may have been hidden or in another tab page when the
+    # diagnostics were received.
+    self._RenderVisibleLines()
+    self._UpdateMatches()
+
+
+  def _UpdateMatches( self ):
     if not self._user_options[ 'enable_diagnostic_highlighting' ]:
       return
 
+    if vimsupport.VimSupportsTextProperties():
+      # Text properties belong to the buffer and move with its text. They only
+      # need to be replaced when the diagnostics change.
+      if self._properties_need_update:
+        self._UpdateTextProperties()
+      return
+
     # Vim doesn't provide a way to update the matches for a different window
     # than the current one (which is a view of the current buffer).
     if vimsupport.GetCurrentBufferNumber() != self._bufnr:
       return
 
-    matches_to_remove = vimsupport.GetDiagnosticMatchesInCurrentWindow()
+    # The same match may be there more than once.
+    current_matches = defaultdict( list )
+    for match in vimsupport.GetDiagnosticMatchesInCurrentWindow():
+      current_matches[ match.key ].append( match )
+    matches_to_add = []
 
-    for diags in self._line_to_diags.values():
+    for line in self._LinesToRender():
       # Insert squiggles in reverse order so that errors overlap warnings.
-      for diag in reversed( diags ):
+      for diag in reversed( self._line_to_diags[ line ] ):
         group = ( 'YcmErrorSection' if _DiagnosticIsError( diag ) else
                   'YcmWarningSection' )
 
-        for pattern in _ConvertDiagnosticToMatchPatterns( diag ):
+        for positions in _ConvertDiagnosticToMatchPositions( diag ):
           # The id doesn't matter for matches that we may add.
-          match = vimsupport.DiagnosticMatch( 0, group, pattern )
-          try:
-            matches_to_remove.remove( match )
-          except ValueError:
-            vimsupport.AddDiagnosticMatch( match )
+          match = vimsupport.DiagnosticMatch( 0, group, positions )
+          if current_matches.get( match.key ):
+            current_matches[ match.key ].pop()
+          else:
+            matches_to_add.append( match )
 
-    for match in matches_to_remove:
-      vimsupport.RemoveDiagnosticMatch( match )
+    vimsupport.RemoveDiagnosticMatches( [
+      match for matches in current_matches.values() for match in matches ] )
+    vimsupport.AddDiagnosticMatches( matches_to_add )
 
 
-  def _UpdateSigns( self ):
-    signs_to_unplace = vimsupport.GetSignsInBuffer( self._bufnr )
+  def _UpdateTextProperties( self ):
+    try:
+      buffer_object = vim.buffers[ self._bufnr ]
+    except KeyError:
+      return
+    self._properties_need_update = False
 
-    for line, diags in self._line_to_diags.items():
-      if not diags:
-        continue
+    properties = []
+    for line in self._LinesToRender():
+      for diag in self._line_to_diags[ line ]:
+        group = ( 'YcmErrorSection' if _DiagnosticIsError( diag ) else
+                  'YcmWarningSection' )
+        for prop_range in _ConvertDiagnosticToPropertyRanges( buffer_object,
+                                                              diag ):
+          properties.append( vimsupport.DiagnosticProperty( group,
+                                                            *prop_range ) )
 
-      # We always go for the first diagnostic on the line because diagnostics
-      # are sorted by errors in priority and Vim can only display one sign by
-      # line.
-      name = 'YcmError' if _DiagnosticIsError( diags[ 0 ] ) else 'YcmWarning'
-      sign = vimsupport.CreateSign( line, name, self._bufnr )
+    vimsupport.RemoveDiagnosticProperties(
+      self._bufnr, [ 'YcmErrorSection', 'YcmWarningSection' ] )
+    vimsupport.AddDiagnosticProperties( self._bufnr, properties )
 
-      try:
-        signs_to_unplace.remove( sign )
-      except ValueError:
-        vimsupport.PlaceSign( sign )
 
-    for sign in signs_to_unplace:
-      vimsupport.UnplaceSign( sign )
+  def _UpdateSigns( self ):
+    if self._placed_signs is None:
+      # Signs placed for a previous version of this buffer may still be there.
+      vimsupport.UnplaceAllSignsInBuffer( self._bufnr )
+      self._placed_signs = {}
+
+    # We always go for the first diagnostic on the line because diagnostics
+    # are sorted by errors in priority and Vim can only display one sign by
+    # line.
+    new_signs = set()
+    for line in self._LinesToRender():
+      first_diag = self._line_to_diags[ line ][ 0 ]
+      name = 'YcmError' if _DiagnosticIsError( first_diag ) else 'YcmWarning'
+      new_signs.add( vimsupport.DiagnosticSignKey( line, name, self._bufnr ) )
+
+    placed_signs = self._placed_signs
+    signs_to_unplace = [ placed_signs.pop( key )
+                         for key in placed_signs.keys() - new_signs ]
+    signs_to_place = [ vimsupport.CreateSign( *key )
+                       for key in sorted( new_signs - placed_signs.keys() ) ]
+    placed_signs.update( ( sign.key, sign ) for sign in signs_to_place )
+
+    vimsupport.UnplaceSigns( signs_to_unplace )
+    vimsupport.PlaceSigns( signs_to_place )
 
 
   def _ConvertDiagListToDict( self ):
     self._line_to_diags = defaultdict( list )
+    counts = { 'error': 0, 'warning': 0 }
     for diag in self._diagnostics:
       location = diag[ 'location' ]
-      bufnr = vimsupport.GetBufferNumberForFilename( location[ 'filepath' ] )
+      bufnr = vimsupport.GetCachedBufferNumberForFilename(
+        location[ 'filepath' ] )
       if bufnr == self._bufnr:
         line_number = location[ 'line_num' ]
         self._line_to_diags[ line_number ].append( diag )
+        if _DiagnosticIsError( diag ):
+          counts[ 'error' ] += 1
+        elif _DiagnosticIsWarning( diag ):
+          counts[ 'warning' ] += 1
+    self._counts = counts
 
+    self._diag_lines = sorted( self._line_to_diags )
     for diags in self._line_to_diags.values():
       # We also want errors to be listed before warnings so that errors aren't
       # hidden by the warnings; Vim won't place a sign over an existing one.
@@ -198,27 +354,60 @@ def _NormalizeDiagnostic( diag ):
   return diag
 
 
-def _ConvertDiagnosticToMatchPatterns( diagnostic ):
-  patterns = []
+def _ConvertDiagnosticToMatchPositions( diagnostic ):
+  """Return the positions to highlight for |diagnostic|, grouped by as many as
+  a single match can take."""
+  positions = []
+
+  location_extent = diagnostic[ 'location_extent' ]
+  if location_extent[ 'start' ][ 'line_num' ] <= 0:
+    location = diagnostic[ 'location' ]
+    positions.extend( vimsupport.GetDiagnosticMatchPositions(
+      location[ 'line_num' ],
+      location[ 'column_num' ] ) )
+  else:
+    positions.extend( vimsupport.GetDiagnosticMatchPositions(
+      location_extent[ 'start' ][ 'line_num' ],
+      location_extent[ 'start' ][ 'column_num' ],
+      location_extent[ 'end' ][ 'line_num' ],
+      location_extent[ 'end' ][ 'column_num' ] ) )
+
+  for diagnostic_range in diagnostic[ 'ranges' ]:
+    positions.extend( vimsupport.GetDiagnosticMatchPositions(
+      diagnostic_range[ 'start' ][ 'line_num' ],
+      diagnostic_range[ 'start' ][ 'column_num' ],
+      diagnostic_range[ 'end' ][ 'line_num' ],
+      diagnostic_range[ 'end' ][ 'column_num' ] ) )
+
+  max_positions = vimsupport.MATCHADDPOS_MAX_POSITIONS
+  return [ tuple( positions[ index : index + max_positions ] )
+           for index in range( 0, len( positions ), max_positions ) ]
+
+
+def _ConvertDiagnosticToPropertyRanges( buffer_object, diagnostic ):
+  ranges = []
 
   location_extent = diagnostic[ 'location_extent' ]
   if location_extent[ 'start' ][ 'line_num' ] <= 0:
     location = diagnostic[ 'location' ]
-    patterns.append( vimsupport.GetDiagnosticMatchPattern(
+    ranges.append( vimsupport.GetDiagnosticPropertyRange(
+      buffer_object,
       location[ 'line_num' ],
       location[ 'column_num' ] ) )
   else:
-    patterns.append( vimsupport.GetDiagnosticMatchPattern(
+    ranges.append( vimsupport.GetDiagnosticPropertyRange(
+      buffer_object,
       location_extent[ 'start' ][ 'line_num' ],
       location_extent[ 'start' ][ 'column_num' ],
       location_extent[ 'end' ][ 'line_num' ],
       location_extent[ 'end' ][ 'column_num' ] ) )
 
   for diagnostic_range in diagnostic[ 'ranges' ]:
-    patterns.append( vimsupport.GetDiagnosticMatchPattern(
+    ranges.append( vimsupport.GetDiagnosticPropertyRange(
+      buffer_object,
       diagnostic_range[ 'start' ][ 'line_num' ],
       diagnostic_range[ 'start' ][ 'column_num' ],
       diagnostic_range[ 'end' ][ 'line_num' ],
       diagnostic_range[ 'end' ][ 'column_num' ] ) )
 
-  return patterns
+  return ranges
@@ -0,0 +1,194 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+import vim
+from collections import Counter
+from itertools import chain
+from ycm import candidate_filter, vimsupport
+from ycmd import identifier_utils
+
+
+# Identifier completion done inside Vim. It is only used while ycmd is starting
+# so that the user gets some completion before the server is ready. Identifiers
+# are collected from the visible buffers of the current filetype; each buffer
+# is reindexed when its changedtick moves and only the lines that changed are
+# tokenized again.
+class IdentifierCompleter:
+
+  def __init__( self, user_options ):
+    self._min_num_chars = user_options[ 'min_num_of_chars_for_completion' ]
+    self._max_candidates = user_options[ 'max_num_identifier_candidates' ]
+    self._buffers = {}
+
+
+  def Reset( self ):
+    """Drop all the indexed identifiers."""
+    for buffer_identifiers in self._buffers.values():
+      buffer_identifiers.Close()
+    self._buffers = {}
+
+
+  def ComputeCandidates( self, request_data ):
+    query = request_data[ 'query' ]
+    if ( not request_data[ 'force_semantic' ] and
+         len( query ) < self._min_num_chars ):
+      return []
+
+    filetype = vimsupport.CurrentFiletypes()[ 0 ]
+    identifiers = set()
+    for buffer_identifiers in self._UpdateVisibleBuffers( filetype ):
+      identifiers.update( buffer_identifiers.identifiers )
+    identifiers.discard( query )
+    if not query:
+      # Candidates are returned in their order for an empty query.
+      identifiers = sorted( identifiers )
+
+    return [ { 'word': word, 'menu': '[ID]', 'equal': 1, 'dup': 1 }
+             for word in candidate_filter.FilterAndSortCandidates(
+               identifiers, '', query, self._max_candidates ) ]
+
+
+  def _UpdateVisibleBuffers( self, filetype ):
+    visible_buffers = {}
+    for window in vim.windows:
+      buffer_object = window.buffer
+      if buffer_object.number in visible_buffers:
+        continue
+      if vimsupport.FiletypesForBuffer( buffer_object )[ 0 ] != filetype:
+        continue
+
+      bufnr = buffer_object.number
+      buffer_identifiers = self._buffers.pop( bufnr, None )
+      if buffer_identifiers is None:
+        buffer_identifiers = BufferIdentifiers( bufnr )
+      buffer_identifiers.Update( buffer_object,
+                                 vimsupport.GetBufferChangedTick( bufnr ),
+                                 filetype )
+      visible_buffers[ bufnr ] = buffer_identifiers
+
+    # Forget about buffers that are no longer visible.
+    for buffer_identifiers in self._buffers.values():
+      buffer_identifiers.Close()
+    self._buffers = visible_buffers
+    return visible_buffers.values()
+
+
+class BufferIdentifiers:
+  """Identifiers of a buffer, counted with multiplicity so that lines can be
+  added and removed without tokenizing the whole buffer again. If |bufnr| is
+  set and Vim supports listeners (see ":h listener_add"), the lines changed
+  since the last update are recorded by Vim and only these lines are read and
+  tokenized. Otherwise, the whole buffer is read and only the lines whose text
+  is new are tokenized."""
+
+  def __init__( self, bufnr = None ):
+    self.changedtick = None
+    self.filetype = None
+    self.identifiers = Counter()
+    self._bufnr = bufnr
+    self._listener = None
+    self._lines = []
+    self._identifiers_for_line = []
+
+
+  def Update( self, lines, changedtick, filetype ):
+    if changedtick == self.changedtick and filetype == self.filetype:
+      return
+    self.changedtick = changedtick
+
+    changes = None
+    if self._listener is not None:
+      changes = vimsupport.PopLineChanges( self._bufnr )
+    if changes is not None and filetype == self.filetype:
+      start, old_end, new_end = _MergeLineChanges( changes )
+      self._UpdateLines( lines, start, old_end, new_end )
+      if len( self._lines ) == len( lines ):
+        return
+
+    self._Reindex( lines, filetype )
+
+
+  def Close( self ):
+    """Stop recording the changes of the buffer."""
+    if self._listener is not None:
+      vimsupport.StopTrackingLineChanges( self._bufnr, self._listener )
+      self._listener = None
+
+
+  def _Reindex( self, lines, filetype ):
+    if ( self._listener is None and
+         self._bufnr is not None and
+         vimsupport.VimSupportsListeners() ):
+      self._listener = vimsupport.TrackLineChanges( self._bufnr )
+
+    # The identifier regex depends on the filetype.
+    known_lines = ( dict( zip( self._lines, self._identifiers_for_line ) )
+                    if filetype == self.filetype else {} )
+    self.filetype = filetype
+    self._lines = lines[ : ]
+    self._identifiers_for_line = []
+    for line in self._lines:
+      identifiers = known_lines.get( line )
+      if identifiers is None:
+        identifiers = _ExtractIdentifiers( line, filetype )
+        known_lines[ line ] = identifiers
+      self._identifiers_for_line.append( identifiers )
+    self.identifiers = Counter( chain.from_iterable(
+      self._identifiers_for_line ) )
+
+
+  def _UpdateLines( self, lines, start, old_end, new_end ):
+    """Replace the lines from |start| to |old_end| (excluded) by the lines of
+    the buffer from |start| to |new_end|."""
+    new_lines = lines[ start : new_end ]
+    new_identifiers = [ _ExtractIdentifiers( line, self.filetype )
+                        for line in new_lines ]
+    for identifiers in new_identifiers:
+      self.identifiers.update( identifiers )
+    for identifiers in self._identifiers_for_line[ start : old_end ]:
+      for identifier in identifiers:
+        remaining = self.identifiers[ identifier ] - 1
+        if remaining > 0:
+          self.identifiers[ identifier ] = remaining
+        else:
+          del self.identifiers[ identifier ]
+    self._lines[ start : old_end ] = new_lines
+    self._identifiers_for_line[ start : old_end ] = new_identifiers
+
+
+def _MergeLineChanges( changes ):
+  """Merge the changes reported by a Vim listener, in the order they were made,
+  into a single change. Return the 0-based start of the changed lines, the end
+  of the changed lines before the changes and their end after the changes."""
+  start = old_end = new_end = None
+  for lnum, end, added in changes:
+    if start is None:
+      start, old_end, new_end = lnum - 1, end - 1, end - 1 + added
+      continue
+    # The line numbers of a change take the previous changes into account.
+    changed_end = max( new_end, end - 1 )
+    old_end = changed_end - ( new_end - old_end )
+    new_end = changed_end + added
+    start = min( start, lnum - 1 )
+  if start is None:
+    return 0, 0, 0
+  return start, old_end, new_end
+
+
+def _ExtractIdentifiers( line, filetype ):
+  return identifier_utils.IdentifierRegexForFiletype( filetype ).findall(
+    identifier_utils.RemoveIdentifierFreeText( line, filetype ) )
@@ -15,8 +15,10 @@
 # You should have received a copy of the GNU General Public License
 # along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
 
+import time
 import vim
-from ycm import vimsupport
+from collections import defaultdict, OrderedDict
+from ycm import candidate_filter, vimsupport
 from ycmd import utils
 from ycmd.completers.completer import Completer
 from ycm.client.base_request import BaseRequest
@@ -24,12 +26,23 @@ from ycm.client.base_request import BaseRequest
 OMNIFUNC_RETURNED_BAD_VALUE = 'Omnifunc returned bad value to YCM!'
 OMNIFUNC_NOT_LIST = ( 'Omnifunc did not return a list or a dict with a "words" '
                      ' list when expected.' )
+OMNIFUNC_DISABLED = ( 'Omnifunc {omnifunc} is too slow for {filetype} files '
+                      'and has been disabled. See :YcmDebugInfo for its '
+                      'timings.' )
+
+# Omnifuncs exceeding the time budget this many times in a row are run from a
+# timer. If they still take more than OMNIFUNC_DISABLE_FACTOR times the budget
+# this many times in a row, they are disabled for the filetype.
+OMNIFUNC_MAX_STRIKES = 3
+OMNIFUNC_DISABLE_FACTOR = 10
 
 
 class OmniCompleter( Completer ):
   def __init__( self, user_options ):
     super( OmniCompleter, self ).__init__( user_options )
     self._omnifunc = None
+    self._cache = OmnifuncCache()
+    self._timings = defaultdict( OmnifuncTimings )
 
 
   def SupportedFiletypes( self ):
@@ -44,9 +57,15 @@ class OmniCompleter( Completer ):
     self._omnifunc = utils.ToUnicode( vim.eval( '&omnifunc' ) )
     if not self._omnifunc:
       return False
+    if self._OmnifuncTimings( request_data ).mode == OmnifuncTimings.DISABLED:
+      return False
+    if not self.ShouldUseNowInner( request_data ):
+      return False
     if self.ShouldUseCache():
-      return super( OmniCompleter, self ).ShouldUseNow( request_data )
-    return self.ShouldUseNowInner( request_data )
+      # Don't call the omnifunc again where it previously returned nothing.
+      cached = self._cache.Peek( self._CacheKey( request_data ) )
+      return cached is None or bool( cached[ 1 ] )
+    return True
 
 
   def ShouldUseNowInner( self, request_data ):
@@ -61,12 +80,107 @@ class OmniCompleter( Completer ):
 
   def ComputeCandidates( self, request_data ):
     if self.ShouldUseCache():
-      return super( OmniCompleter, self ).ComputeCandidates( request_data )
+      if ( not request_data[ 'force_semantic' ] and
+           not self.ShouldUseNow( request_data ) ):
+        return []
+      return self.FilterAndSortCandidates(
+        self._GetCandidatesFromCacheOrOmnifunc( request_data ),
+        request_data[ 'query' ] )
     if self.ShouldUseNowInner( request_data ):
-      return self.ComputeCandidatesInner( request_data )
+      return self._GetCandidatesFromCacheOrOmnifunc( request_data )
     return []
 
 
+  def InvalidateCache( self ):
+    """Forget the omnifunc results. Called when the buffer may have changed
+    outside of the line being completed."""
+    self._cache.Invalidate()
+
+
+  def ShouldDefer( self, request_data ):
+    """Whether the omnifunc has been too slow for this filetype and should be
+    run after returning to Vim's main loop."""
+    return ( self._OmnifuncTimings( request_data ).mode ==
+             OmnifuncTimings.DEFERRED )
+
+
+  def Stats( self ):
+    return {
+      'cache_hits': self._cache.hits,
+      'cache_misses': self._cache.misses,
+      'timings': { filetype: timings.Stats()
+                   for filetype, timings in self._timings.items() }
+    }
+
+
+  def _OmnifuncTimings( self, request_data ):
+    return self._timings[ request_data[ 'first_filetype' ] ]
+
+
+  def _RecordOmnifuncDuration( self, request_data, duration ):
+    timings = self._OmnifuncTimings( request_data )
+    budget = self.user_options[ 'omnifunc_time_budget_ms' ] / 1000
+    timings.Record( duration, budget )
+    if not budget or timings.mode == OmnifuncTimings.DISABLED:
+      return
+
+    if timings.mode == OmnifuncTimings.SYNCHRONOUS:
+      threshold = budget
+    else:
+      threshold = budget * OMNIFUNC_DISABLE_FACTOR
+    if duration <= threshold:
+      timings.strikes = 0
+      return
+
+    timings.strikes += 1
+    if timings.strikes < OMNIFUNC_MAX_STRIKES:
+      return
+
+    timings.strikes = 0
+    if timings.mode == OmnifuncTimings.SYNCHRONOUS:
+      timings.mode = OmnifuncTimings.DEFERRED
+      return
+
+    timings.mode = OmnifuncTimings.DISABLED
+    vimsupport.PostVimMessage(
+      OMNIFUNC_DISABLED.format( omnifunc = self._omnifunc,
+                                filetype = request_data[ 'first_filetype' ] ) )
+
+
+  def _CacheKey( self, request_data ):
+    # The start column is the one of the identifier being completed, which
+    # stays the same while the query is narrowed. Text typed on the current
+    # line before it and added or removed lines make the results stale; other
+    # changes to the buffer invalidate the whole cache (see InvalidateCache).
+    start_codepoint = request_data[ 'start_codepoint' ]
+    key = ( self._omnifunc,
+            vimsupport.GetCurrentBufferNumber(),
+            len( vim.current.buffer ),
+            request_data[ 'line_num' ],
+            request_data[ 'start_column' ],
+            request_data[ 'line_value' ][ : start_codepoint - 1 ] )
+    if not self.ShouldUseCache():
+      # Without caching, the omnifunc must see every new query.
+      key += ( request_data[ 'query' ], )
+    return key
+
+
+  def _GetCandidatesFromCacheOrOmnifunc( self, request_data ):
+    key = self._CacheKey( request_data )
+    cached = self._cache.Get( key )
+    if cached is not None:
+      start_column, candidates = cached
+      request_data[ 'start_column' ] = start_column
+      return candidates
+
+    start_time = time.perf_counter()
+    candidates = self.ComputeCandidatesInner( request_data )
+    self._RecordOmnifuncDuration( request_data,
+                                  time.perf_counter() - start_time )
+    self._cache.Update( key, ( request_data[ 'start_column' ], candidates ) )
+    return candidates
+
+
   def ComputeCandidatesInner( self, request_data ):
     if not self._omnifunc:
       return []
@@ -138,6 +252,24 @@ class OmniCompleter( Completer ):
 
 
   def FilterAndSortCandidatesInner( self, candidates, sort_property, query ):
+    try:
+      return candidate_filter.FilterAndSortCandidates(
+        candidates,
+        sort_property,
+        query,
+        self.user_options[ 'max_num_candidates' ] )
+    except ( KeyError, TypeError ):
+      # Candidates we can't match locally (e.g. without a text under the sort
+      # property); let ycmd deal with them.
+      return self._FilterAndSortCandidatesOnServer( candidates,
+                                                    sort_property,
+                                                    query )
+
+
+  def _FilterAndSortCandidatesOnServer( self,
+                                        candidates,
+                                        sort_property,
+                                        query ):
     request_data = {
       'candidates': candidates,
       'sort_property': sort_property,
@@ -147,3 +279,79 @@ class OmniCompleter( Completer ):
     response = BaseRequest().PostDataToHandler( request_data,
                                                 'filter_and_sort_candidates' )
     return response if response is not None else []
+
+
+class OmnifuncCache:
+  """The last omnifunc results, keyed by the completion position and the state
+  of the buffer (see OmniCompleter._CacheKey)."""
+
+  MAX_ENTRIES = 16
+
+  def __init__( self ):
+    self._entries = OrderedDict()
+    self.hits = 0
+    self.misses = 0
+
+
+  def Peek( self, key ):
+    """Return the entry for |key| or None, without counting a hit or miss."""
+    return self._entries.get( key )
+
+
+  def Get( self, key ):
+    entry = self._entries.get( key )
+    if entry is None:
+      self.misses += 1
+      return None
+    self.hits += 1
+    self._entries.move_to_end( key )
+    return entry
+
+
+  def Update( self, key, entry ):
+    self._entries[ key ] = entry
+    self._entries.move_to_end( key )
+    while len( self._entries ) > self.MAX_ENTRIES:
+      self._entries.popitem( last = False )
+
+
+  def Invalidate( self ):
+    self._entries.clear()
+
+
+class OmnifuncTimings:
+  """Durations, in seconds, of the omnifunc calls for a filetype and how the
+  omnifunc is run for it."""
+
+  SYNCHRONOUS = 'synchronous'
+  DEFERRED = 'deferred'
+  DISABLED = 'disabled'
+
+  def __init__( self ):
+    self.mode = OmnifuncTimings.SYNCHRONOUS
+    self.strikes = 0
+    self.calls = 0
+    self.total = 0.0
+    self.last = 0.0
+    self.max = 0.0
+    self.over_budget = 0
+
+
+  def Record( self, duration, budget ):
+    self.calls += 1
+    self.total += duration
+    self.last = duration
+    self.max = max( self.max, duration )
+    if budget and duration > budget:
+      self.over_budget += 1
+
+
+  def Stats( self ):
+    return {
+      'mode': self.mode,
+      'calls': self.calls,
+      'average_ms': self.total / self.calls * 1000 if self.calls else 0,
+      'last_ms': self.last * 1000,
+      'max_ms': self.max * 1000,
+      'over_budget': self.over_budget
+    }
@@ -15,8 +15,10 @@
 # You should have received a copy of the GNU General Public License
 # along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
 
+import contextlib
 import os
 import sys
+import tempfile
 import vim
 import re
 
@@ -86,3 +88,40 @@ def _EndsWithPython( path ):
 
 def PathToServerScript():
   return os.path.join( DIR_OF_YCMD, 'ycmd' )
+
+
+def PathToCacheFile( filename ):
+  """Return the path of |filename| in the cache directory of YCM for the current
+  user. The directory may not exist yet; see WriteFileAtomically."""
+  from ycmd import utils
+
+  if utils.OnWindows():
+    cache_dir = os.environ.get( 'LOCALAPPDATA' ) or os.path.expanduser(
+      os.path.join( '~', 'AppData', 'Local' ) )
+  else:
+    cache_dir = os.environ.get( 'XDG_CACHE_HOME' )
+    if not cache_dir or not os.path.isabs( cache_dir ):
+      cache_dir = os.path.expanduser( os.path.join( '~', '.cache' ) )
+  return os.path.join( cache_dir, 'ycm', filename )
+
+
+def WriteFileAtomically( path, contents ):
+  """Write |contents| to |path| through a temporary file in the same directory
+  that replaces it, so that other Vim instances never read a partial file. The
+  directory is created, only accessible to the current user, if needed.
+  Raise OSError on failure."""
+  directory, filename = os.path.split( path )
+  os.makedirs( directory, mode = 0o700, exist_ok = True )
+  temporary_file = tempfile.NamedTemporaryFile( 'w',
+                                                dir = directory,
+                                                prefix = filename,
+                                                suffix = '.tmp',
+                                                delete = False )
+  try:
+    with temporary_file:
+      temporary_file.write( contents )
+    os.replace( temporary_file.name, path )
+  except OSError:
+    with contextlib.suppress( OSError ):
+      os.remove( temporary_file.name )
+    raise
@@ -0,0 +1,74 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+# Diagnostics of a file that keep being updated are applied anyway after this
+# many ticks.
+MAX_PENDING_TICKS = 10
+
+
+class PendingDiagnostics:
+  """Diagnostics received from the server that are not applied yet.
+
+  Language servers often publish the diagnostics of a file several times in a
+  row. Only the latest diagnostics of each file are kept and they are applied
+  at the end of the first tick during which no new ones were received for the
+  file, or after MAX_PENDING_TICKS ticks. The number of updates that were
+  replaced before being applied is counted in |dropped|.
+
+  It has the same interface as the diagnostics handler of MessagesPoll."""
+
+  def __init__( self ):
+    self._updates = {}
+    self._tick = 0
+    self.dropped = 0
+
+
+  def __len__( self ):
+    return len( self._updates )
+
+
+  def UpdateWithNewDiagnosticsForFile( self, filepath, diagnostics ):
+    update = self._updates.get( filepath )
+    if update is None:
+      self._updates[ filepath ] = _Update( diagnostics, self._tick )
+      return
+    self.dropped += 1
+    update.diagnostics = diagnostics
+    update.last_tick = self._tick
+
+
+  def PopIdle( self ):
+    """End the current tick. Return the filepaths and diagnostics of the files
+    to update."""
+    idle = []
+    for filepath, update in self._updates.items():
+      if ( update.last_tick < self._tick or
+           self._tick - update.first_tick >= MAX_PENDING_TICKS ):
+        idle.append( ( filepath, update.diagnostics ) )
+    for filepath, _ in idle:
+      del self._updates[ filepath ]
+    self._tick += 1
+    return idle
+
+
+class _Update:
+  __slots__ = ( 'diagnostics', 'first_tick', 'last_tick' )
+
+  def __init__( self, diagnostics, tick ):
+    self.diagnostics = diagnostics
+    self.first_tick = tick
+    self.last_tick = tick
@@ -0,0 +1,133 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+
+# Diagnostics of files that were updated a long time ago are dropped when the
+# store holds more than this many diagnostics.
+MAX_PROJECT_DIAGNOSTICS = 10000
+
+# Severities in the order they are listed.
+KINDS = [ 'ERROR', 'WARNING' ]
+
+
+class ProjectDiagnostics:
+  """The latest diagnostics received from the server for each file of the
+  project, indexed by file and by severity.
+
+  Language Server Protocol-based completers report diagnostics for the whole
+  project asynchronously. Those of files that are not visible are kept
+  "pending" here until the file is visited, so that they can be shown without
+  waiting for a new parse. At most |max_diagnostics| diagnostics are kept; the
+  files that were not updated for the longest time are forgotten first."""
+
+  def __init__( self, max_diagnostics = MAX_PROJECT_DIAGNOSTICS ):
+    self._max_diagnostics = max_diagnostics
+    # Least recently updated files first.
+    self._files = OrderedDict()
+    self._num_diagnostics = 0
+
+
+  def Update( self, filepath, diagnostics, pending = False ):
+    """Replace the diagnostics of |filepath|. If |pending|, they have not been
+    shown yet and are returned by the next call to PopPending."""
+    self._Remove( filepath )
+    if not diagnostics:
+      return
+
+    file_diagnostics = _FileDiagnostics( diagnostics,
+                                         self._max_diagnostics,
+                                         pending )
+    self._files[ filepath ] = file_diagnostics
+    self._num_diagnostics += len( file_diagnostics )
+    while self._num_diagnostics > self._max_diagnostics:
+      _, evicted = self._files.popitem( last = False )
+      self._num_diagnostics -= len( evicted )
+
+
+  def PopPending( self, filepath ):
+    """Return the diagnostics of |filepath| that have not been shown yet, or
+    None. They are only returned once."""
+    file_diagnostics = self._files.get( filepath )
+    if file_diagnostics is None or not file_diagnostics.pending:
+      return None
+    file_diagnostics.pending = False
+    return file_diagnostics.Diagnostics()
+
+
+  def Clear( self ):
+    self._files.clear()
+    self._num_diagnostics = 0
+
+
+  def Count( self, kind = None ):
+    """Number of diagnostics of severity |kind|, of all severities if None."""
+    if kind is None:
+      return self._num_diagnostics
+    return sum( len( file_diagnostics.by_kind.get( kind, () ) )
+                for file_diagnostics in self._files.values() )
+
+
+  def Diagnostics( self, kind = None ):
+    """Diagnostics of severity |kind|, of all severities if None, sorted by
+    file."""
+    diagnostics = []
+    for filepath in sorted( self._files ):
+      diagnostics.extend( self._files[ filepath ].Diagnostics( kind ) )
+    return diagnostics
+
+
+  def _Remove( self, filepath ):
+    file_diagnostics = self._files.pop( filepath, None )
+    if file_diagnostics is not None:
+      self._num_diagnostics -= len( file_diagnostics )
+
+
+class _FileDiagnostics:
+  __slots__ = ( 'by_kind', 'pending', '_length' )
+
+  def __init__( self, diagnostics, max_diagnostics, pending ):
+    by_kind = {}
+    for diagnostic in diagnostics:
+      by_kind.setdefault( diagnostic[ 'kind' ], [] ).append( diagnostic )
+
+    # Keep the most severe diagnostics of files that have too many.
+    self.by_kind = {}
+    remaining = max_diagnostics
+    for kind in _OrderedKinds( by_kind ):
+      kept = tuple( by_kind[ kind ][ : remaining ] )
+      if kept:
+        self.by_kind[ kind ] = kept
+        remaining -= len( kept )
+    self.pending = pending
+    self._length = max_diagnostics - remaining
+
+
+  def __len__( self ):
+    return self._length
+
+
+  def Diagnostics( self, kind = None ):
+    if kind is not None:
+      return list( self.by_kind.get( kind, () ) )
+    return [ diagnostic for kind in _OrderedKinds( self.by_kind )
+             for diagnostic in self.by_kind[ kind ] ]
+
+
+def _OrderedKinds( by_kind ):
+  return ( [ kind for kind in KINDS if kind in by_kind ] +
+           sorted( kind for kind in by_kind if kind not in KINDS ) )
@@ -32,6 +32,101 @@ class SignatureHelpState:
     self.popup_win_id = popup_win_id
     self.state = state
     self.anchor = None
+    # Lines, options, syntax and active signature of the popup as last sent to
+    # Vim.
+    self.rendered = None
+
+
+class ActiveParameterTracker:
+  """Move the active parameter of the last signature help returned by the
+  server as arguments are typed, so that the server is only asked again when
+  the cursor leaves the call or enters a nested one."""
+
+  def __init__( self ):
+    self.Reset()
+
+
+  def Reset( self ):
+    self._pending = None
+    self._line_num = None
+    self._prefix = None
+    self._signature_info = None
+
+
+  def OnRequest( self, line_num, line, column ):
+    """Remember the position of a signature help request sent to the server.
+    |column| is a 0-based codepoint offset in |line|."""
+    self._pending = ( line_num, line[ : column ] )
+
+
+  def OnResponse( self, signature_info ):
+    if self._pending is None:
+      return
+    self._line_num, self._prefix = self._pending
+    self._pending = None
+    self._signature_info = signature_info
+
+
+  def Track( self, line_num, line, column ):
+    """Return the signature help at the cursor computed from the last response
+    of the server, or None if the server must be asked."""
+    if not self._signature_info or not self._signature_info.get( 'signatures' ):
+      return None
+    if line_num != self._line_num or not line.startswith( self._prefix ):
+      return None
+    if column < len( self._prefix ):
+      return None
+
+    arguments = _CountArgumentsStarted( line[ len( self._prefix ) : column ] )
+    if arguments is None:
+      return None
+    if not arguments:
+      return self._signature_info
+
+    active_parameter = (
+      int( self._signature_info.get( 'activeParameter', 0 ) ) + arguments )
+    signatures = self._signature_info[ 'signatures' ]
+    active_signature = int( self._signature_info.get( 'activeSignature', 0 ) )
+    if active_signature >= len( signatures ):
+      return None
+    parameters = signatures[ active_signature ].get( 'parameters' ) or []
+    if active_parameter >= len( parameters ):
+      # The server may pick another overload.
+      return None
+
+    return dict( self._signature_info, activeParameter = active_parameter )
+
+
+def _CountArgumentsStarted( text ): # noqa
+  """Count the commas of |text| that are not nested in brackets or strings.
+  Return None if |text| closes a bracket it didn't open or ends inside brackets
+  or a string."""
+  depth = 0
+  quote = None
+  escaped = False
+  commas = 0
+  for char in text:
+    if quote:
+      if escaped:
+        escaped = False
+      elif char == '\\':
+        escaped = True
+      elif char == quote:
+        quote = None
+    elif char in '\'"':
+      quote = char
+    elif char in '([{':
+      depth += 1
+    elif char in ')]}':
+      depth -= 1
+      if depth < 0:
+        return None
+    elif char == ',' and not depth:
+      commas += 1
+
+  if depth or quote:
+    return None
+  return commas
 
 
 def _MakeSignatureHelpBuffer( signature_info ):
@@ -89,10 +184,11 @@ def UpdateSignatureHelp( state, signature_info ): # noqa
 
   # Generate the buffer as a list of lines
   buf_lines = _MakeSignatureHelpBuffer( signature_info )
-  screen_pos = vimsupport.ScreenPositionForLineColumnInWindow(
-    vim.current.window,
-    state.anchor[ 0 ] + 1,  # anchor 0-based
-    state.anchor[ 1 ] + 1 ) # anchor 0-based
+  screen_pos, pum_pos = vim.eval(
+    f'[ screenpos( win_getid(), '
+                f'{ state.anchor[ 0 ] + 1 }, '  # anchor 0-based
+                f'{ state.anchor[ 1 ] + 1 } ), '  # anchor 0-based
+      'pumvisible() ? pum_getpos() : {} ]' )
 
   # Simulate 'flip' at the screen boundaries by using screenpos and hiding the
   # signature help menu if it overlaps the completion popup (pum).
@@ -117,8 +213,8 @@ def UpdateSignatureHelp( state, signature_info ): # noqa
     line = 0
 
   # Don't allow the popup to overlap the pum
-  if line > 0 and GetIntValue( 'pumvisible()' ):
-    pum_line = GetIntValue( 'pum_getpos().row' ) + 1
+  if line > 0 and pum_pos:
+    pum_line = int( pum_pos[ 'row' ] ) + 1
     if pos == 'botleft' and pum_line <= line:
       line = 0
     elif ( pos == 'topleft' and
@@ -159,22 +255,33 @@ def UpdateSignatureHelp( state, signature_info ): # noqa
     "padding": [ 0, 1, 0, 1 ], # Pad 1 char in X axis to match completion menu
   }
 
-  if not state.popup_win_id:
-    state.popup_win_id = GetIntValue(
-      f'popup_create( { json.dumps( buf_lines ) }, '
-                    f'{ json.dumps( options ) } )' )
-  else:
-    vim.eval( f'popup_settext( { state.popup_win_id }, '
-                             f'{ json.dumps( buf_lines ) } )' )
-
-  # Should do nothing if already visible
-  vim.eval( f'popup_move( { state.popup_win_id }, { json.dumps( options ) } )' )
-  vim.eval( f'popup_show( { state.popup_win_id } )' )
-
   syntax = utils.ToUnicode( vim.current.buffer.options[ 'syntax' ] )
   active_signature = int( signature_info.get( 'activeSignature', 0 ) )
-  vim.eval( f"win_execute( { state.popup_win_id }, "
-            f"'set syntax={ syntax } cursorline | "
-            f"call cursor( [ { active_signature + 1 }, 1 ] )' )" )
+  _RenderPopup( state, buf_lines, options, syntax, active_signature + 1 )
 
   return state
+
+
+def _RenderPopup( state, buf_lines, options, syntax, cursor_line ):
+  """Send to Vim the parts of the popup that changed since it was last
+  rendered, in a single call. Nothing is sent if nothing changed."""
+  rendered = ( buf_lines, options, syntax, cursor_line )
+  if state.popup_win_id and rendered == state.rendered:
+    return
+
+  previous = state.rendered
+  if not state.popup_win_id or not previous:
+    previous = ( None, ) * len( rendered )
+  arguments = [ state.popup_win_id or 0 ] + [
+    value if value != previous_value else None
+    for value, previous_value in zip( rendered, previous ) ]
+  state.popup_win_id = GetIntValue(
+    'youcompleteme#UpdateSignatureHelpPopup( ' +
+    ', '.join( _VimValue( argument ) for argument in arguments ) + ' )' )
+  state.rendered = rendered
+
+
+def _VimValue( value ):
+  if value is None:
+    return 'v:null'
+  return json.dumps( value )
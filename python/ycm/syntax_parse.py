@@ -15,8 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import logging
+import os
 import re
-from ycm import vimsupport
+from ycm import paths, vimsupport
+
+_logger = logging.getLogger( __name__ )
+
+SYNTAX_KEYWORDS_FILE = paths.PathToCacheFile( 'syntax_keywords.json' )
 
 SYNTAX_GROUP_REGEX = re.compile(
   r"""^
@@ -30,6 +37,13 @@ SYNTAX_GROUP_REGEX = re.compile(
 
 KEYWORD_REGEX = re.compile( r'^(\w[\w\-/?+<>]*),?$' )
 
+SCRIPTNAMES_LINE_REGEX = re.compile( r'^\s*\d+:\s+(?P<script>.+)$' )
+
+# Matches the syntax scripts and captures the syntax they belong to, e.g.
+# "java" for syntax/java.vim, after/syntax/java.vim and syntax/java/doc.vim.
+SYNTAX_SCRIPT_NAME_REGEX = re.compile(
+  r'[\\/]syntax[\\/](?P<name>[^\\/]+?)(?:\.vim)?(?:[\\/]|$)' )
+
 SYNTAX_ARGUMENT_REGEX = re.compile(
   r"^\w+=.*$" )
 
@@ -60,11 +74,151 @@ class SyntaxGroup:
     self.children = []
 
 
+class SyntaxKeywordsCache:
+  """Syntax keywords by filetype. If |path| is set, they are saved to this
+  file with what the syntax depends on: the modification times and sizes of
+  the syntax scripts sourced when the keywords were parsed (including the
+  ones pulled in with ":syn include" or ":runtime!" and the after/ scripts),
+  the syntax scripts of the filetype in the runtimepath and the syntax option
+  variables like g:c_gnu. As long as these are unchanged, the saved keywords
+  are used instead of parsing the output of ":syntax list" again, including
+  in later Vim sessions."""
+
+  def __init__( self, path = None ):
+    self._path = path
+    self._saved = None
+
+
+  def KeywordsForCurrentBuffer( self, filetype ):
+    # Without a syntax loaded, e.g. after ":syntax off" or before the Syntax
+    # autocommand, the keywords would be saved under a key that stays valid
+    # once the syntax is loaded.
+    if ( not self._path or
+         not vimsupport.VariableExists( 'b:current_syntax' ) ):
+      return SyntaxKeywordsForCurrentBuffer()
+
+    if self._saved is None:
+      self._saved = self._Load()
+    saved = self._saved.get( filetype )
+    if isinstance( saved, dict ) and _SyntaxKeyIsValid( filetype,
+                                                        saved.get( 'key' ) ):
+      return set( saved[ 'keywords' ] )
+
+    keywords = SyntaxKeywordsForCurrentBuffer()
+    if not keywords:
+      return keywords
+    self._saved[ filetype ] = { 'key': _SyntaxKey( filetype ),
+                                'keywords': sorted( keywords ) }
+    self._Save( filetype )
+    return keywords
+
+
+  def _Load( self ):
+    try:
+      with open( self._path ) as keywords_file:
+        saved = json.load( keywords_file )
+      if isinstance( saved, dict ):
+        return saved
+    except FileNotFoundError:
+      pass
+    except ( OSError, ValueError ):
+      _logger.exception( 'Error while loading syntax keywords' )
+    return {}
+
+
+  def _Save( self, filetype ):
+    # Keep the keywords saved by other Vim sessions in the meantime.
+    saved = self._Load()
+    saved[ filetype ] = self._saved[ filetype ]
+    try:
+      paths.WriteFileAtomically( self._path, json.dumps( saved ) )
+    except OSError:
+      _logger.exception( 'Error while saving syntax keywords' )
+
+
 def SyntaxKeywordsForCurrentBuffer():
   syntax_output = vimsupport.CaptureVimCommand( 'syntax list' )
   return _KeywordsFromSyntaxListOutput( syntax_output )
 
 
+def _SyntaxKey( filetype ):
+  """What the syntax of |filetype| depends on; see ":h syntax-loading". Must
+  be called while this syntax is loaded. The sourced syntax scripts may
+  include the ones of other filetypes loaded earlier in the session: this
+  only means that the key is invalidated more often than needed."""
+  runtime_scripts = _RuntimeSyntaxScripts( filetype )
+  sourced_scripts = _SourcedSyntaxScripts()
+  names = { filetype }
+  for script in sourced_scripts:
+    match = SYNTAX_SCRIPT_NAME_REGEX.search( script )
+    if match:
+      names.add( match.group( 'name' ) )
+  names = sorted( name for name in names if re.fullmatch( r'\w+', name ) )
+  scripts = set( runtime_scripts ) | set( sourced_scripts )
+  return {
+    'runtime_scripts': runtime_scripts,
+    'scripts': { script: _ScriptStat( script ) for script in scripts },
+    'names': names,
+    'variables': _SyntaxVariables( names )
+  }
+
+
+def _SyntaxKeyIsValid( filetype, key ):
+  try:
+    return ( _RuntimeSyntaxScripts( filetype ) == key[ 'runtime_scripts' ] and
+             all( _ScriptStat( script ) == stat
+                  for script, stat in key[ 'scripts' ].items() ) and
+             _SyntaxVariables( key[ 'names' ] ) == key[ 'variables' ] )
+  except ( AttributeError, KeyError, TypeError ):
+    # Saved by an older version.
+    return False
+
+
+def _RuntimeSyntaxScripts( filetype ):
+  """The syntax scripts of |filetype| in the runtimepath, including the after/
+  ones. Those added since the keywords were parsed are not sourced yet."""
+  filetype = vimsupport.EscapeForVim( filetype )
+  return vimsupport.VimExpressionToPythonType(
+    f"globpath( &runtimepath, 'syntax/{ filetype }.vim', 1, 1 ) + "
+    f"globpath( &runtimepath, 'syntax/{ filetype }/*.vim', 1, 1 )" )
+
+
+def _SourcedSyntaxScripts():
+  scriptnames = vimsupport.VimExpressionToPythonType(
+    "execute( 'scriptnames' )" )
+  scripts = []
+  for line in scriptnames.splitlines():
+    match = SCRIPTNAMES_LINE_REGEX.match( line )
+    if match and SYNTAX_SCRIPT_NAME_REGEX.search( match.group( 'script' ) ):
+      scripts.append( os.path.expanduser( match.group( 'script' ) ) )
+  return scripts
+
+
+def _ScriptStat( script ):
+  try:
+    stat = os.stat( script )
+    return [ stat.st_mtime, stat.st_size ]
+  except OSError:
+    return None
+
+
+def _SyntaxVariables( names ):
+  """The global variables prefixed by one of the syntax |names|, like
+  g:c_no_curly_error for the c syntax, as strings."""
+  if not names:
+    return {}
+  prefixes = tuple( f'{ name }_' for name in names )
+  variables = sorted(
+    variable
+    for variable in vimsupport.VimExpressionToPythonType( 'keys( g: )' )
+    if variable.startswith( prefixes ) )
+  if not variables:
+    return {}
+  values = vimsupport.VimExpressionToPythonType(
+    f'map( { json.dumps( variables ) }, "string( g:[ v:val ] )" )' )
+  return dict( zip( variables, values ) )
+
+
 def _KeywordsFromSyntaxListOutput( syntax_output ):
   group_name_to_group = _SyntaxGroupsFromOutput( syntax_output )
   _ConnectGroupChildren( group_name_to_group )
@@ -0,0 +1,145 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+from ycm.tests.test_utils import MockVimModule
+MockVimModule()
+
+import random
+import string
+import time
+import pytest
+from hamcrest import assert_that, contains_exactly, empty, equal_to, less_than
+from unittest.mock import patch
+
+from ycm.candidate_filter import FilterAndSortCandidates
+from ycm.omni_completer import OmniCompleter
+
+
+@pytest.mark.parametrize( 'candidates,query,expected', [
+    # Subsequence match.
+    ( [ 'foobar', 'fbar', 'barfoo' ], 'fb', [ 'fbar', 'foobar' ] ),
+    ( [ 'foobar' ], 'bf', [] ),
+    # Smart case.
+    ( [ 'fooBar', 'foobar' ], 'B', [ 'fooBar' ] ),
+    ( [ 'FOOBAR', 'foobar' ], 'fb', [ 'foobar', 'FOOBAR' ] ),
+    # The first character being matched comes first.
+    ( [ 'xfoo', 'fxoo' ], 'fo', [ 'fxoo', 'xfoo' ] ),
+    # Then word boundaries.
+    ( [ 'foobar', 'foo_bar', 'fooBar' ], 'fb',
+      [ 'fooBar', 'foo_bar', 'foobar' ] ),
+    # Then earlier matches.
+    ( [ 'abxc', 'abcx' ], 'abc', [ 'abcx', 'abxc' ] ),
+    # Then shorter text.
+    ( [ 'abcd', 'abc' ], 'ab', [ 'abc', 'abcd' ] ),
+    # Empty query: the original order is kept.
+    ( [ 'b', 'c', 'a' ], '', [ 'b', 'c', 'a' ] ),
+    # Empty text.
+    ( [ '', 'a' ], '', [ 'a' ] ),
+    ( [ '', 'a' ], 'a', [ 'a' ] ),
+    # Unicode.
+    ( [ 'πππππππ yummy πie', '†est' ], 'ππ', [ 'πππππππ yummy πie' ] ),
+  ] )
+def FilterAndSortCandidates_test( candidates, query, expected ):
+  assert_that( FilterAndSortCandidates( candidates, '', query ),
+               equal_to( expected ) )
+
+
+def FilterAndSortCandidates_SortProperty_test():
+  candidates = [ { 'word': 'foo_bar', 'menu': 'first' },
+                 { 'word': 'foobar', 'menu': 'second' },
+                 { 'word': 'fooBar', 'menu': 'third' } ]
+  assert_that( FilterAndSortCandidates( candidates, 'word', 'fb' ),
+               contains_exactly( candidates[ 2 ],
+                                 candidates[ 0 ],
+                                 candidates[ 1 ] ) )
+
+
+def FilterAndSortCandidates_MaxCandidates_test():
+  candidates = [ 'a', 'ab', 'abc' ]
+  assert_that( FilterAndSortCandidates( candidates, '', 'a', 2 ),
+               contains_exactly( 'a', 'ab' ) )
+  assert_that( FilterAndSortCandidates( candidates, '', 'a', 0 ),
+               contains_exactly( 'a', 'ab', 'abc' ) )
+
+
+@patch( 'ycm.client.base_request.BaseRequest.PostDataToHandler' )
+def OmniCompleter_FilterAndSortCandidatesInner_InProcess_test( post_data ):
+  completer = OmniCompleter( { 'max_num_candidates': 50 } )
+  candidates = [ { 'word': 'foo' }, { 'word': 'bar' } ]
+  assert_that( completer.FilterAndSortCandidatesInner( candidates,
+                                                       'word',
+                                                       'fo' ),
+               contains_exactly( { 'word': 'foo' } ) )
+  post_data.assert_not_called()
+
+
+@patch( 'ycm.client.base_request.BaseRequest.PostDataToHandler',
+        return_value = [] )
+def OmniCompleter_FilterAndSortCandidatesInner_ServerFallback_test(
+    post_data ):
+  completer = OmniCompleter( { 'max_num_candidates': 50 } )
+  candidates = [ { 'abbr': 'foo' } ]
+  assert_that( completer.FilterAndSortCandidatesInner( candidates,
+                                                       'word',
+                                                       'fo' ),
+               empty() )
+  post_data.assert_called_once_with( { 'candidates': candidates,
+                                       'sort_property': 'word',
+                                       'query': 'fo' },
+                                     'filter_and_sort_candidates' )
+
+
+def _IsSubsequence( query, text ):
+  remaining = iter( text )
+  return all( any( char == text_char or
+                   char.islower() and char.upper() == text_char
+                   for text_char in remaining )
+              for char in query )
+
+
+def FilterAndSortCandidates_Benchmark_test():
+  rng = random.Random( 0 )
+  alphabet = string.ascii_letters + '_'
+  candidates = [ {
+    'word': ''.join( rng.choice( alphabet )
+                     for _ in range( rng.randint( 4, 24 ) ) ),
+    'menu': 'menu',
+    'kind': 'f' } for _ in range( 10000 ) ]
+
+  # Typing a word, one keystroke at a time.
+  timings = []
+  for query in [ 'g', 'ge', 'get', 'getT', 'getTe', 'getTex' ]:
+    start = time.perf_counter()
+    results = FilterAndSortCandidates( candidates, 'word', query, 50 )
+    timings.append( time.perf_counter() - start )
+
+    expected = [ candidate for candidate in candidates
+                 if _IsSubsequence( query, candidate[ 'word' ] ) ]
+    assert_that( len( results ), equal_to( min( len( expected ), 50 ) ) )
+    for result in results:
+      assert_that( _IsSubsequence( query, result[ 'word' ] ) )
+
+  # A generous bound, this is a few milliseconds per keystroke on a laptop.
+  assert_that( max( timings ), less_than( 0.5 ) )
+
+
+def FilterAndSortCandidates_NearMiss_test():
+  # The query characters match all but the last one many times.
+  candidates = [ 'a' * 5000 ] * 100
+  start = time.perf_counter()
+  assert_that( FilterAndSortCandidates( candidates, '', 'aaaaaab' ), empty() )
+  assert_that( time.perf_counter() - start, less_than( 0.1 ) )
@@ -0,0 +1,199 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+from ycm.tests.test_utils import MockVimModule
+MockVimModule()
+
+import os
+from hamcrest import assert_that, equal_to, is_not, none
+from unittest.mock import patch
+
+from ycm import capabilities
+from ycm.capabilities import ( CapabilityCache, NO, PENDING,
+                               SEMANTIC_COMPLETION, SIGNATURE_HELP, UNKNOWN,
+                               YES )
+
+
+class FakeRequest:
+  def __init__( self, filetype ):
+    self.filetype = filetype
+    self.response = None
+    self.done = False
+    self.starts = 1
+
+
+  def Start( self, filetype ):
+    self.done = False
+    self.starts += 1
+
+
+  def Done( self ):
+    return self.done
+
+
+  def Response( self ):
+    return self.response
+
+
+class FakeRequests( dict ):
+  def __missing__( self, filetype ):
+    request = FakeRequest( filetype )
+    self[ filetype ] = request
+    return request
+
+
+def _Answer( requests, filetype, response ):
+  requests[ filetype ].response = response
+  requests[ filetype ].done = True
+
+
+def CapabilityCache_Poll_test():
+  cache = CapabilityCache()
+  requests = FakeRequests()
+  assert_that( cache.State( SEMANTIC_COMPLETION, 'cpp' ), equal_to( UNKNOWN ) )
+
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( PENDING ) )
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( PENDING ) )
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'cpp' ),
+               equal_to( False ) )
+
+  _Answer( requests, 'cpp', True )
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( YES ) )
+  assert_that( cache.State( SEMANTIC_COMPLETION, 'cpp' ), equal_to( YES ) )
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'cpp' ),
+               equal_to( True ) )
+  assert_that( requests[ 'cpp' ].starts, equal_to( 1 ) )
+
+  # Each capability is independent.
+  assert_that( cache.State( SIGNATURE_HELP, 'cpp' ), equal_to( UNKNOWN ) )
+
+
+def CapabilityCache_Poll_ServerPending_test():
+  cache = CapabilityCache()
+  requests = FakeRequests()
+  cache.Poll( SIGNATURE_HELP, 'cpp', requests )
+
+  _Answer( requests, 'cpp', 'PENDING' )
+  assert_that( cache.Poll( SIGNATURE_HELP, 'cpp', requests ),
+               equal_to( PENDING ) )
+  assert_that( requests[ 'cpp' ].starts, equal_to( 2 ) )
+
+  _Answer( requests, 'cpp', 'NO' )
+  assert_that( cache.Poll( SIGNATURE_HELP, 'cpp', requests ),
+               equal_to( NO ) )
+  assert_that( cache.Available( SIGNATURE_HELP, 'cpp' ), equal_to( False ) )
+
+
+@patch( 'time.monotonic', return_value = 100 )
+def CapabilityCache_Poll_Failed_test( monotonic ):
+  cache = CapabilityCache()
+  requests = FakeRequests()
+  cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests )
+
+  _Answer( requests, 'cpp', None )
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( UNKNOWN ) )
+  assert_that( cache.Failed( SEMANTIC_COMPLETION, 'cpp' ), equal_to( True ) )
+  # Not sent again for a while.
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( UNKNOWN ) )
+  assert_that( requests, equal_to( {} ) )
+
+  monotonic.return_value = 100 + capabilities.RETRY_FAILED_AFTER
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( PENDING ) )
+  _Answer( requests, 'cpp', False )
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( NO ) )
+  assert_that( cache.Failed( SEMANTIC_COMPLETION, 'cpp' ), equal_to( False ) )
+
+
+def CapabilityCache_WarmStart_test( tmp_path ):
+  path = str( tmp_path / 'capabilities.json' )
+  cache = CapabilityCache( path, 'key' )
+  requests = FakeRequests()
+  for filetype, response in [ ( 'cpp', True ),
+                              ( 'python', False ),
+                              ( 'rust', None ) ]:
+    cache.Poll( SEMANTIC_COMPLETION, filetype, requests )
+    _Answer( requests, filetype, response )
+    cache.Poll( SEMANTIC_COMPLETION, filetype, requests )
+
+  cache = CapabilityCache( path, 'key' )
+  requests = FakeRequests()
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'cpp' ),
+               equal_to( True ) )
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'python' ),
+               equal_to( False ) )
+  # The server still has to answer.
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( PENDING ) )
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'cpp' ),
+               equal_to( True ) )
+
+  # The server knows better.
+  _Answer( requests, 'cpp', False )
+  cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests )
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'cpp' ),
+               equal_to( False ) )
+  assert_that( CapabilityCache( path, 'key' ).Available( SEMANTIC_COMPLETION,
+                                                         'cpp' ),
+               equal_to( False ) )
+
+  # Another server.
+  cache = CapabilityCache( path, 'other key' )
+  cache.Poll( SEMANTIC_COMPLETION, 'python', requests )
+  _Answer( requests, 'python', True )
+  cache.Poll( SEMANTIC_COMPLETION, 'python', requests )
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'python' ),
+               equal_to( True ) )
+
+
+def CapabilityCache_UnreadableFile_test( tmp_path ):
+  path = str( tmp_path / 'capabilities.json' )
+  with open( path, 'w' ) as f:
+    f.write( 'not json' )
+  cache = CapabilityCache( path, 'key' )
+  assert_that( cache.Available( SEMANTIC_COMPLETION, 'cpp' ),
+               equal_to( False ) )
+
+  cache = CapabilityCache( os.path.join( path, 'not a directory' ), 'key' )
+  requests = FakeRequests()
+  cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests )
+  _Answer( requests, 'cpp', True )
+  assert_that( cache.Poll( SEMANTIC_COMPLETION, 'cpp', requests ),
+               equal_to( YES ) )
+
+
+def ServerKey_test( tmp_path ):
+  extra_conf = tmp_path / 'extra_conf.py'
+  extra_conf.write_text( '' )
+  options = { 'global_ycm_extra_conf': str( extra_conf ),
+              'language_server': [] }
+  key = capabilities.ServerKey( options )
+  assert_that( key, is_not( none() ) )
+  assert_that( capabilities.ServerKey( dict( options ) ), equal_to( key ) )
+
+  assert_that( capabilities.ServerKey( dict( options, language_server = [ {
+                 'name': 'server', 'filetypes': [ 'ft' ] } ] ) ),
+               is_not( equal_to( key ) ) )
+
+  os.utime( str( extra_conf ), ( 0, 0 ) )
+  assert_that( capabilities.ServerKey( options ), is_not( equal_to( key ) ) )
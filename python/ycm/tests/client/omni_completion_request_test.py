@@ -21,7 +21,7 @@ from hamcrest import assert_that, has_entries
 from ycm.client.omni_completion_request import OmniCompletionRequest
 
 
-def BuildOmnicompletionRequest( results, start_column = 1 ):
+def BuildOmnicompletionRequest( results, start_column = 1, deferred = False ):
   omni_completer = MagicMock()
   omni_completer.ComputeCandidates = MagicMock( return_value = results )
 
@@ -30,7 +30,9 @@ def BuildOmnicompletionRequest( results, start_column = 1 ):
     'column_num': 1,
     'start_column': start_column
   }
-  request = OmniCompletionRequest( omni_completer, request_data )
+  request = OmniCompletionRequest( omni_completer,
+                                   request_data,
+                                   deferred = deferred )
   request.Start()
 
   return request
@@ -42,6 +44,14 @@ def Done_AlwaysTrue_test():
   assert_that( request.Done() )
 
 
+def Done_Deferred_test():
+  request = BuildOmnicompletionRequest( [], deferred = True )
+
+  assert_that( not request.Done() )
+  request.Run()
+  assert_that( request.Done() )
+
+
 def Response_FromOmniCompleter_test():
   results = [ { "word": "test" } ]
   request = BuildOmnicompletionRequest( results )
@@ -0,0 +1,264 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+from hamcrest import ( assert_that, contains_exactly, equal_to, has_entries,
+                       is_not, none )
+from unittest.mock import MagicMock, patch
+from ycm.tests.test_utils import MockVimModule
+MockVimModule()
+
+from ycm.client.resolve_completion_request import ( ResolveCompletionItem,
+                                                    ResolvedCompletions )
+
+
+class LocalResolver:
+  """Stand-in for the resolve_completion handler of the server. Futures are
+  only done once Finish is called."""
+
+  def __init__( self ):
+    self.resolves = []
+    self.futures = {}
+
+
+  def __call__( self, request_data ):
+    resolve = request_data[ 'resolve' ]
+    self.resolves.append( resolve )
+    future = MagicMock()
+    future.done.return_value = False
+    future.response = {
+      'completion': {
+        'insertion_text': f'item{ resolve }',
+        'detailed_info': f'details of item{ resolve }',
+        'extra_data': {}
+      },
+      'errors': []
+    }
+    self.futures[ resolve ] = future
+    return future
+
+
+  def Finish( self ):
+    for future in self.futures.values():
+      future.done.return_value = True
+
+
+def _Completions( count ):
+  completions = [ { 'word': f'item{ index }',
+                    'user_data': json.dumps( { 'resolve': index } ) }
+                  for index in range( count ) ]
+  # Items without resolve data are skipped.
+  completions.append( { 'word': 'resolved', 'user_data': '{}' } )
+  return completions
+
+
+def _CompletionRequest( filetype = 'ycmtest' ):
+  completion_request = MagicMock()
+  completion_request.Done.return_value = True
+  completion_request.request_data = {
+    'filepath': '/file',
+    'file_data': { '/file': { 'contents': '', 'filetypes': [ filetype ] } }
+  }
+  return completion_request
+
+
+def _JsonFromFuture( future ):
+  return future.response
+
+
+@patch( 'ycm.client.base_request._JsonFromFuture',
+        side_effect = _JsonFromFuture )
+def ResolveCompletionItem_ResolvesItemsAroundSelection_test( *args ):
+  resolver = LocalResolver()
+  cache = ResolvedCompletions()
+  completions = _Completions( 20 )
+
+  request = ResolveCompletionItem( _CompletionRequest(),
+                                   completions[ 10 ],
+                                   completions,
+                                   cache,
+                                   resolver )
+  assert_that( resolver.resolves,
+               contains_exactly( 10, 11, 9, 12, 8, 13, 7, 14, 6, 15, 5 ) )
+  assert_that( request.Done(), equal_to( False ) )
+
+  resolver.Finish()
+  assert_that( request.Done(), equal_to( True ) )
+  assert_that( request.Response(), has_entries( {
+    'completion': has_entries( { 'word': 'item10',
+                                 'info': 'details of item10' } )
+  } ) )
+
+  # The next item was resolved along with the previous one.
+  request = ResolveCompletionItem( _CompletionRequest(),
+                                   completions[ 11 ],
+                                   completions,
+                                   cache,
+                                   resolver )
+  assert_that( request.Done(), equal_to( True ) )
+  assert_that( request.Response(), has_entries( {
+    'completion': has_entries( { 'word': 'item11' } )
+  } ) )
+  assert_that( resolver.resolves[ 11: ], contains_exactly( 16 ) )
+
+
+@patch( 'ycm.client.base_request._JsonFromFuture',
+        side_effect = _JsonFromFuture )
+def ResolveCompletionItem_ResponseIsHandledOnce_test( json_from_future ):
+  resolver = LocalResolver()
+  cache = ResolvedCompletions()
+  completions = _Completions( 3 )
+
+  for _ in range( 3 ):
+    request = ResolveCompletionItem( _CompletionRequest(),
+                                     completions[ 0 ],
+                                     completions,
+                                     cache,
+                                     resolver )
+    resolver.Finish()
+    request.Response()
+  assert_that( resolver.resolves, contains_exactly( 0, 1, 2 ) )
+  assert_that( json_from_future.call_count, equal_to( 1 ) )
+
+
+@patch( 'ycm.client.base_request._JsonFromFuture',
+        side_effect = _JsonFromFuture )
+@patch( 'ycm.client.base_request.DisplayServerException' )
+def ResolveCompletionItem_FailuresAreNotKept_test( display_server_exception,
+                                                   json_from_future ):
+  resolver = LocalResolver()
+  cache = ResolvedCompletions()
+  completions = _Completions( 2 )
+
+  def Resolve( index ):
+    request = ResolveCompletionItem( _CompletionRequest(),
+                                     completions[ index ],
+                                     completions[ : 2 ],
+                                     cache,
+                                     resolver )
+    resolver.Finish()
+    return request
+
+  # The server fails to resolve the first item.
+  json_from_future.side_effect = RuntimeError( 'timeout' )
+  request = Resolve( 0 )
+  assert_that( request.Response(), equal_to( { 'completion': [] } ) )
+  assert_that( request.Response(), equal_to( { 'completion': [] } ) )
+  assert_that( json_from_future.call_count, equal_to( 1 ) )
+  display_server_exception.assert_called_once()
+
+  # It is resolved again when selected again.
+  json_from_future.side_effect = _JsonFromFuture
+  request = Resolve( 0 )
+  assert_that( resolver.resolves, contains_exactly( 0, 1, 0 ) )
+  assert_that( request.Response(), has_entries( {
+    'completion': has_entries( { 'word': 'item0' } )
+  } ) )
+
+  # The second item was resolved with the first one but nothing came back.
+  resolver.futures[ 1 ].response = { 'completion': None }
+  assert_that( Resolve( 1 ).Response(), equal_to( { 'completion': [] } ) )
+  Resolve( 1 )
+  assert_that( resolver.resolves, contains_exactly( 0, 1, 0, 1 ) )
+
+
+def ResolveCompletionItem_NotResolvable_test():
+  resolver = LocalResolver()
+  completions = _Completions( 3 )
+
+  assert_that( ResolveCompletionItem( _CompletionRequest(),
+                                      completions[ -1 ],
+                                      completions,
+                                      ResolvedCompletions(),
+                                      resolver ),
+               none() )
+  assert_that( ResolveCompletionItem( _CompletionRequest(),
+                                      { 'word': 'omni', 'user_data': '' },
+                                      completions,
+                                      ResolvedCompletions(),
+                                      resolver ),
+               none() )
+  assert_that( resolver.resolves, equal_to( [] ) )
+
+
+@patch( 'ycm.client.base_request._JsonFromFuture',
+        side_effect = _JsonFromFuture )
+def ResolveCompletionItem_AcrossCompletionRequests_test( *args ):
+  resolver = LocalResolver()
+  cache = ResolvedCompletions()
+  completions = _Completions( 1 )
+
+  ResolveCompletionItem( _CompletionRequest(),
+                         completions[ 0 ],
+                         completions,
+                         cache,
+                         resolver )
+  resolver.Finish()
+  cache.DropPending()
+
+  # Same item in a later completion request.
+  request = ResolveCompletionItem( _CompletionRequest(),
+                                   completions[ 0 ],
+                                   completions,
+                                   cache,
+                                   resolver )
+  assert_that( request.Done(), equal_to( True ) )
+  assert_that( resolver.resolves, contains_exactly( 0 ) )
+
+  # Another filetype.
+  ResolveCompletionItem( _CompletionRequest( 'other' ),
+                         completions[ 0 ],
+                         completions,
+                         cache,
+                         resolver )
+  # Another item with the same resolve data.
+  other_item = dict( completions[ 0 ], word = 'other' )
+  ResolveCompletionItem( _CompletionRequest(),
+                         other_item,
+                         [ other_item ],
+                         cache,
+                         resolver )
+  assert_that( resolver.resolves, contains_exactly( 0, 0, 0 ) )
+
+  # Requests in flight are only valid for the current completion request.
+  cache.DropPending()
+  assert_that( len( cache ), equal_to( 1 ) )
+
+
+def ResolvedCompletions_IsBounded_test():
+  cache = ResolvedCompletions( max_entries = 2 )
+  cache.Add( 'a', MagicMock() )
+  cache.Add( 'b', MagicMock() )
+  cache.Get( 'a' )
+  cache.Add( 'c', MagicMock() )
+  assert_that( cache.Get( 'b' ), none() )
+  assert_that( cache.Get( 'a' ), is_not( none() ) )
+  assert_that( cache.Get( 'c' ), is_not( none() ) )
+
+  cache.Clear()
+  assert_that( len( cache ), equal_to( 0 ) )
+
+
+@patch( 'time.monotonic', return_value = 100 )
+def ResolvedCompletions_Expire_test( monotonic ):
+  cache = ResolvedCompletions( ttl = 10 )
+  cache.Add( 'a', MagicMock() )
+  monotonic.return_value = 110
+  assert_that( cache.Get( 'a' ), is_not( none() ) )
+  monotonic.return_value = 111
+  assert_that( cache.Get( 'a' ), none() )
+  assert_that( len( cache ), equal_to( 0 ) )
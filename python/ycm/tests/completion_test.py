@@ -40,8 +40,8 @@ def MockCompletionRequest( response_method ):
 
   # We don't want the requests to actually be sent to the server, just have it
   # return success.
-  with patch( 'ycm.client.completer_available_request.'
-              'CompleterAvailableRequest.PostDataToHandler',
+  with patch( 'ycm.youcompleteme.YouCompleteMe.'
+              'FiletypeCompleterExistsForFiletype',
               return_value = True ):
     with patch( 'ycm.client.completion_request.CompletionRequest.'
                 'PostDataToHandlerAsync',
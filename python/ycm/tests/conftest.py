@@ -50,12 +50,16 @@ DEFAULT_CLIENT_OPTIONS = {
   'g:ycm_show_diagnostics_ui': 1,
   'g:ycm_enable_diagnostic_signs': 1,
   'g:ycm_enable_diagnostic_highlighting': 0,
+  'g:ycm_viewport_diagnostics_threshold': 1000,
   'g:ycm_echo_current_diagnostic': 1,
   'g:ycm_filter_diagnostics': {},
   'g:ycm_always_populate_location_list': 0,
   'g:ycm_collect_identifiers_from_tags_files': 0,
   'g:ycm_seed_identifiers_with_syntax': 0,
   'g:ycm_goto_buffer_command': 'same-buffer',
+  'g:ycm_omnifunc_time_budget_ms': 100,
+  'g:ycm_cache_server_capabilities': 0,
+  'g:ycm_cache_syntax_keywords': 0,
   # ycmd options
   'g:ycm_auto_trigger': 1,
   'g:ycm_min_num_of_chars_for_completion': 2,
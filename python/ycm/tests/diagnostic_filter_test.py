@@ -18,8 +18,15 @@
 from ycm.tests.test_utils import MockVimModule
 MockVimModule()
 
-from hamcrest import assert_that, equal_to
+import random
+import string
+import time
+from hamcrest import assert_that, equal_to, has_length, less_than
+from unittest.mock import patch
+
 from ycm.diagnostic_filter import DiagnosticFilter
+from ycm.diagnostic_interface import DiagnosticInterface
+from ycm.tests.test_utils import MockVimBuffers, VimBuffer
 
 
 def _assert_accept_equals( filter, text_or_obj, expected ):
@@ -133,3 +140,72 @@ def CommaSeparatedFiletypes_test():
 
   _assert_rejects( f, 'This is a Taco' )
   _assert_accepts( f, 'This is a Burrito' )
+
+
+def RegexWordIgnoresCase_test():
+  opts = _JavaFilter( { 'regex' : [ 'TACO', 'big Burrito' ] } )
+  f = _CreateFilterForTypes( opts, [ 'java' ] )
+
+  _assert_rejects( f, 'This is a taco' )
+  _assert_rejects( f, 'This is a BIG BURRITO' )
+  _assert_accepts( f, 'This is a Burrito' )
+
+
+def RegexWithBackreference_test():
+  opts = _JavaFilter( { 'regex' : [ 'taco', r'(\w+) \1' ] } )
+  f = _CreateFilterForTypes( opts, [ 'java' ] )
+
+  _assert_rejects( f, 'This is a Taco' )
+  _assert_rejects( f, 'A Burrito Burrito' )
+  _assert_accepts( f, 'A Burrito' )
+
+
+def RegexWithGlobalFlags_test():
+  opts = _JavaFilter( { 'regex' : [ 'taco', '(?s)burrito.*nachos' ] } )
+  f = _CreateFilterForTypes( opts, [ 'java' ] )
+
+  _assert_rejects( f, 'This is a Taco' )
+  _assert_rejects( f, 'This Burrito\nis not Nachos' )
+  _assert_accepts( f, 'This is some Nachos' )
+
+
+def DiagnosticInterface_FiletypesLookedUpOnce_test():
+  current_buffer = VimBuffer( 'buffer', filetype = 'java' )
+  diagnostic_interface = DiagnosticInterface(
+    1, _JavaFilter( { 'regex': 'taco' } ) )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    with patch( 'ycm.vimsupport.GetBufferFiletypes',
+                return_value = [ 'java' ] ) as get_buffer_filetypes:
+      for _ in range( 3 ):
+        assert_that( diagnostic_interface._DiagnosticFilterForBuffer().Filter(
+          [ { 'kind': 'ERROR', 'text': 'Taco' } ] ), has_length( 0 ) )
+      get_buffer_filetypes.assert_called_once_with( 1 )
+
+      diagnostic_interface.UpdateFromFileTypes( [ 'cs' ] )
+      assert_that( diagnostic_interface._DiagnosticFilterForBuffer().Filter(
+        [ { 'kind': 'ERROR', 'text': 'Taco' } ] ), has_length( 1 ) )
+      get_buffer_filetypes.assert_called_once_with( 1 )
+
+
+def DiagnosticFilter_Benchmark_test():
+  rng = random.Random( 0 )
+  regexes = [ ''.join( rng.choice( string.ascii_lowercase )
+                       for _ in range( 8 ) ) for _ in range( 20 ) ]
+  opts = _JavaFilter( { 'regex': regexes, 'level': 'warning' } )
+  f = _CreateFilterForTypes( opts, [ 'java' ] )
+  diagnostics = [ {
+    'kind': rng.choice( [ 'ERROR', 'WARNING' ] ),
+    'text': ' '.join( rng.choice( regexes + [ 'some', 'words' ] * 100 )
+                      for _ in range( 10 ) ) } for _ in range( 10000 ) ]
+
+  start = time.perf_counter()
+  allowed = f.Filter( diagnostics )
+  elapsed = time.perf_counter() - start
+
+  assert_that( allowed, equal_to( [
+    diagnostic for diagnostic in diagnostics
+    if diagnostic[ 'kind' ] != 'WARNING' and
+       not any( regex in diagnostic[ 'text' ] for regex in regexes ) ] ) )
+  # A generous bound, this is about 10 milliseconds on a laptop.
+  assert_that( elapsed, less_than( 0.1 ) )
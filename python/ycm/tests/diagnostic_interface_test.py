@@ -0,0 +1,477 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+from ycm.tests.test_utils import MockVimBuffers, MockVimModule, VimBuffer
+MockVimModule()
+
+import json
+import pytest
+from hamcrest import ( assert_that, contains_exactly, empty, equal_to,
+                       has_length )
+from unittest.mock import patch
+
+from ycm import vimsupport
+from ycm.diagnostic_interface import DiagnosticInterface
+from ycm.tests import test_utils
+from ycm.tests.test_utils import VimProp, VimSign
+
+USER_OPTIONS = {
+  'filter_diagnostics': {},
+  'echo_current_diagnostic': False,
+  'enable_diagnostic_signs': False,
+  'enable_diagnostic_highlighting': True,
+  'viewport_diagnostics_threshold': 0,
+  'always_populate_location_list': False
+}
+
+
+def _Location( filepath, line_num, column_num ):
+  return { 'filepath': filepath,
+           'line_num': line_num,
+           'column_num': column_num }
+
+
+def _Diagnostic( filepath, kind, start, end, ranges = [] ):
+  return {
+    'kind': kind,
+    'text': 'diagnostic',
+    'location': _Location( filepath, *start ),
+    'location_extent': { 'start': _Location( filepath, *start ),
+                         'end': _Location( filepath, *end ) },
+    'ranges': [ { 'start': _Location( filepath, *range_start ),
+                  'end': _Location( filepath, *range_end ) }
+                for range_start, range_end in ranges ]
+  }
+
+
+def DiagnosticInterface_UpdateMatches_test():
+  current_buffer = VimBuffer( 'buffer',
+                              contents = [ 'first line',
+                                           'second line',
+                                           'third line' ] )
+  filepath = current_buffer.name
+  test_utils.VIM_MATCHES_FOR_WINDOW.clear()
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 1, USER_OPTIONS )
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'WARNING', ( 1, 7 ), ( 3, 6 ),
+                   ranges = [ ( ( 3, 7 ), ( 3, 11 ) ) ] ),
+      _Diagnostic( filepath, 'ERROR', ( 2, 1 ), ( 2, 7 ) )
+    ] )
+
+    warning, error = test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ]
+    assert_that( warning.group, equal_to( 'YcmWarningSection' ) )
+    assert_that( warning.positions, contains_exactly(
+      [ 1, 7, 5 ], [ 2 ], [ 3, 1, 5 ], [ 3, 7, 4 ] ) )
+    assert_that( error.group, equal_to( 'YcmErrorSection' ) )
+    assert_that( error.positions, contains_exactly( [ 2, 1, 6 ] ) )
+
+    # Matches are added and removed in a single call each.
+    with patch( 'vim.eval', wraps = test_utils.VIM_MOCK.eval ) as vim_eval:
+      diagnostic_interface.UpdateWithNewDiagnostics( [
+        _Diagnostic( filepath, 'ERROR', ( 2, 1 ), ( 2, 7 ) ),
+        _Diagnostic( filepath, 'ERROR', ( 3, 1 ), ( 3, 6 ) )
+      ] )
+      assert_that( [ args[ 0 ] for args, _ in vim_eval.call_args_list
+                     if args[ 0 ].startswith( 'map(' ) ], has_length( 2 ) )
+
+    assert_that( test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ], contains_exactly(
+      error,
+      test_utils.VimMatch( 'YcmErrorSection', [ [ 3, 1, 5 ] ] ) ) )
+
+    diagnostic_interface.UpdateWithNewDiagnostics( [] )
+    assert_that( test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ], empty() )
+
+
+def DiagnosticInterface_UpdateMatches_ManyPositions_test():
+  current_buffer = VimBuffer( 'buffer',
+                              contents = [ 'line' ] * 20 )
+  filepath = current_buffer.name
+  test_utils.VIM_MATCHES_FOR_WINDOW.clear()
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 1, USER_OPTIONS )
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'ERROR', ( 1, 1 ), ( 20, 3 ) ) ] )
+
+    # A match takes at most 8 positions.
+    assert_that( [ len( match.positions )
+                   for match in test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ] ],
+                 contains_exactly( 8, 8, 4 ) )
+
+
+@pytest.mark.parametrize( 'has_prop_add_list', [ True, False ] )
+@patch( 'ycm.vimsupport.VimSupportsTextProperties', return_value = True )
+def DiagnosticInterface_UpdateMatches_TextProperties_test(
+    vim_supports_text_properties, has_prop_add_list ):
+  current_buffer = VimBuffer( 'current', number = 1 )
+  other_buffer = VimBuffer( 'other',
+                            number = 5,
+                            contents = [ 'first line',
+                                         'second line',
+                                         'third line' ] )
+  filepath = other_buffer.name
+  test_utils.VIM_PROPS_FOR_BUFFER.clear()
+
+  with MockVimBuffers( [ current_buffer, other_buffer ], [ current_buffer ] ):
+    with patch( 'ycm.vimsupport.VimHasFunction',
+                return_value = has_prop_add_list ):
+      diagnostic_interface = DiagnosticInterface( 5, USER_OPTIONS )
+      # Properties are added to buffers that are not displayed.
+      diagnostic_interface.UpdateWithNewDiagnostics( [
+        _Diagnostic( filepath, 'WARNING', ( 1, 7 ), ( 3, 6 ),
+                     ranges = [ ( ( 3, 7 ), ( 3, 20 ) ) ] ),
+        _Diagnostic( filepath, 'ERROR', ( 2, 1 ), ( 2, 1 ) )
+      ] )
+      assert_that( test_utils.VIM_PROPS_FOR_BUFFER[ 5 ], contains_exactly(
+        VimProp( 'YcmWarningSection', 1, 7, 3, 6 ),
+        VimProp( 'YcmWarningSection', 3, 7, 3, 11 ),
+        VimProp( 'YcmErrorSection', 2, 1, 2, 2 ) ) )
+
+      # They don't need to be updated when entering a window.
+      with patch( 'vim.eval', wraps = test_utils.VIM_MOCK.eval ) as vim_eval:
+        diagnostic_interface.UpdateMatches()
+        vim_eval.assert_not_called()
+
+      diagnostic_interface.UpdateWithNewDiagnostics( [
+        _Diagnostic( filepath, 'ERROR', ( 3, 1 ), ( 3, 6 ) ) ] )
+      assert_that( test_utils.VIM_PROPS_FOR_BUFFER[ 5 ], contains_exactly(
+        VimProp( 'YcmErrorSection', 3, 1, 3, 6 ) ) )
+
+      diagnostic_interface.UpdateWithNewDiagnostics( [] )
+      assert_that( test_utils.VIM_PROPS_FOR_BUFFER[ 5 ], empty() )
+
+
+def DiagnosticInterface_UpdateSigns_test():
+  current_buffer = VimBuffer( 'buffer',
+                              number = 5,
+                              contents = [ 'first line',
+                                           'second line',
+                                           'third line' ] )
+  filepath = current_buffer.name
+  vimsupport.SIGN_ID_FOR_BUFFER.clear()
+  initial_id = vimsupport.SIGN_BUFFER_ID_INITIAL_VALUE
+  # Left by a previous version of the buffer.
+  test_utils.VIM_SIGNS = [ VimSign( 1, 3, 'YcmError', 5 ) ]
+  user_options = dict( USER_OPTIONS,
+                       enable_diagnostic_signs = True,
+                       enable_diagnostic_highlighting = False )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 5, user_options )
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'WARNING', ( 1, 1 ), ( 1, 2 ) ),
+      _Diagnostic( filepath, 'ERROR', ( 1, 3 ), ( 1, 4 ) ),
+      _Diagnostic( filepath, 'WARNING', ( 2, 1 ), ( 2, 2 ) )
+    ] )
+    assert_that( test_utils.VIM_SIGNS, contains_exactly(
+      VimSign( initial_id, 1, 'YcmError', 5 ),
+      VimSign( initial_id + 1, 2, 'YcmWarning', 5 ) ) )
+
+    # Only the signs that changed are placed and unplaced, in a single call
+    # each.
+    with patch( 'vim.eval', wraps = test_utils.VIM_MOCK.eval ) as vim_eval:
+      diagnostic_interface.UpdateWithNewDiagnostics( [
+        _Diagnostic( filepath, 'ERROR', ( 1, 3 ), ( 1, 4 ) ),
+        _Diagnostic( filepath, 'ERROR', ( 3, 1 ), ( 3, 2 ) )
+      ] )
+      assert_that( [ args[ 0 ] for args, _ in vim_eval.call_args_list
+                     if args[ 0 ].startswith( 'sign_' ) ], contains_exactly(
+        'sign_unplacelist([{"group": "ycm_signs", "id": 100000001, '
+        '"buffer": 5}])',
+        'sign_placelist([{"group": "ycm_signs", "id": 100000002, '
+        '"name": "YcmError", "buffer": 5, "lnum": 3}])' ) )
+    assert_that( test_utils.VIM_SIGNS, contains_exactly(
+      VimSign( initial_id, 1, 'YcmError', 5 ),
+      VimSign( initial_id + 2, 3, 'YcmError', 5 ) ) )
+
+    # Nothing to do when the signs didn't change.
+    with patch( 'vim.eval', wraps = test_utils.VIM_MOCK.eval ) as vim_eval:
+      diagnostic_interface.UpdateWithNewDiagnostics( [
+        _Diagnostic( filepath, 'ERROR', ( 1, 3 ), ( 1, 4 ) ),
+        _Diagnostic( filepath, 'ERROR', ( 3, 1 ), ( 3, 2 ) )
+      ] )
+      assert_that( [ args[ 0 ] for args, _ in vim_eval.call_args_list
+                     if args[ 0 ].startswith( 'sign_' ) ], empty() )
+
+    diagnostic_interface.UpdateWithNewDiagnostics( [] )
+    assert_that( test_utils.VIM_SIGNS, empty() )
+
+
+@patch( 'ycm.vimsupport.VimSupportsWinScrolled', return_value = True )
+def DiagnosticInterface_Viewport_test( *args ):
+  current_buffer = VimBuffer( 'buffer', contents = [ 'line' ] * 100 )
+  filepath = current_buffer.name
+  test_utils.VIM_SIGNS = []
+  test_utils.VIM_MATCHES_FOR_WINDOW.clear()
+  user_options = dict( USER_OPTIONS,
+                       enable_diagnostic_signs = True,
+                       viewport_diagnostics_threshold = 10 )
+
+  def RenderedLines():
+    sign_lines = [ sign.line for sign in test_utils.VIM_SIGNS ]
+    match_lines = [ match.positions[ 0 ][ 0 ]
+                    for match in test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ] ]
+    assert_that( sorted( match_lines ), equal_to( sorted( sign_lines ) ) )
+    return ( min( sign_lines ), max( sign_lines ) )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ) as vim:
+    vim.windows[ 0 ].visible_lines = ( 41, 50 )
+    diagnostic_interface = DiagnosticInterface( 1, user_options )
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'WARNING', ( line, 1 ), ( line, 2 ) )
+      for line in range( 1, 101 ) ] )
+    # One screen above and below the visible lines.
+    assert_that( RenderedLines(), equal_to( ( 31, 60 ) ) )
+
+    # Nothing to do while the visible lines are rendered.
+    vim.windows[ 0 ].visible_lines = ( 45, 54 )
+    with patch( 'vim.eval', wraps = test_utils.VIM_MOCK.eval ) as vim_eval:
+      diagnostic_interface.OnWinScrolled()
+      assert_that( [ args[ 0 ] for args, _ in vim_eval.call_args_list
+                     if args[ 0 ].startswith( 'sign_' ) ], empty() )
+    assert_that( RenderedLines(), equal_to( ( 31, 60 ) ) )
+
+    vim.windows[ 0 ].visible_lines = ( 81, 90 )
+    diagnostic_interface.OnWinScrolled()
+    assert_that( RenderedLines(), equal_to( ( 71, 100 ) ) )
+
+    # Everything is rendered when there are few diagnostics.
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'WARNING', ( line, 1 ), ( line, 2 ) )
+      for line in range( 1, 100, 10 ) ] )
+    assert_that( test_utils.VIM_SIGNS, has_length( 10 ) )
+    assert_that( RenderedLines(), equal_to( ( 1, 91 ) ) )
+
+
+@patch( 'ycm.vimsupport.VimSupportsWinScrolled', return_value = True )
+def DiagnosticInterface_Viewport_HiddenBuffer_test( *args ):
+  hidden_buffer = VimBuffer( 'hidden', number = 2, contents = [ 'line' ] * 100 )
+  other_buffer = VimBuffer( 'other', number = 1 )
+  filepath = hidden_buffer.name
+  test_utils.VIM_SIGNS = []
+  test_utils.VIM_MATCHES_FOR_WINDOW.clear()
+  user_options = dict( USER_OPTIONS,
+                       enable_diagnostic_signs = True,
+                       viewport_diagnostics_threshold = 10 )
+
+  with MockVimBuffers( [ other_buffer, hidden_buffer ], [ other_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 2, user_options )
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'WARNING', ( line, 1 ), ( line, 2 ) )
+      for line in range( 1, 101 ) ] )
+    assert_that( test_utils.VIM_SIGNS, empty() )
+    assert_that( test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ], empty() )
+
+  # The buffer is entered.
+  with MockVimBuffers( [ other_buffer, hidden_buffer ],
+                       [ hidden_buffer ] ) as vim:
+    vim.windows[ 0 ].visible_lines = ( 41, 50 )
+    diagnostic_interface.UpdateMatches()
+    sign_lines = [ sign.line for sign in test_utils.VIM_SIGNS ]
+    assert_that( ( min( sign_lines ), max( sign_lines ) ),
+                 equal_to( ( 31, 60 ) ) )
+    assert_that( test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ], has_length( 30 ) )
+
+    # And scrolled.
+    vim.windows[ 0 ].visible_lines = ( 81, 90 )
+    diagnostic_interface.OnWinScrolled()
+    sign_lines = [ sign.line for sign in test_utils.VIM_SIGNS ]
+    assert_that( ( min( sign_lines ), max( sign_lines ) ),
+                 equal_to( ( 71, 100 ) ) )
+
+
+def DiagnosticInterface_DiagnosticCounts_test():
+  current_buffer = VimBuffer( 'buffer', contents = [ 'line' ] * 10 )
+  filepath = current_buffer.name
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 1, USER_OPTIONS )
+    assert_that( diagnostic_interface.GetDiagnosticCounts(),
+                 equal_to( { 'error': 0, 'warning': 0 } ) )
+
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'ERROR', ( 1, 1 ), ( 1, 2 ) ),
+      _Diagnostic( filepath, 'ERROR', ( 1, 3 ), ( 1, 4 ) ),
+      _Diagnostic( filepath, 'WARNING', ( 2, 1 ), ( 2, 2 ) ),
+      _Diagnostic( filepath, 'INFORMATION', ( 3, 1 ), ( 3, 2 ) ),
+      # Not in this buffer.
+      _Diagnostic( 'other', 'ERROR', ( 1, 1 ), ( 1, 2 ) )
+    ] )
+
+    # The counts are not computed when requested.
+    with patch.object( diagnostic_interface, '_line_to_diags', None ):
+      assert_that( diagnostic_interface.GetDiagnosticCounts(),
+                   equal_to( { 'error': 2, 'warning': 1 } ) )
+      assert_that( diagnostic_interface.GetErrorCount(), equal_to( 2 ) )
+      assert_that( diagnostic_interface.GetWarningCount(), equal_to( 1 ) )
+
+    diagnostic_interface.UpdateWithNewDiagnostics( [] )
+    assert_that( diagnostic_interface.GetDiagnosticCounts(),
+                 equal_to( { 'error': 0, 'warning': 0 } ) )
+
+
+@patch( 'ycm.vimsupport.PostVimMessage' )
+@patch( 'ycm.vimsupport.EchoTruncatedMessage' )
+def DiagnosticInterface_EchoDiagnostic_test( echo_truncated_message,
+                                             post_vim_message ):
+  current_buffer = VimBuffer( 'buffer', contents = [ 'line' ] * 10 )
+  filepath = current_buffer.name
+  long_diagnostic = _Diagnostic( filepath, 'ERROR', ( 3, 1 ), ( 3, 2 ) )
+  long_diagnostic[ 'text' ] = 'x' * 100
+  options = dict( USER_OPTIONS, echo_current_diagnostic = True )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 1 ) ):
+    diagnostic_interface = DiagnosticInterface( 1, options )
+    diagnostic_interface.UpdateWithNewDiagnostics( [
+      _Diagnostic( filepath, 'ERROR', ( 1, 1 ), ( 1, 2 ) ),
+      long_diagnostic
+    ] )
+    echo_truncated_message.assert_called_once_with( 'diagnostic' )
+
+  # Moving the cursor doesn't query the width of Vim.
+  echo_truncated_message.reset_mock()
+  with patch( 'ycm.vimsupport.GetIntValue' ) as get_int_value:
+    with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 3, 1 ) ):
+      diagnostic_interface.OnCursorMoved()
+    with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 2, 1 ) ):
+      diagnostic_interface.OnCursorMoved()
+  get_int_value.assert_not_called()
+  echo_truncated_message.assert_called_once_with( 'x' * 76 + '...' )
+  post_vim_message.assert_called_once_with( '', warning = False )
+
+  # The text is truncated again after Vim is resized.
+  echo_truncated_message.reset_mock()
+  diagnostic_interface.OnVimResized()
+  with patch.dict( test_utils.VIM_OPTIONS, { '&columns': 50 } ):
+    with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 3, 1 ) ):
+      diagnostic_interface.OnCursorMoved()
+  echo_truncated_message.assert_called_once_with( 'x' * 46 + '...' )
+
+
+def DiagnosticInterface_UpdateWithNewDiagnostics_FewBufferLookups_test():
+  current_buffer = VimBuffer( 'buffer', contents = [ 'line' ] * 1000 )
+  filepaths = [ current_buffer.name, 'not_open', 'other_not_open' ]
+  diagnostics = [ _Diagnostic( filepaths[ line % 3 ], 'ERROR',
+                               ( line // 3 + 1, 1 ), ( line // 3 + 1, 2 ) )
+                  for line in range( 3000 ) ]
+  user_options = dict( USER_OPTIONS,
+                       enable_diagnostic_highlighting = False,
+                       always_populate_location_list = True )
+
+  # Unlike the mocked bufnr(), create buffers for the files that are not open.
+  get_buffer_number = vimsupport.GetBufferNumberForFilename
+
+  def GetBufferNumberForFilename( filename, create_buffer_if_needed = False ):
+    if filename in filepaths[ 1 : ] and create_buffer_if_needed:
+      return filepaths.index( filename ) + 1
+    return get_buffer_number( filename )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 1, user_options )
+    with patch( 'ycm.vimsupport.GetBufferNumberForFilename',
+                side_effect = GetBufferNumberForFilename ) as get_bufnr:
+      with patch( 'ycm.vimsupport.SetLocationListsForBuffer' ):
+        diagnostic_interface.UpdateWithNewDiagnostics( diagnostics )
+      # Once per file, and once more for the files that are not open because
+      # the location list creates their buffer.
+      assert_that( get_bufnr.call_count, equal_to( 5 ) )
+
+
+def DiagnosticInterface_UpdateMatches_ManyDiagnostics_test():
+  contents = [ f'int variable_{ line } = function( argument );'
+               for line in range( 5000 ) ]
+  current_buffer = VimBuffer( 'buffer', contents = contents )
+  filepath = current_buffer.name
+  diagnostics = []
+  for line in range( 1, 5001 ):
+    if line % 10:
+      diagnostics.append( _Diagnostic( filepath, 'WARNING',
+                                       ( line, 5 ), ( line, 13 ),
+                                       ranges = [ ( ( line, 20 ),
+                                                    ( line, 28 ) ) ] ) )
+    else:
+      # Every tenth diagnostic spans a few lines.
+      diagnostics.append( _Diagnostic( filepath, 'ERROR',
+                                       ( line, 17 ),
+                                       ( min( line + 3, 5000 ), 10 ) ) )
+  test_utils.VIM_MATCHES_FOR_WINDOW.clear()
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 1, USER_OPTIONS )
+    with patch( 'vim.eval', wraps = test_utils.VIM_MOCK.eval ) as vim_eval:
+      diagnostic_interface.UpdateWithNewDiagnostics( diagnostics )
+      match_calls = [ args[ 0 ] for args, _ in vim_eval.call_args_list
+                      if 'match' in args[ 0 ] ]
+
+  # Update cost: the matches are read and added in two calls to Vim.
+  assert_that( match_calls, has_length( 2 ) )
+
+  # Redraw cost: Vim checks positions instead of evaluating a regex over the
+  # visible lines for each match, and there is a single match by diagnostic.
+  matches = test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ]
+  assert_that( matches, has_length( 5000 ) )
+  assert_that( all( 0 < len( match.positions ) <=
+                    vimsupport.MATCHADDPOS_MAX_POSITIONS
+                    for match in matches ) )
+
+
+def DiagnosticInterface_UpdateMatchesAndSigns_OnlyApplyChanges_test():
+  count = 1000
+  contents = [ f'int variable_{ line } = function( argument );'
+               for line in range( count ) ]
+  current_buffer = VimBuffer( 'buffer', contents = contents )
+  filepath = current_buffer.name
+
+  def Diagnostics( first_line ):
+    return [ _Diagnostic( filepath,
+                          'ERROR' if line % 3 else 'WARNING',
+                          ( line, 5 ),
+                          ( line, 13 ) )
+             for line in range( first_line, first_line + count ) ]
+
+  test_utils.VIM_MATCHES_FOR_WINDOW.clear()
+  test_utils.VIM_SIGNS = []
+  user_options = dict( USER_OPTIONS, enable_diagnostic_signs = True )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    diagnostic_interface = DiagnosticInterface( 1, user_options )
+    diagnostic_interface.UpdateWithNewDiagnostics( Diagnostics( 1 ) )
+
+    # Half of the diagnostics are the same, the others are new.
+    with patch( 'vim.eval', wraps = test_utils.VIM_MOCK.eval ) as vim_eval:
+      diagnostic_interface.UpdateWithNewDiagnostics(
+        Diagnostics( count // 2 + 1 ) )
+
+    assert_that( test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ], has_length( count ) )
+    assert_that( test_utils.VIM_SIGNS, has_length( count ) )
+
+  def Arguments( regex, group ):
+    return [ json.loads( match.group( group ) )
+             for match in ( regex.search( args[ 0 ] )
+                            for args, _ in vim_eval.call_args_list )
+             if match ]
+
+  # Only the changes are applied, each in a single call to Vim.
+  for regex, group in [ ( test_utils.SIGN_UNPLACELIST_REGEX, 'signs' ),
+                        ( test_utils.SIGN_PLACELIST_REGEX, 'signs' ),
+                        ( test_utils.MATCHDELETE_REGEX, 'ids' ),
+                        ( test_utils.MATCHADDPOS_REGEX, 'matches' ) ]:
+    arguments = Arguments( regex, group )
+    assert_that( arguments, has_length( 1 ) )
+    assert_that( arguments[ 0 ], has_length( count // 2 ) )
@@ -285,6 +285,8 @@ def _Check_FileReadyToParse_Diagnostic_Error( ycm ):
       )
       assert_that( ycm.GetErrorCount(), equal_to( 1 ) )
       assert_that( ycm.GetWarningCount(), equal_to( 0 ) )
+      assert_that( ycm.GetDiagnosticCounts(),
+                   equal_to( { 'error': 1, 'warning': 0 } ) )
 
       # Consequent calls to HandleFileParseRequest shouldn't mess with
       # existing diagnostics, when there is no new parse request.
@@ -335,7 +337,7 @@ def _Check_FileReadyToParse_Diagnostic_Warning( ycm ):
       assert_that(
         test_utils.VIM_SIGNS,
         contains_exactly(
-          VimSign( SIGN_BUFFER_ID_INITIAL_VALUE + 2, 2, 'YcmWarning', 1 )
+          VimSign( SIGN_BUFFER_ID_INITIAL_VALUE + 1, 2, 'YcmWarning', 1 )
         )
       )
       assert_that( ycm.GetErrorCount(), equal_to( 0 ) )
@@ -347,7 +349,7 @@ def _Check_FileReadyToParse_Diagnostic_Warning( ycm ):
       assert_that(
         test_utils.VIM_SIGNS,
         contains_exactly(
-          VimSign( SIGN_BUFFER_ID_INITIAL_VALUE + 2, 2, 'YcmWarning', 1 )
+          VimSign( SIGN_BUFFER_ID_INITIAL_VALUE + 1, 2, 'YcmWarning', 1 )
         )
       )
       assert_that( ycm.GetErrorCount(), equal_to( 0 ) )
@@ -0,0 +1,200 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import assert_that, contains_exactly, empty, equal_to, has_entries
+from random import Random
+from unittest.mock import patch
+
+from ycm.tests.test_utils import MockVimBuffers, MockVimModule, VimBuffer
+MockVimModule()
+
+from ycm import identifier_completer
+from ycm.identifier_completer import BufferIdentifiers, IdentifierCompleter
+from ycm.tests import YouCompleteMeInstance
+
+USER_OPTIONS = {
+  'min_num_of_chars_for_completion': 2,
+  'max_num_identifier_candidates': 10
+}
+
+
+def _Request( query, force_semantic = False ):
+  return { 'query': query, 'force_semantic': force_semantic }
+
+
+def _Words( candidates ):
+  return [ candidate[ 'word' ] for candidate in candidates ]
+
+
+def BufferIdentifiers_Update_OnlyChangedLinesAreTokenized_test():
+  buffer_identifiers = BufferIdentifiers()
+  with patch( 'ycm.identifier_completer._ExtractIdentifiers',
+              wraps = identifier_completer._ExtractIdentifiers ) as extract:
+    buffer_identifiers.Update( [ 'foo bar', 'foo baz', 'foo bar' ], 1, 'ft' )
+    assert_that( extract.call_count, equal_to( 2 ) )
+    assert_that( buffer_identifiers.identifiers,
+                 equal_to( { 'foo': 3, 'bar': 2, 'baz': 1 } ) )
+
+    # Same changedtick: nothing to do.
+    buffer_identifiers.Update( [ 'qux' ], 1, 'ft' )
+    assert_that( extract.call_count, equal_to( 2 ) )
+
+    buffer_identifiers.Update( [ 'foo bar', 'foo qux' ], 2, 'ft' )
+    assert_that( extract.call_count, equal_to( 3 ) )
+    assert_that( buffer_identifiers.identifiers,
+                 equal_to( { 'foo': 2, 'bar': 1, 'qux': 1 } ) )
+
+    # Another filetype may use another identifier regex.
+    buffer_identifiers.Update( [ 'foo bar', 'foo qux' ], 2, 'other' )
+    assert_that( extract.call_count, equal_to( 5 ) )
+
+
+@patch( 'ycm.vimsupport.VimSupportsListeners', return_value = True )
+@patch( 'ycm.vimsupport.TrackLineChanges', return_value = 7 )
+@patch( 'ycm.vimsupport.PopLineChanges' )
+def BufferIdentifiers_Update_ListenerChanges_test( pop_line_changes,
+                                                   track_line_changes,
+                                                   *args ):
+  buffer_identifiers = BufferIdentifiers( 3 )
+  lines = [ 'foo bar', 'foo baz', 'qux' ]
+  with patch( 'ycm.identifier_completer._ExtractIdentifiers',
+              wraps = identifier_completer._ExtractIdentifiers ) as extract:
+    buffer_identifiers.Update( lines, 1, 'ft' )
+    track_line_changes.assert_called_once_with( 3 )
+    assert_that( extract.call_count, equal_to( 3 ) )
+
+    # Line 2 is changed and a line is inserted after line 3.
+    lines[ 1 : ] = [ 'foo', 'qux', 'quux' ]
+    pop_line_changes.return_value = [ [ 2, 3, 0 ], [ 4, 4, 1 ] ]
+    extract.reset_mock()
+    buffer_identifiers.Update( lines, 2, 'ft' )
+    pop_line_changes.assert_called_once_with( 3 )
+    assert_that( extract.call_count, equal_to( 3 ) )
+    assert_that( buffer_identifiers.identifiers,
+                 equal_to( { 'foo': 2, 'bar': 1, 'qux': 1, 'quux': 1 } ) )
+
+    # Too many changes to be recorded.
+    lines[ : ] = [ 'foo bar', 'other' ]
+    pop_line_changes.return_value = None
+    extract.reset_mock()
+    buffer_identifiers.Update( lines, 3, 'ft' )
+    assert_that( extract.call_count, equal_to( 1 ) )
+    assert_that( buffer_identifiers.identifiers,
+                 equal_to( { 'foo': 1, 'bar': 1, 'other': 1 } ) )
+  track_line_changes.assert_called_once_with( 3 )
+
+
+def MergeLineChanges_test():
+  random = Random( 0 )
+  for _ in range( 200 ):
+    old_lines = [ str( number ) for number in range( random.randint( 1, 10 ) ) ]
+    lines = list( old_lines )
+    changes = []
+    for _ in range( random.randint( 1, 5 ) ):
+      # Replace some lines by others, like a listener reports it.
+      start = random.randint( 0, len( lines ) )
+      end = random.randint( start, len( lines ) )
+      new_lines = [ f'new{ random.random() }'
+                    for _ in range( random.randint( 0, 3 ) ) ]
+      lines[ start : end ] = new_lines
+      changes.append( [ start + 1, end + 1, len( new_lines ) - end + start ] )
+
+    start, old_end, new_end = identifier_completer._MergeLineChanges( changes )
+    assert_that( old_lines[ : start ] + lines[ start : new_end ] +
+                 old_lines[ old_end : ],
+                 equal_to( lines ) )
+
+
+@patch( 'ycm.vimsupport.VimSupportsListeners', return_value = True )
+@patch( 'ycm.vimsupport.TrackLineChanges', return_value = 7 )
+@patch( 'ycm.vimsupport.StopTrackingLineChanges' )
+def IdentifierCompleter_StopTrackingLineChanges_test(
+    stop_tracking_line_changes, *args ):
+  completer = IdentifierCompleter( USER_OPTIONS )
+  current_buffer = VimBuffer( 'current',
+                              number = 1,
+                              filetype = 'ycmtest',
+                              contents = [ 'foo' ] )
+  other_buffer = VimBuffer( 'other',
+                            number = 2,
+                            filetype = 'ycmtest',
+                            contents = [ 'foo' ] )
+  with MockVimBuffers( [ current_buffer, other_buffer ],
+                       [ current_buffer, other_buffer ] ):
+    completer.ComputeCandidates( _Request( 'fo' ) )
+  stop_tracking_line_changes.assert_not_called()
+
+  # The other buffer is no longer visible.
+  with patch( 'ycm.vimsupport.PopLineChanges', return_value = [] ):
+    with MockVimBuffers( [ current_buffer, other_buffer ],
+                         [ current_buffer ] ):
+      completer.ComputeCandidates( _Request( 'fo' ) )
+  stop_tracking_line_changes.assert_called_once_with( 2, 7 )
+
+  stop_tracking_line_changes.reset_mock()
+  completer.Reset()
+  stop_tracking_line_changes.assert_called_once_with( 1, 7 )
+
+
+def IdentifierCompleter_ComputeCandidates_test():
+  completer = IdentifierCompleter( USER_OPTIONS )
+  current_buffer = VimBuffer( 'current',
+                              number = 1,
+                              filetype = 'ycmtest',
+                              contents = [ 'foo_bar = fooBar + fb', 'fb' ] )
+  other_buffer = VimBuffer( 'other',
+                            number = 2,
+                            filetype = 'ycmtest',
+                            contents = [ 'xfyb foo' ] )
+  other_filetype_buffer = VimBuffer( 'other_filetype',
+                                     number = 3,
+                                     filetype = 'another',
+                                     contents = [ 'fb_other' ] )
+  buffers = [ current_buffer, other_buffer, other_filetype_buffer ]
+  with MockVimBuffers( buffers, buffers ):
+    assert_that( _Words( completer.ComputeCandidates( _Request( 'fb' ) ) ),
+                 contains_exactly( 'fooBar', 'foo_bar', 'xfyb' ) )
+    assert_that( _Words( completer.ComputeCandidates( _Request( 'fB' ) ) ),
+                 contains_exactly( 'fooBar' ) )
+    assert_that( completer.ComputeCandidates( _Request( 'f' ) ), empty() )
+    assert_that( _Words( completer.ComputeCandidates(
+                   _Request( 'f', force_semantic = True ) ) ),
+                 contains_exactly( 'fb', 'foo', 'fooBar', 'foo_bar', 'xfyb' ) )
+
+    current_buffer.contents = [ 'fbar' ]
+    current_buffer.changedtick += 1
+    assert_that( _Words( completer.ComputeCandidates( _Request( 'fb' ) ) ),
+                 contains_exactly( 'fbar', 'xfyb' ) )
+
+
+@YouCompleteMeInstance()
+def YouCompleteMe_SendCompletionRequest_ServerNotReady_test( ycm ):
+  current_buffer = VimBuffer( 'current',
+                              filetype = 'ycmtest',
+                              contents = [ 'identifier', 'id' ] )
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 2, 2 ) ):
+    with patch.object( ycm, 'IsServerReady', return_value = False ):
+      ycm.SendCompletionRequest()
+      assert_that( ycm.CompletionRequestReady() )
+      assert_that(
+        ycm.GetCompletionResponse(),
+        has_entries( {
+          'completions': contains_exactly(
+            has_entries( { 'word': 'identifier', 'menu': '[ID]' } ) ),
+          'completion_start_column': 1
+        } )
+      )
@@ -17,13 +17,17 @@
 # You should have received a copy of the GNU General Public License
 # along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
 
-from hamcrest import assert_that, contains_exactly, empty, has_entries
+from hamcrest import ( assert_that, contains_exactly, empty, equal_to,
+                       has_entries )
 import pytest
+from unittest.mock import patch
 
 from ycm.tests.test_utils import MockVimBuffers, MockVimModule, VimBuffer
 MockVimModule()
 
 from ycm import vimsupport
+from ycm.omni_completer import ( OmniCompleter, OmnifuncCache,
+                                 OmnifuncTimings )
 from ycm.tests import YouCompleteMeInstance
 
 FILETYPE = 'ycmtest'
@@ -944,3 +948,161 @@ def OmniCompleter_GetCompletions_AllFiletypesDisabled_ForceSemantic_test( ycm ):
         'completion_start_column': 6
       } )
     )
+
+
+def _CompletionWords( ycm ):
+  return [ completion[ 'word' ]
+           for completion in ycm.GetCompletionResponse()[ 'completions' ] ]
+
+
+@YouCompleteMeInstance( { 'g:ycm_cache_omnifunc': 1,
+                          'g:ycm_semantic_triggers': TRIGGERS } )
+def OmniCompleter_GetCompletions_Cache_SurvivesQueryNarrowing_test( ycm ):
+  calls = []
+
+  def Omnifunc( findstart, base ):
+    calls.append( ( findstart, base ) )
+    if findstart:
+      return 5
+    return [ 'a', 'ab', 'abc' ]
+
+  current_buffer = VimBuffer( 'buffer',
+                              contents = [ 'test.' ],
+                              filetype = FILETYPE,
+                              omnifunc = Omnifunc )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 5 ) ):
+    ycm.SendCompletionRequest()
+    assert_that( _CompletionWords( ycm ),
+                 contains_exactly( 'a', 'ab', 'abc' ) )
+
+  current_buffer.contents = [ 'test.ab' ]
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 7 ) ):
+    ycm.SendCompletionRequest()
+    assert_that( _CompletionWords( ycm ), contains_exactly( 'ab', 'abc' ) )
+
+  assert_that( calls, contains_exactly( ( 1, '' ), ( 0, '' ) ) )
+  assert_that( ycm._omnicomp.Stats(),
+               has_entries( { 'cache_hits': 1, 'cache_misses': 1 } ) )
+
+  # Typing before the start column makes the results stale.
+  current_buffer.contents = [ 'tast.ab' ]
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 7 ) ):
+    ycm.SendCompletionRequest()
+    assert_that( _CompletionWords( ycm ), contains_exactly( 'ab', 'abc' ) )
+  assert_that( len( calls ), equal_to( 4 ) )
+
+  # So do changes elsewhere in the buffer.
+  ycm.OnFileReadyToParse()
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 7 ) ):
+    ycm.SendCompletionRequest()
+    assert_that( _CompletionWords( ycm ), contains_exactly( 'ab', 'abc' ) )
+  assert_that( len( calls ), equal_to( 6 ) )
+
+
+@YouCompleteMeInstance( { 'g:ycm_cache_omnifunc': 0,
+                          'g:ycm_semantic_triggers': TRIGGERS } )
+def OmniCompleter_GetCompletions_NoCache_QueryIsNotCached_test( ycm ):
+  calls = []
+
+  def Omnifunc( findstart, base ):
+    calls.append( ( findstart, base ) )
+    if findstart:
+      return 5
+    return [ base + 'c' ]
+
+  current_buffer = VimBuffer( 'buffer',
+                              contents = [ 'test.a' ],
+                              filetype = FILETYPE,
+                              omnifunc = Omnifunc )
+
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 6 ) ):
+    ycm.SendCompletionRequest()
+    assert_that( _CompletionWords( ycm ), contains_exactly( 'ac' ) )
+    # Same query, nothing changed.
+    ycm.SendCompletionRequest()
+    assert_that( _CompletionWords( ycm ), contains_exactly( 'ac' ) )
+  assert_that( len( calls ), equal_to( 2 ) )
+
+  # The omnifunc is asked again for a new query.
+  current_buffer.contents = [ 'test.ab' ]
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 7 ) ):
+    ycm.SendCompletionRequest()
+    assert_that( _CompletionWords( ycm ), contains_exactly( 'abc' ) )
+  assert_that( calls[ 2: ], contains_exactly( ( 1, '' ), ( 0, 'ab' ) ) )
+
+
+def OmnifuncCache_test():
+  cache = OmnifuncCache()
+  assert_that( cache.Get( 'key' ), equal_to( None ) )
+  cache.Update( 'key', ( 1, [ 'a' ] ) )
+  assert_that( cache.Peek( 'key' ), equal_to( ( 1, [ 'a' ] ) ) )
+  assert_that( cache.Get( 'key' ), equal_to( ( 1, [ 'a' ] ) ) )
+  assert_that( ( cache.hits, cache.misses ), equal_to( ( 1, 1 ) ) )
+
+  for i in range( OmnifuncCache.MAX_ENTRIES ):
+    cache.Update( i, ( 1, [] ) )
+  assert_that( cache.Peek( 'key' ), equal_to( None ) )
+  assert_that( cache.Peek( 0 ), equal_to( ( 1, [] ) ) )
+
+  cache.Invalidate()
+  assert_that( cache.Peek( 0 ), equal_to( None ) )
+
+
+def OmnifuncTimings_test():
+  timings = OmnifuncTimings()
+  timings.Record( 0.01, 0.1 )
+  timings.Record( 0.2, 0.1 )
+  timings.Record( 0.03, 0 )
+  assert_that( timings.Stats(), has_entries( {
+    'mode': OmnifuncTimings.SYNCHRONOUS,
+    'calls': 3,
+    'average_ms': pytest.approx( 80 ),
+    'last_ms': pytest.approx( 30 ),
+    'max_ms': pytest.approx( 200 ),
+    'over_budget': 1
+  } ) )
+
+
+@patch( 'ycm.vimsupport.PostVimMessage' )
+def OmniCompleter_SlowOmnifunc_IsDeferredThenDisabled_test( post_vim_message ):
+  completer = OmniCompleter( { 'omnifunc_time_budget_ms': 100 } )
+  request_data = { 'first_filetype': FILETYPE }
+  other_request_data = { 'first_filetype': 'other' }
+
+  # A single slow call is not enough.
+  for duration in [ 0.2, 0.2, 0.01, 0.2, 0.2 ]:
+    completer._RecordOmnifuncDuration( request_data, duration )
+  assert_that( completer.ShouldDefer( request_data ), equal_to( False ) )
+
+  completer._RecordOmnifuncDuration( request_data, 0.2 )
+  assert_that( completer.ShouldDefer( request_data ), equal_to( True ) )
+  assert_that( completer.ShouldDefer( other_request_data ), equal_to( False ) )
+
+  # Once deferred, the omnifunc may be somewhat slower than the budget.
+  for _ in range( 3 ):
+    completer._RecordOmnifuncDuration( request_data, 0.5 )
+  assert_that( completer.ShouldDefer( request_data ), equal_to( True ) )
+  post_vim_message.assert_not_called()
+
+  for _ in range( 3 ):
+    completer._RecordOmnifuncDuration( request_data, 2 )
+  assert_that( completer.ShouldDefer( request_data ), equal_to( False ) )
+  assert_that( completer.Stats()[ 'timings' ], has_entries( {
+    FILETYPE: has_entries( { 'mode': OmnifuncTimings.DISABLED,
+                             'calls': 12,
+                             'over_budget': 11 } )
+  } ) )
+  post_vim_message.assert_called_once()
+
+
+def OmniCompleter_NoTimeBudget_test():
+  completer = OmniCompleter( { 'omnifunc_time_budget_ms': 0 } )
+  request_data = { 'first_filetype': FILETYPE }
+  for _ in range( 10 ):
+    completer._RecordOmnifuncDuration( request_data, 10 )
+  assert_that( completer.ShouldDefer( request_data ), equal_to( False ) )
+  assert_that( completer.Stats()[ 'timings' ][ FILETYPE ],
+               has_entries( { 'mode': OmnifuncTimings.SYNCHRONOUS,
+                              'calls': 10,
+                              'over_budget': 0 } ) )
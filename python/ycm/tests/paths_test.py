@@ -18,9 +18,12 @@
 from ycm.tests.test_utils import MockVimModule
 MockVimModule()
 
+import os
 import pytest
-from hamcrest import assert_that
-from ycm.paths import _EndsWithPython
+from hamcrest import ( assert_that, calling, contains_exactly,
+                       contains_inanyorder, equal_to, raises )
+from unittest.mock import patch
+from ycm.paths import _EndsWithPython, PathToCacheFile, WriteFileAtomically
 
 
 def EndsWithPython_Good( path ):
@@ -53,3 +56,34 @@ def EndsWithPython_Python3Paths_test( path ):
   ] )
 def EndsWithPython_BadPaths_test( path ):
   EndsWithPython_Bad( path )
+
+
+@patch( 'ycmd.utils.OnWindows', return_value = False )
+def PathToCacheFile_test( *args ):
+  with patch.dict( os.environ, { 'XDG_CACHE_HOME': '/xdg/cache' } ):
+    assert_that( PathToCacheFile( 'file.json' ),
+                 equal_to( os.path.join( '/xdg/cache', 'ycm', 'file.json' ) ) )
+
+  # Relative paths are ignored.
+  with patch.dict( os.environ, { 'XDG_CACHE_HOME': 'cache' } ):
+    assert_that( PathToCacheFile( 'file.json' ),
+                 equal_to( os.path.join( os.path.expanduser( '~' ), '.cache',
+                                         'ycm', 'file.json' ) ) )
+
+
+def WriteFileAtomically_test( tmp_path ):
+  path = str( tmp_path / 'ycm' / 'file.json' )
+  WriteFileAtomically( path, 'first' )
+  WriteFileAtomically( path, 'second' )
+  with open( path ) as f:
+    assert_that( f.read(), equal_to( 'second' ) )
+  assert_that( os.listdir( str( tmp_path / 'ycm' ) ),
+               contains_exactly( 'file.json' ) )
+
+  # The file can't replace a directory.
+  os.mkdir( str( tmp_path / 'ycm' / 'directory' ) )
+  assert_that( calling( WriteFileAtomically ).with_args(
+                 str( tmp_path / 'ycm' / 'directory' ), 'contents' ),
+               raises( OSError ) )
+  assert_that( os.listdir( str( tmp_path / 'ycm' ) ),
+               contains_inanyorder( 'file.json', 'directory' ) )
@@ -0,0 +1,70 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+from ycm.tests.test_utils import MockVimModule
+MockVimModule()
+
+from hamcrest import assert_that, contains_exactly, empty, equal_to
+from unittest.mock import MagicMock
+
+from ycm.client.messages_request import _HandlePollResponse
+from ycm.pending_diagnostics import MAX_PENDING_TICKS, PendingDiagnostics
+
+
+def PendingDiagnostics_LatestAppliedOnIdleTick_test():
+  pending = PendingDiagnostics()
+  pending.UpdateWithNewDiagnosticsForFile( '/a', [ 'first' ] )
+  pending.UpdateWithNewDiagnosticsForFile( '/a', [ 'second' ] )
+  pending.UpdateWithNewDiagnosticsForFile( '/b', [ 'first' ] )
+  # Nothing is applied during the tick the diagnostics were received.
+  assert_that( pending.PopIdle(), empty() )
+
+  pending.UpdateWithNewDiagnosticsForFile( '/b', [ 'third' ] )
+  assert_that( pending.PopIdle(), contains_exactly( ( '/a', [ 'second' ] ) ) )
+  assert_that( pending.PopIdle(), contains_exactly( ( '/b', [ 'third' ] ) ) )
+  assert_that( pending.PopIdle(), empty() )
+  assert_that( len( pending ), equal_to( 0 ) )
+  assert_that( pending.dropped, equal_to( 2 ) )
+
+
+def PendingDiagnostics_AppliedAfterMaxTicks_test():
+  pending = PendingDiagnostics()
+  for tick in range( MAX_PENDING_TICKS ):
+    pending.UpdateWithNewDiagnosticsForFile( '/a', [ tick ] )
+    assert_that( pending.PopIdle(), empty() )
+
+  pending.UpdateWithNewDiagnosticsForFile( '/a', [ 'last' ] )
+  assert_that( pending.PopIdle(), contains_exactly( ( '/a', [ 'last' ] ) ) )
+  assert_that( pending.dropped, equal_to( MAX_PENDING_TICKS ) )
+
+
+def PendingDiagnostics_HandlePollResponse_test():
+  pending = PendingDiagnostics()
+  diagnostics_handler = MagicMock()
+  # A burst of notifications for the same file in a single response.
+  _HandlePollResponse( [
+    { 'filepath': '/a', 'diagnostics': [ 'first' ] },
+    { 'filepath': '/a', 'diagnostics': [ 'second' ] },
+    { 'filepath': '/a', 'diagnostics': [ 'third' ] }
+  ], pending )
+  pending.PopIdle()
+
+  for filepath, diagnostics in pending.PopIdle():
+    diagnostics_handler.UpdateWithNewDiagnosticsForFile( filepath, diagnostics )
+  diagnostics_handler.UpdateWithNewDiagnosticsForFile.assert_called_once_with(
+    '/a', [ 'third' ] )
+  assert_that( pending.dropped, equal_to( 2 ) )
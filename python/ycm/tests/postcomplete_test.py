@@ -26,6 +26,7 @@ from hamcrest import assert_that, contains_exactly, empty, equal_to, none
 from unittest.mock import MagicMock, DEFAULT, patch
 
 from ycm import vimsupport
+from ycm.client import completion_request
 from ycmd.utils import ToBytes
 from ycm.client.completion_request import ( CompletionRequest,
                                             _FilterToMatchingCompletions,
@@ -204,6 +205,18 @@ def FilterToCompletedCompletions_Unicode_test():
   assert_that( list( result ), contains_exactly( {} ) )
 
 
+def FilterToCompletedCompletions_DuplicatesAreReturnedInOrder_test():
+  completions = [ BuildCompletion( insertion_text = 'Test',
+                                   extra_data = { 'n': 1 } ),
+                  BuildCompletion( insertion_text = 'Other',
+                                   extra_data = { 'n': 2 } ),
+                  BuildCompletion( insertion_text = 'Test',
+                                   extra_data = { 'n': 3 } ) ]
+  result = _FilterToMatchingCompletions( CompleteItemIs( 'Test', 'Test' ),
+                                         completions )
+  assert_that( list( result ), contains_exactly( { 'n': 1 }, { 'n': 3 } ) )
+
+
 def GetRequiredNamespaceImport_ReturnNoneForNoExtraData_test():
   assert_that( _GetRequiredNamespaceImport( {} ), none() )
 
@@ -434,3 +447,36 @@ def PostCompleteFixIt_ApplyFixIt_PickSecond_test( replace_chunks, *args ):
   with _SetUpCompleteDone( completions ) as request:
     request._OnCompleteDone_FixIt()
     replace_chunks.assert_called_once_with( 'two', silent = True )
+
+
+@patch( 'ycm.vimsupport.GetVariableValue',
+        GetVariableValue_CompleteItemIs( 'Test', 'Test' ) )
+def GetExtraDataUserMayHaveCompleted_ConvertsCompletionsOnce_test( *args ):
+  completions = [ BuildCompletionNamespace( 'namespace1' ),
+                  BuildCompletion( insertion_text = 'Other' ) ]
+  with _SetUpCompleteDone( completions ) as request:
+    with patch( 'ycm.client.completion_request.'
+                'ConvertCompletionDataToVimData',
+                wraps = completion_request.ConvertCompletionDataToVimData ) \
+        as convert:
+      for _ in range( 3 ):
+        assert_that( request._GetExtraDataUserMayHaveCompleted(),
+                     contains_exactly( completions[ 0 ][ 'extra_data' ] ) )
+      assert_that( convert.call_count, equal_to( len( completions ) ) )
+
+
+@patch( 'ycm.vimsupport.TextAfterCursor', return_value = '' )
+def CompletionRequest_ResponseIsHandledOnce_test( *args ):
+  request = CompletionRequest( { 'line_num': 1, 'column_num': 1 } )
+  request._response_future = MagicMock()
+  completions = [ BuildCompletion( insertion_text = 'Test' ) ]
+  with patch.object( request, 'HandleFuture',
+                     return_value = { 'completions': completions,
+                                      'completion_start_column': 1 } ) \
+      as handle_future:
+    first = request.Response()
+    # Callers may modify the returned items (e.g. to number them).
+    first[ 'completions' ][ 0 ][ 'abbr' ] = '1 Test'
+    second = request.Response()
+    assert_that( second[ 'completions' ][ 0 ][ 'abbr' ], equal_to( 'Test' ) )
+    handle_future.assert_called_once()
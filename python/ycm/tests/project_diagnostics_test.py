@@ -0,0 +1,99 @@
+# Copyright (C) 2026 YouCompleteMe contributors
+#
+# This file is part of YouCompleteMe.
+#
+# YouCompleteMe is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# YouCompleteMe is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
+
+from ycm.tests.test_utils import MockVimModule
+MockVimModule()
+
+from hamcrest import assert_that, contains_exactly, empty, equal_to, none
+
+from ycm.project_diagnostics import ProjectDiagnostics
+
+
+def _Diagnostic( filepath, kind, line_num ):
+  return { 'kind': kind,
+           'text': f'{ kind } at { line_num }',
+           'location': { 'filepath': filepath,
+                         'line_num': line_num,
+                         'column_num': 1 } }
+
+
+def ProjectDiagnostics_IndexedByFileAndKind_test():
+  store = ProjectDiagnostics()
+  b_warning = _Diagnostic( '/b', 'WARNING', 1 )
+  b_error = _Diagnostic( '/b', 'ERROR', 2 )
+  a_error = _Diagnostic( '/a', 'ERROR', 3 )
+  store.Update( '/b', [ b_warning, b_error ] )
+  store.Update( '/a', [ a_error ] )
+
+  assert_that( store.Count(), equal_to( 3 ) )
+  assert_that( store.Count( 'ERROR' ), equal_to( 2 ) )
+  assert_that( store.Count( 'WARNING' ), equal_to( 1 ) )
+  # Sorted by file, errors first.
+  assert_that( store.Diagnostics(),
+               contains_exactly( a_error, b_error, b_warning ) )
+  assert_that( store.Diagnostics( 'WARNING' ), contains_exactly( b_warning ) )
+
+  # No diagnostics left for a file.
+  store.Update( '/b', [] )
+  assert_that( store.Count(), equal_to( 1 ) )
+  assert_that( store.Diagnostics(), contains_exactly( a_error ) )
+
+
+def ProjectDiagnostics_PopPending_test():
+  store = ProjectDiagnostics()
+  diagnostic = _Diagnostic( '/a', 'ERROR', 1 )
+
+  store.Update( '/a', [ diagnostic ] )
+  assert_that( store.PopPending( '/a' ), none() )
+
+  store.Update( '/a', [ diagnostic ], pending = True )
+  assert_that( store.PopPending( '/a' ), contains_exactly( diagnostic ) )
+  # Only once, but they are still listed.
+  assert_that( store.PopPending( '/a' ), none() )
+  assert_that( store.Diagnostics(), contains_exactly( diagnostic ) )
+
+  assert_that( store.PopPending( '/b' ), none() )
+
+
+def ProjectDiagnostics_Bounded_test():
+  store = ProjectDiagnostics( max_diagnostics = 4 )
+  store.Update( '/a', [ _Diagnostic( '/a', 'ERROR', 1 ),
+                        _Diagnostic( '/a', 'ERROR', 2 ) ] )
+  store.Update( '/b', [ _Diagnostic( '/b', 'ERROR', 1 ) ] )
+  # Updating a file makes it the most recent one.
+  store.Update( '/a', [ _Diagnostic( '/a', 'ERROR', 3 ),
+                        _Diagnostic( '/a', 'ERROR', 4 ) ] )
+  c_diagnostics = [ _Diagnostic( '/c', 'ERROR', 1 ),
+                    _Diagnostic( '/c', 'ERROR', 2 ) ]
+  store.Update( '/c', c_diagnostics )
+
+  assert_that( store.Count(), equal_to( 4 ) )
+  assert_that( [ diagnostic[ 'location' ][ 'filepath' ]
+                 for diagnostic in store.Diagnostics() ],
+               contains_exactly( '/a', '/a', '/c', '/c' ) )
+
+  # The most severe diagnostics of a file with too many are kept.
+  store.Update( '/d', [ _Diagnostic( '/d', 'WARNING', line )
+                        for line in range( 10 ) ] +
+                      [ _Diagnostic( '/d', 'ERROR', 11 ) ] )
+  assert_that( store.Count(), equal_to( 4 ) )
+  assert_that( store.Count( 'ERROR' ), equal_to( 1 ) )
+  assert_that( store.Diagnostics()[ 0 ][ 'kind' ], equal_to( 'ERROR' ) )
+
+  store.Clear()
+  assert_that( store.Diagnostics(), empty() )
+  assert_that( store.Count(), equal_to( 0 ) )
@@ -16,7 +16,12 @@
 # along with YouCompleteMe.  If not, see <http://www.gnu.org/licenses/>.
 
 from hamcrest import ( assert_that,
-                       empty )
+                       empty,
+                       equal_to,
+                       has_entries,
+                       none )
+import pytest
+from unittest.mock import patch
 from ycm import signature_help as sh
 
 
@@ -34,3 +39,85 @@ def MakeSignatureHelpBuffer_Empty_test():
   assert_that( sh._MakeSignatureHelpBuffer( {
     'signatures': []
   } ), empty() )
+
+
+@pytest.mark.parametrize( 'text,expected', [
+  ( '', 0 ),
+  ( 'a', 0 ),
+  ( 'a, b', 1 ),
+  ( 'a, f( b, c ), [ d, e ], { f, g },', 4 ),
+  ( 'a, "b, c", \'d,\', "\\\\", e', 4 ),
+  # Leaving the call.
+  ( 'a, b )', None ),
+  # Inside a nested call or a string.
+  ( 'a, f( b', None ),
+  ( 'a, "b', None ),
+] )
+def CountArgumentsStarted_test( text, expected ):
+  assert_that( sh._CountArgumentsStarted( text ), equal_to( expected ) )
+
+
+SIGNATURE_INFO = {
+  'activeSignature': 0,
+  'activeParameter': 1,
+  'signatures': [ {
+    'label': 'f( int a, int b, int c )',
+    'parameters': [
+      { 'label': [ 3, 8 ] },
+      { 'label': [ 10, 15 ] },
+      { 'label': [ 17, 22 ] }
+    ]
+  } ]
+}
+
+
+def ActiveParameterTracker_test():
+  tracker = sh.ActiveParameterTracker()
+  assert_that( tracker.Track( 0, 'f( a, b', 7 ), none() )
+
+  tracker.OnRequest( 0, 'f( a, b', 7 )
+  tracker.OnResponse( SIGNATURE_INFO )
+  assert_that( tracker.Track( 0, 'f( a, bc', 8 ),
+               equal_to( SIGNATURE_INFO ) )
+  assert_that( tracker.Track( 0, 'f( a, b, c', 10 ),
+               has_entries( { 'activeParameter': 2 } ) )
+  # Only responses to requests sent to the server are tracked from.
+  tracker.OnResponse( {} )
+  assert_that( tracker.Track( 0, 'f( a, b, c', 10 ),
+               has_entries( { 'activeParameter': 2 } ) )
+
+  # No more parameters: the server may know of another overload.
+  assert_that( tracker.Track( 0, 'f( a, b, c, d', 13 ), none() )
+  # Nested call.
+  assert_that( tracker.Track( 0, 'f( a, b, g( c', 13 ), none() )
+  # Left the call.
+  assert_that( tracker.Track( 0, 'f( a, b )', 9 ), none() )
+  # Text before the position of the request changed.
+  assert_that( tracker.Track( 0, 'f( a,, b', 8 ), none() )
+  assert_that( tracker.Track( 0, 'f( a,', 5 ), none() )
+  assert_that( tracker.Track( 1, 'f( a, b, c', 10 ), none() )
+
+  tracker.Reset()
+  assert_that( tracker.Track( 0, 'f( a, b, c', 10 ), none() )
+
+
+@patch( 'vim.eval', return_value = '1000' )
+def RenderPopup_OnlyChangesAreSent_test( vim_eval ):
+  state = sh.SignatureHelpState()
+  lines = [ { 'text': 'f( int a )', 'props': [] } ]
+  options = { 'line': 1, 'col': 1 }
+
+  sh._RenderPopup( state, lines, options, 'c', 1 )
+  vim_eval.assert_called_once_with(
+    'youcompleteme#UpdateSignatureHelpPopup( 0, '
+    '[{"text": "f( int a )", "props": []}], {"line": 1, "col": 1}, "c", 1 )' )
+  assert_that( state.popup_win_id, equal_to( 1000 ) )
+
+  vim_eval.reset_mock()
+  sh._RenderPopup( state, lines, dict( options ), 'c', 1 )
+  vim_eval.assert_not_called()
+
+  sh._RenderPopup( state, lines, { 'line': 2, 'col': 1 }, 'c', 1 )
+  vim_eval.assert_called_once_with(
+    'youcompleteme#UpdateSignatureHelpPopup( 1000, '
+    'v:null, {"line": 2, "col": 1}, v:null, v:null )' )
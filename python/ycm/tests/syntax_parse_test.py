@@ -19,9 +19,14 @@
 from ycm.tests.test_utils import MockVimModule
 MockVimModule()
 
+import json
 import os
-from hamcrest import assert_that, contains_inanyorder, has_item, has_items
+from hamcrest import ( assert_that, contains_inanyorder, empty, equal_to,
+                       has_item, has_items )
+from unittest.mock import patch
 from ycm import syntax_parse
+from ycm.syntax_parse import ( SyntaxKeywordsCache,
+                               SYNTAX_SCRIPT_NAME_REGEX )
 from ycmd.utils import ReadFile
 
 
@@ -322,3 +327,204 @@ def ExtractKeywordsFromGroup_ContainedSyntaxArgAllowed_test():
                    'far'
                  ] ) ),
                contains_inanyorder( 'foo', 'zoq', 'bar', 'goo', 'far' ) )
+
+
+class FakeVim:
+  """Answers the expressions evaluated to identify the syntax scripts and
+  variables."""
+
+  def __init__( self, runtime_scripts, sourced_scripts, variables = None ):
+    self.runtime_scripts = runtime_scripts
+    self.sourced_scripts = sourced_scripts
+    self.variables = variables if variables else {}
+
+
+  def __call__( self, expression ):
+    if expression.startswith( 'globpath(' ):
+      return self.runtime_scripts
+    if expression == "execute( 'scriptnames' )":
+      return '\n'.join( f'{ number:3}: { script }' for number, script in
+                         enumerate( self.sourced_scripts, 1 ) )
+    if expression == 'keys( g: )':
+      return list( self.variables ) + [ 'loaded_matchparen' ]
+    if expression.startswith( 'map(' ):
+      variables = json.loads( expression[ 4 : expression.index( ']' ) + 1 ] )
+      return [ repr( self.variables[ variable ] ) for variable in variables ]
+    raise ValueError( f'Unexpected evaluation: { expression }' )
+
+
+@patch( 'ycm.vimsupport.VariableExists', return_value = True )
+@patch( 'ycm.syntax_parse.SyntaxKeywordsForCurrentBuffer',
+        return_value = { 'for', 'while' } )
+def SyntaxKeywordsCache_WarmStart_test( syntax_keywords,
+                                        variable_exists,
+                                        tmp_path ):
+  path = str( tmp_path / 'keywords.json' )
+  script = tmp_path / 'syntax' / 'ft.vim'
+  script.parent.mkdir()
+  script.write_text( 'syntax keyword Statement for while' )
+  vim = FakeVim( [ str( script ) ], [ str( script ) ] )
+
+  with patch( 'ycm.vimsupport.VimExpressionToPythonType', vim ):
+    cache = SyntaxKeywordsCache( path )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ),
+                 contains_inanyorder( 'for', 'while' ) )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ),
+                 contains_inanyorder( 'for', 'while' ) )
+    syntax_keywords.assert_called_once_with()
+
+    # The keywords are not parsed again in another Vim session, even if no
+    # syntax script is sourced yet.
+    syntax_keywords.reset_mock()
+    vim.sourced_scripts = []
+    cache = SyntaxKeywordsCache( path )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ),
+                 contains_inanyorder( 'for', 'while' ) )
+    syntax_keywords.assert_not_called()
+
+    # Unless the syntax script is modified.
+    os.utime( str( script ), ( 0, 0 ) )
+    cache = SyntaxKeywordsCache( path )
+    cache.KeywordsForCurrentBuffer( 'ft' )
+    syntax_keywords.assert_called_once_with()
+
+
+@patch( 'ycm.vimsupport.VariableExists', return_value = False )
+@patch( 'ycm.syntax_parse.SyntaxKeywordsForCurrentBuffer',
+        return_value = set() )
+def SyntaxKeywordsCache_ParsedBeforeSyntaxIsLoaded_test( syntax_keywords,
+                                                         variable_exists,
+                                                         tmp_path ):
+  path = str( tmp_path / 'keywords.json' )
+  script = tmp_path / 'syntax' / 'ft.vim'
+  script.parent.mkdir()
+  script.write_text( 'syntax keyword Statement for while' )
+  vim = FakeVim( [ str( script ) ], [] )
+
+  with patch( 'ycm.vimsupport.VimExpressionToPythonType', vim ):
+    # No syntax is loaded, e.g. with ":syntax off".
+    cache = SyntaxKeywordsCache( path )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ), empty() )
+    assert_that( os.path.exists( path ), equal_to( False ) )
+
+    # The syntax is loaded in another Vim session.
+    variable_exists.return_value = True
+    syntax_keywords.return_value = { 'for', 'while' }
+    vim.sourced_scripts = [ str( script ) ]
+    cache = SyntaxKeywordsCache( path )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ),
+                 contains_inanyorder( 'for', 'while' ) )
+
+    # Saved keywords are not used while the syntax is not loaded.
+    variable_exists.return_value = False
+    syntax_keywords.return_value = set()
+    cache = SyntaxKeywordsCache( path )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ), empty() )
+
+
+@patch( 'ycm.vimsupport.VariableExists', return_value = True )
+@patch( 'ycm.syntax_parse.SyntaxKeywordsForCurrentBuffer',
+        return_value = set() )
+def SyntaxKeywordsCache_NoKeywords_test( syntax_keywords,
+                                         variable_exists,
+                                         tmp_path ):
+  path = str( tmp_path / 'keywords.json' )
+  with patch( 'ycm.vimsupport.VimExpressionToPythonType',
+              FakeVim( [], [] ) ):
+    cache = SyntaxKeywordsCache( path )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ), empty() )
+    assert_that( cache.KeywordsForCurrentBuffer( 'ft' ), empty() )
+  assert_that( syntax_keywords.call_count, equal_to( 2 ) )
+  assert_that( os.path.exists( path ), equal_to( False ) )
+
+
+@patch( 'ycm.vimsupport.VariableExists', return_value = True )
+@patch( 'ycm.syntax_parse.SyntaxKeywordsForCurrentBuffer',
+        return_value = { 'for', 'while' } )
+def SyntaxKeywordsCache_IncludedAndAfterScripts_test( syntax_keywords,
+                                                      variable_exists,
+                                                      tmp_path ):
+  path = str( tmp_path / 'keywords.json' )
+  script = tmp_path / 'vim' / 'syntax' / 'cpp.vim'
+  included_script = tmp_path / 'vim' / 'syntax' / 'c.vim'
+  after_script = tmp_path / 'vim' / 'after' / 'syntax' / 'cpp.vim'
+  other_script = tmp_path / 'vim' / 'plugin' / 'other.vim'
+  for vim_script in [ script, included_script, after_script, other_script ]:
+    vim_script.parent.mkdir( parents = True, exist_ok = True )
+    vim_script.write_text( '" Vim script' )
+  vim = FakeVim( [ str( script ) ],
+                 [ str( other_script ), str( script ), str( included_script ) ],
+                 { 'c_gnu': 1 } )
+
+  def AssertParsed( parsed ):
+    syntax_keywords.reset_mock()
+    cache = SyntaxKeywordsCache( path )
+    cache.KeywordsForCurrentBuffer( 'cpp' )
+    assert_that( syntax_keywords.called, equal_to( parsed ) )
+
+  with patch( 'ycm.vimsupport.VimExpressionToPythonType', vim ):
+    AssertParsed( True )
+    AssertParsed( False )
+
+    # Scripts that are not syntax scripts are ignored.
+    other_script.write_text( '" Modified Vim script' )
+    AssertParsed( False )
+
+    # Modifying an included script invalidates the keywords.
+    included_script.write_text( '" Modified Vim script' )
+    AssertParsed( True )
+    AssertParsed( False )
+
+    # So does changing a syntax option of an included syntax.
+    vim.variables[ 'c_gnu' ] = 0
+    AssertParsed( True )
+    AssertParsed( False )
+    vim.variables[ 'c_no_curly_error' ] = 1
+    AssertParsed( True )
+    AssertParsed( False )
+
+    # Or adding an after/ script.
+    vim.runtime_scripts = [ str( script ), str( after_script ) ]
+    AssertParsed( True )
+    AssertParsed( False )
+
+
+def SyntaxScriptNameRegex_test():
+  for script, name in [
+    ( '/usr/share/vim/vim90/syntax/cpp.vim', 'cpp' ),
+    ( '~/.vim/after/syntax/c.vim', 'c' ),
+    ( '/usr/share/vim/vim90/syntax/java/doc.vim', 'java' ),
+    ( r'C:\vim\vim90\syntax\html.vim', 'html' ) ]:
+    assert_that( SYNTAX_SCRIPT_NAME_REGEX.search( script ).group( 'name' ),
+                 equal_to( name ) )
+  assert_that( SYNTAX_SCRIPT_NAME_REGEX.search( '/vim/plugin/syntax.vim' ),
+               equal_to( None ) )
+
+
+@patch( 'ycm.vimsupport.VimExpressionToPythonType', FakeVim( [], [] ) )
+@patch( 'ycm.syntax_parse.SyntaxKeywordsForCurrentBuffer',
+        return_value = { 'for' } )
+def SyntaxKeywordsCache_NoFile_test( syntax_keywords, *args ):
+  cache = SyntaxKeywordsCache()
+  cache.KeywordsForCurrentBuffer( 'ft' )
+  cache.KeywordsForCurrentBuffer( 'ft' )
+  assert_that( syntax_keywords.call_count, equal_to( 2 ) )
+
+
+@patch( 'ycm.vimsupport.VariableExists', return_value = True )
+@patch( 'ycm.vimsupport.VimExpressionToPythonType', FakeVim( [], [] ) )
+@patch( 'ycm.syntax_parse.SyntaxKeywordsForCurrentBuffer',
+        return_value = { 'for' } )
+def SyntaxKeywordsCache_UnreadableFile_test( syntax_keywords,
+                                             variable_exists,
+                                             tmp_path ):
+  path = str( tmp_path / 'keywords.json' )
+  with open( path, 'w' ) as f:
+    f.write( 'not json' )
+  cache = SyntaxKeywordsCache( path )
+  assert_that( cache.KeywordsForCurrentBuffer( 'ft' ),
+               contains_inanyorder( 'for' ) )
+
+  cache = SyntaxKeywordsCache( os.path.join( path, 'not a directory' ) )
+  assert_that( cache.KeywordsForCurrentBuffer( 'ft' ),
+               contains_inanyorder( 'for' ) )
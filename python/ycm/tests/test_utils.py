@@ -20,6 +20,7 @@ from unittest.mock import DEFAULT, MagicMock, patch
 from hamcrest import assert_that, equal_to
 import contextlib
 import functools
+import itertools
 import json
 import pytest
 import os
@@ -37,24 +38,44 @@ BWIPEOUT_REGEX = re.compile(
   '^(?:silent! )bwipeout!? (?P<buffer_number>[0-9]+)$' )
 GETBUFVAR_REGEX = re.compile(
   '^getbufvar\\((?P<buffer_number>[0-9]+), "(?P<option>.+)"\\)$' )
-MATCHADD_REGEX = re.compile(
-  '^matchadd\\(\'(?P<group>.+)\', \'(?P<pattern>.+)\', -1\\)$' )
-MATCHDELETE_REGEX = re.compile( '^matchdelete\\((?P<id>\\d+)\\)$' )
+MATCHADDPOS_REGEX = re.compile(
+  '^map\\((?P<matches>\\[.*\\]), '
+  '\'matchaddpos\\(v:val\\[0\\], v:val\\[1\\], -1\\)\'\\)$' )
+MATCHDELETE_REGEX = re.compile(
+  '^map\\((?P<ids>\\[.*\\]), \'matchdelete\\(v:val\\)\'\\)$' )
+PROP_ADD_REGEX = re.compile(
+  '^map\\((?P<props>\\[.*\\]), '
+  '\'prop_add\\(v:val\\[0\\], v:val\\[1\\], v:val\\[2\\]\\)\'\\)$' )
+PROP_ADD_LIST_REGEX = re.compile(
+  '^map\\((?P<props>\\[.*\\]), \'prop_add_list\\(\\{"type": v:val\\[0\\], '
+  '"bufnr": (?P<bufnr>\\d+)\\}, v:val\\[1\\]\\)\'\\)$' )
+PROP_REMOVE_REGEX = re.compile(
+  '^map\\((?P<types>\\[.*\\]), \'prop_remove\\(\\{"type": v:val, '
+  '"bufnr": (?P<bufnr>\\d+), "all": 1\\}\\)\'\\)$' )
 OMNIFUNC_REGEX_FORMAT = (
   '^{omnifunc_name}\\((?P<findstart>[01]),[\'"](?P<base>.*)[\'"]\\)$' )
 FNAMEESCAPE_REGEX = re.compile( '^fnameescape\\(\'(?P<filepath>.+)\'\\)$' )
 STRDISPLAYWIDTH_REGEX = re.compile(
   '^strdisplaywidth\\( ?\'(?P<text>.+)\' ?\\)$' )
-SIGN_LIST_REGEX = re.compile(
-  '^silent! sign place buffer=(?P<bufnr>\\d+)$' )
-SIGN_PLACE_REGEX = re.compile(
-  '^sign place (?P<id>\\d+) name=(?P<name>\\w+) line=(?P<line>\\d+) '
-  'buffer=(?P<bufnr>\\d+)$' )
+SIGN_PLACELIST_REGEX = re.compile(
+  '^sign_placelist\\((?P<signs>\\[.*\\])\\)$' )
+SIGN_UNPLACELIST_REGEX = re.compile(
+  '^sign_unplacelist\\((?P<signs>\\[.*\\])\\)$' )
 SIGN_UNPLACE_REGEX = re.compile(
-  '^sign unplace (?P<id>\\d+) buffer=(?P<bufnr>\\d+)$' )
+  '^sign_unplace\\(\'ycm_signs\', \\{\'buffer\': (?P<bufnr>\\d+)\\}\\)$' )
+VISIBLE_LINES_REGEX = re.compile(
+  '^map\\( filter\\( getwininfo\\(\\), "v:val.tabnr == tabpagenr\\(\\) && '
+  'v:val.bufnr == (?P<bufnr>\\d+)" \\), ' )
+GETLOCLIST_CONTEXTS_REGEX = re.compile(
+  '^map\\( (?P<windows>\\[.*\\]), '
+  '"getloclist\\( v:val, \\{ \'context\': 0 \\} \\).context" \\)$' )
+SETLOCLIST_REGEX = re.compile(
+  '^setloclist\\( (?P<window>\\d+), \\[\\], getloclist\\( \\d+, '
+  '\\{ "title": 0 \\} \\).title ==# "(?P<title>[^"]*)" \\? "r" : " ", '
+  '(?P<what>\\{.*\\}) \\)$' )
 REDIR_START_REGEX = re.compile( '^redir => (?P<variable>[\\w:]+)$' )
 REDIR_END_REGEX = re.compile( '^redir END$' )
-EXISTS_REGEX = re.compile( '^exists\\( \'(?P<option>[\\w:]+)\' \\)$' )
+EXISTS_REGEX = re.compile( '^exists\\( \'(?P<option>[\\w:*]+)\' \\)$' )
 LET_REGEX = re.compile( '^let (?P<option>[\\w:]+) = (?P<value>.*)$' )
 HAS_PATCH_REGEX = re.compile( '^has\\( \'patch(?P<patch>\\d+)\' \\)$' )
 
@@ -69,7 +90,10 @@ HAS_PATCH_REGEX = re.compile( '^has\\( \'patch(?P<patch>\\d+)\' \\)$' )
 VIM_MOCK = MagicMock()
 
 VIM_MATCHES_FOR_WINDOW = defaultdict( list )
+VIM_PROPS_FOR_BUFFER = defaultdict( list )
 VIM_SIGNS = []
+# Stack of location lists by window number, the current list last.
+VIM_LOCATION_LISTS = defaultdict( list )
 
 VIM_OPTIONS = {
   '&completeopt': b'',
@@ -182,6 +206,13 @@ def _MockVimWindowEval( value ):
     # For simplicity, we always assume there is no previous window.
     return 0
 
+  match = VISIBLE_LINES_REGEX.search( value )
+  if match:
+    bufnr = int( match.group( 'bufnr' ) )
+    return [ window.visible_lines or ( 1, len( window.buffer.contents ) )
+             for window in VIM_MOCK.windows
+             if window.buffer.number == bufnr ]
+
   return None
 
 
@@ -224,23 +255,54 @@ def _MockVimMatchEval( value ):
   if value == 'getmatches()':
     return VIM_MATCHES_FOR_WINDOW[ current_window ]
 
-  match = MATCHADD_REGEX.search( value )
+  match = MATCHADDPOS_REGEX.search( value )
   if match:
-    group = match.group( 'group' )
-    option = match.group( 'pattern' )
-    vim_match = VimMatch( group, option )
-    VIM_MATCHES_FOR_WINDOW[ current_window ].append( vim_match )
-    return vim_match.id
+    match_ids = []
+    for group, positions in json.loads( match.group( 'matches' ) ):
+      vim_match = VimMatch( group, positions )
+      VIM_MATCHES_FOR_WINDOW[ current_window ].append( vim_match )
+      match_ids.append( vim_match.id )
+    return match_ids
 
   match = MATCHDELETE_REGEX.search( value )
   if match:
-    match_id = int( match.group( 'id' ) )
+    match_ids = set( json.loads( match.group( 'ids' ) ) )
     vim_matches = VIM_MATCHES_FOR_WINDOW[ current_window ]
-    for index, vim_match in enumerate( vim_matches ):
-      if vim_match.id == match_id:
-        vim_matches.pop( index )
-        return -1
-    return 0
+    vim_matches[ : ] = [ vim_match for vim_match in vim_matches
+                         if vim_match.id not in match_ids ]
+    return [ 0 ] * len( match_ids )
+
+  return None
+
+
+def _MockVimPropEval( value ):
+  match = PROP_ADD_REGEX.search( value )
+  if match:
+    for line, column, options in json.loads( match.group( 'props' ) ):
+      VIM_PROPS_FOR_BUFFER[ options[ 'bufnr' ] ].append(
+        VimProp( options[ 'type' ],
+                 line,
+                 column,
+                 options[ 'end_lnum' ],
+                 options[ 'end_col' ] ) )
+    return []
+
+  match = PROP_ADD_LIST_REGEX.search( value )
+  if match:
+    bufnr = int( match.group( 'bufnr' ) )
+    for prop_type, ranges in json.loads( match.group( 'props' ) ):
+      VIM_PROPS_FOR_BUFFER[ bufnr ].extend(
+        VimProp( prop_type, *prop_range ) for prop_range in ranges )
+    return []
+
+  match = PROP_REMOVE_REGEX.search( value )
+  if match:
+    bufnr = int( match.group( 'bufnr' ) )
+    prop_types = json.loads( match.group( 'types' ) )
+    VIM_PROPS_FOR_BUFFER[ bufnr ] = [
+      prop for prop in VIM_PROPS_FOR_BUFFER[ bufnr ]
+      if prop.type not in prop_types ]
+    return []
 
   return None
 
@@ -261,29 +323,18 @@ def _MockVimVersionEval( value ):
 
 
 def _MockVimEval( value ):
-  result = _MockVimOptionsEval( value )
-  if result is not None:
-    return result
-
-  result = _MockVimFunctionsEval( value )
-  if result is not None:
-    return result
-
-  result = _MockVimBufferEval( value )
-  if result is not None:
-    return result
-
-  result = _MockVimWindowEval( value )
-  if result is not None:
-    return result
-
-  result = _MockVimMatchEval( value )
-  if result is not None:
-    return result
-
-  result = _MockVimVersionEval( value )
-  if result is not None:
-    return result
+  for mock_eval in ( _MockVimOptionsEval,
+                     _MockVimFunctionsEval,
+                     _MockVimBufferEval,
+                     _MockVimWindowEval,
+                     _MockVimMatchEval,
+                     _MockVimPropEval,
+                     _MockVimSignEval,
+                     _MockVimLocationListEval,
+                     _MockVimVersionEval ):
+    result = mock_eval( value )
+    if result is not None:
+      return result
 
   match = FNAMEESCAPE_REGEX.search( value )
   if match:
@@ -300,6 +351,8 @@ def _MockVimEval( value ):
 
 
 def _MockWipeoutBuffer( buffer_number ):
+  from ycm import vimsupport
+  vimsupport.ClearBufferNumberCache()
   buffers = VIM_MOCK.buffers
 
   for index, buffer in enumerate( buffers ):
@@ -307,40 +360,58 @@ def _MockWipeoutBuffer( buffer_number ):
       return buffers.pop( index )
 
 
-def _MockSignCommand( command ):
-  match = SIGN_LIST_REGEX.search( command )
-  if match and REDIR[ 'status' ]:
-    bufnr = int( match.group( 'bufnr' ) )
-    REDIR[ 'output' ] = ( '--- Signs ---\n'
-                          'Signs for foo:\n' )
-    for sign in VIM_SIGNS:
-      if sign.bufnr == bufnr:
-        if VIM_VERSION >= Version( 8, 1, 614 ):
-          # 10 is the default priority.
-          line_output = '    line={}  id={}  name={} priority=10'
-        else:
-          line_output = '    line={}  id={}  name={}'
-        REDIR[ 'output' ] += line_output.format( sign.line, sign.id, sign.name )
-    return True
-
-  match = SIGN_PLACE_REGEX.search( command )
+def _MockVimSignEval( value ):
+  match = SIGN_PLACELIST_REGEX.search( value )
   if match:
-    VIM_SIGNS.append( VimSign( int( match.group( 'id' ) ),
-                               int( match.group( 'line' ) ),
-                               match.group( 'name' ),
-                               int( match.group( 'bufnr' ) ) ) )
-    return True
+    signs = json.loads( match.group( 'signs' ) )
+    for sign in signs:
+      VIM_SIGNS.append( VimSign( sign[ 'id' ],
+                                 sign[ 'lnum' ],
+                                 sign[ 'name' ],
+                                 sign[ 'buffer' ] ) )
+    return [ sign[ 'id' ] for sign in signs ]
+
+  match = SIGN_UNPLACELIST_REGEX.search( value )
+  if match:
+    signs = json.loads( match.group( 'signs' ) )
+    sign_keys = { ( sign[ 'id' ], sign[ 'buffer' ] ) for sign in signs }
+    VIM_SIGNS[ : ] = [ sign for sign in VIM_SIGNS
+                       if ( sign.id, sign.bufnr ) not in sign_keys ]
+    return [ 0 ] * len( signs )
 
-  match = SIGN_UNPLACE_REGEX.search( command )
+  match = SIGN_UNPLACE_REGEX.search( value )
   if match:
-    sign_id = int( match.group( 'id' ) )
     bufnr = int( match.group( 'bufnr' ) )
-    for sign in VIM_SIGNS:
-      if sign.id == sign_id and sign.bufnr == bufnr:
-        VIM_SIGNS.remove( sign )
-        return True
+    VIM_SIGNS[ : ] = [ sign for sign in VIM_SIGNS if sign.bufnr != bufnr ]
+    return 0
+
+  return None
+
+
+def _MockVimLocationListEval( value ):
+  match = GETLOCLIST_CONTEXTS_REGEX.search( value )
+  if match:
+    return [ _MockCurrentLocationList( window ).get( 'context', '' )
+             for window in json.loads( match.group( 'windows' ) ) ]
+
+  match = SETLOCLIST_REGEX.search( value )
+  if match:
+    window = int( match.group( 'window' ) ) or VIM_MOCK.current.window.number
+    what = json.loads( match.group( 'what' ) )
+    stack = VIM_LOCATION_LISTS[ window ]
+    if _MockCurrentLocationList( window ).get( 'title' ) == match.group(
+        'title' ):
+      stack[ -1 ] = what
+    else:
+      stack.append( what )
+    return 0
+
+  return None
 
-  return False
+
+def _MockCurrentLocationList( window ):
+  stack = VIM_LOCATION_LISTS.get( window )
+  return stack[ -1 ] if stack else {}
 
 
 def _MockVimCommand( command ):
@@ -363,10 +434,6 @@ def _MockVimCommand( command ):
     REDIR[ 'variable' ] = ''
     return
 
-  result = _MockSignCommand( command )
-  if result:
-    return
-
   match = LET_REGEX.search( command )
   if match:
     option = match.group( 'option' )
@@ -492,12 +559,15 @@ class VimWindow:
     - |number|: number of the window;
     - |buffer_object|: a VimBuffer object representing the buffer inside the
       window;
-    - |cursor|: a tuple corresponding to the cursor position."""
+    - |cursor|: a tuple corresponding to the cursor position;
+    - |visible_lines|: a tuple of the first and last lines displayed, all the
+      lines of the buffer if None."""
 
   def __init__( self, number, buffer_object, cursor = None ):
     self.number = number
     self.buffer = buffer_object
     self.cursor = cursor
+    self.visible_lines = None
     self.options = {}
 
 
@@ -545,20 +615,25 @@ class VimCurrent:
 
 
 class VimMatch:
+  """An object that looks like a match added with matchaddpos(), as returned
+  by getmatches(). |positions| is a list of [ line ], [ line, column ] or
+  [ line, column, length ] positions."""
+
+  _ids = itertools.count( 1 )
 
-  def __init__( self, group, pattern ):
-    current_window = VIM_MOCK.current.window.number
-    self.id = len( VIM_MATCHES_FOR_WINDOW[ current_window ] ) + 1
+  def __init__( self, group, positions ):
+    self.id = next( VimMatch._ids )
     self.group = group
-    self.pattern = pattern
+    self.positions = [ list( position ) for position in positions ]
 
 
   def __eq__( self, other ):
-    return self.group == other.group and self.pattern == other.pattern
+    return self.group == other.group and self.positions == other.positions
 
 
   def __repr__( self ):
-    return f"VimMatch( group = '{ self.group }', pattern = '{ self.pattern }' )"
+    return ( f"VimMatch( group = '{ self.group }', "
+             f"positions = { self.positions } )" )
 
 
   def __getitem__( self, key ):
@@ -566,6 +641,44 @@ class VimMatch:
       return self.group
     elif key == 'id':
       return self.id
+    raise KeyError( key )
+
+
+  def get( self, key, default = None ):
+    if key.startswith( 'pos' ):
+      index = int( key[ 3 : ] ) - 1
+      if index < len( self.positions ):
+        return self.positions[ index ]
+      return default
+    try:
+      return self[ key ]
+    except KeyError:
+      return default
+
+
+class VimProp:
+  """A text property added with prop_add() or prop_add_list()."""
+
+  def __init__( self, prop_type, line, column, line_end, column_end ):
+    self.type = prop_type
+    self.line = line
+    self.column = column
+    self.line_end = line_end
+    self.column_end = column_end
+
+
+  def __eq__( self, other ):
+    return ( self.type == other.type and
+             self.line == other.line and
+             self.column == other.column and
+             self.line_end == other.line_end and
+             self.column_end == other.column_end )
+
+
+  def __repr__( self ):
+    return ( f"VimProp( type = '{ self.type }', line = { self.line }, "
+             f"column = { self.column }, line_end = { self.line_end }, "
+             f"column_end = { self.column_end } )" )
 
 
 class VimSign:
@@ -612,11 +725,17 @@ def MockVimBuffers( buffers, window_buffers, cursor_position = ( 1, 1 ) ):
     raise RuntimeError( 'Second parameter must contain at least one element '
                         'which corresponds to the current window.' )
 
-  with patch( 'vim.buffers', VimBuffers( buffers ) ):
-    with patch( 'vim.windows', VimWindows( window_buffers,
-                                           cursor_position ) ) as windows:
-      with patch( 'vim.current', VimCurrent( windows[ 0 ] ) ):
-        yield VIM_MOCK
+  # Vim would clear the cache when adding and wiping out these buffers.
+  from ycm import vimsupport
+  vimsupport.ClearBufferNumberCache()
+  try:
+    with patch( 'vim.buffers', VimBuffers( buffers ) ):
+      with patch( 'vim.windows', VimWindows( window_buffers,
+                                             cursor_position ) ) as windows:
+        with patch( 'vim.current', VimCurrent( windows[ 0 ] ) ):
+          yield VIM_MOCK
+  finally:
+    vimsupport.ClearBufferNumberCache()
 
 
 def MockVimModule():
@@ -17,134 +17,142 @@
 from ycm.tests import PathToTestFile
 from ycm.tests.test_utils import ( CurrentWorkingDirectory, ExtendedMock,
                                    MockVimBuffers, MockVimModule, Version,
-                                   VimBuffer, VimError, WindowsAndMacOnly )
+                                   VimBuffer, VimError, VIM_LOCATION_LISTS,
+                                   WindowsAndMacOnly )
 MockVimModule()
 
 from ycm import vimsupport
 from hamcrest import ( assert_that, calling, contains_exactly, empty, equal_to,
                        has_entry, is_not, raises )
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import ANY, MagicMock, call, patch
 from ycmd.utils import ToBytes
 import os
 import json
 
 
-@patch( 'vim.eval', new_callable = ExtendedMock )
-def SetLocationListsForBuffer_Current_test( vim_eval ):
-  diagnostics = [ {
-    'bufnr': 3,
-    'filename': 'some_filename',
-    'lnum': 5,
-    'col': 22,
-    'type': 'E',
-    'valid': 1
-  } ]
+DIAGNOSTICS = [ {
+  'bufnr': 3,
+  'filename': 'some_filename',
+  'lnum': 5,
+  'col': 22,
+  'type': 'E',
+  'valid': 1
+} ]
+
+
+def YcmLocationList( diagnostics ):
+  return { 'title': 'YcmDiags', 'context': ANY, 'items': diagnostics }
+
+
+def SetLocationListsForBuffer_Current_test():
+  VIM_LOCATION_LISTS.clear()
   current_buffer = VimBuffer( '/test', number = 3 )
   with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
-    vimsupport.SetLocationListsForBuffer( 3, diagnostics )
+    vimsupport.SetLocationListsForBuffer( 3, DIAGNOSTICS )
 
-  vim_eval.assert_has_exact_calls( [
-    call( f'setloclist( 1, { json.dumps( diagnostics ) } )' )
-  ] )
+  assert_that( VIM_LOCATION_LISTS, equal_to( {
+    1: [ YcmLocationList( DIAGNOSTICS ) ]
+  } ) )
 
 
 @patch( 'vim.eval', new_callable = ExtendedMock )
 def SetLocationListsForBuffer_NotCurrent_test( vim_eval ):
-  diagnostics = [ {
-    'bufnr': 3,
-    'filename': 'some_filename',
-    'lnum': 5,
-    'col': 22,
-    'type': 'E',
-    'valid': 1
-  } ]
   current_buffer = VimBuffer( '/test', number = 3 )
   other_buffer = VimBuffer( '/notcurrent', number = 1 )
   with MockVimBuffers( [ current_buffer, other_buffer ], [ current_buffer ] ):
-    vimsupport.SetLocationListsForBuffer( 1, diagnostics )
+    vimsupport.SetLocationListsForBuffer( 1, DIAGNOSTICS )
 
   vim_eval.assert_not_called()
 
 
 @patch( 'vim.eval', new_callable = ExtendedMock, side_effect = [ -1, 1 ] )
 def SetLocationListsForBuffer_NotVisible_test( vim_eval ):
-  diagnostics = [ {
-    'bufnr': 3,
-    'filename': 'some_filename',
-    'lnum': 5,
-    'col': 22,
-    'type': 'E',
-    'valid': 1
-  } ]
   current_buffer = VimBuffer( '/test', number = 3 )
   other_buffer = VimBuffer( '/notcurrent', number = 1 )
   with MockVimBuffers( [ current_buffer, other_buffer ], [ current_buffer ] ):
-    vimsupport.SetLocationListsForBuffer( 1, diagnostics )
+    vimsupport.SetLocationListsForBuffer( 1, DIAGNOSTICS )
 
   vim_eval.assert_not_called()
 
 
-@patch( 'vim.eval', new_callable = ExtendedMock, side_effect = [ -1, 1 ] )
-def SetLocationListsForBuffer_MultipleWindows_test( vim_eval ):
-  diagnostics = [ {
-    'bufnr': 3,
-    'filename': 'some_filename',
-    'lnum': 5,
-    'col': 22,
-    'type': 'E',
-    'valid': 1
-  } ]
+def SetLocationListsForBuffer_MultipleWindows_test():
+  VIM_LOCATION_LISTS.clear()
   current_buffer = VimBuffer( '/test', number = 3 )
   other_buffer = VimBuffer( '/notcurrent', number = 1 )
   with MockVimBuffers( [ current_buffer, other_buffer ],
                        [ current_buffer, other_buffer ] ):
-    vimsupport.SetLocationListsForBuffer( 1, diagnostics )
+    vimsupport.SetLocationListsForBuffer( 1, DIAGNOSTICS )
 
-  vim_eval.assert_has_exact_calls( [
-    call( f'setloclist( 2, { json.dumps( diagnostics ) } )' )
-  ] )
+  assert_that( VIM_LOCATION_LISTS, equal_to( {
+    2: [ YcmLocationList( DIAGNOSTICS ) ]
+  } ) )
 
 
-@patch( 'vim.eval', new_callable = ExtendedMock )
-def SetLocationList_test( vim_eval ):
-  diagnostics = [ {
-    'bufnr': 3,
-    'filename': 'some_filename',
-    'lnum': 5,
-    'col': 22,
-    'type': 'E',
-    'valid': 1
-  } ]
+def SetLocationListsForBuffer_Unchanged_test():
+  VIM_LOCATION_LISTS.clear()
+  current_buffer = VimBuffer( '/test', number = 3 )
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    vimsupport.SetLocationListsForBuffer( 3, DIAGNOSTICS )
+    with patch( 'ycm.vimsupport.SetLocationListForWindow' ) as set_loclist:
+      vimsupport.SetLocationListsForBuffer( 3, list( DIAGNOSTICS ) )
+    set_loclist.assert_not_called()
+
+  assert_that( VIM_LOCATION_LISTS, equal_to( {
+    1: [ YcmLocationList( DIAGNOSTICS ) ]
+  } ) )
+
+
+def SetLocationListsForBuffer_Changed_test():
+  VIM_LOCATION_LISTS.clear()
+  new_diagnostics = [ dict( DIAGNOSTICS[ 0 ], lnum = 6 ) ]
+  current_buffer = VimBuffer( '/test', number = 3 )
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    vimsupport.SetLocationListsForBuffer( 3, DIAGNOSTICS )
+    vimsupport.SetLocationListsForBuffer( 3, new_diagnostics )
+
+  # The list is replaced instead of being added to the stack.
+  assert_that( VIM_LOCATION_LISTS, equal_to( {
+    1: [ YcmLocationList( new_diagnostics ) ]
+  } ) )
+
+
+def SetLocationListsForBuffer_OtherListKept_test():
+  VIM_LOCATION_LISTS.clear()
+  other_list = { 'title': ':lvimgrep', 'context': '', 'items': [] }
+  VIM_LOCATION_LISTS[ 1 ].append( other_list )
+  current_buffer = VimBuffer( '/test', number = 3 )
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    vimsupport.SetLocationListsForBuffer( 3, DIAGNOSTICS )
+
+  assert_that( VIM_LOCATION_LISTS, equal_to( {
+    1: [ other_list, YcmLocationList( DIAGNOSTICS ) ]
+  } ) )
+
+
+def SetLocationList_test():
+  VIM_LOCATION_LISTS.clear()
   current_buffer = VimBuffer( '/test', number = 3 )
   with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 1, 1 ) ):
-    vimsupport.SetLocationList( diagnostics )
+    vimsupport.SetLocationList( DIAGNOSTICS )
 
-  vim_eval.assert_has_calls( [
-    call( f'setloclist( 0, { json.dumps( diagnostics ) } )' )
-  ] )
+  assert_that( VIM_LOCATION_LISTS, equal_to( {
+    1: [ YcmLocationList( DIAGNOSTICS ) ]
+  } ) )
 
 
-@patch( 'vim.eval', new_callable = ExtendedMock )
-def SetLocationList_NotCurrent_test( vim_eval ):
-  diagnostics = [ {
-    'bufnr': 3,
-    'filename': 'some_filename',
-    'lnum': 5,
-    'col': 22,
-    'type': 'E',
-    'valid': 1
-  } ]
+def SetLocationList_NotCurrent_test():
+  VIM_LOCATION_LISTS.clear()
   current_buffer = VimBuffer( '/test', number = 3 )
   other_buffer = VimBuffer( '/notcurrent', number = 1 )
   with MockVimBuffers( [ current_buffer, other_buffer ],
                        [ current_buffer, other_buffer ],
                        ( 1, 1 ) ):
-    vimsupport.SetLocationList( diagnostics )
+    vimsupport.SetLocationList( DIAGNOSTICS )
 
   # This version does not check the current buffer and just sets the current win
-  vim_eval.assert_has_exact_calls( [
-    call( f'setloclist( 0, { json.dumps( diagnostics ) } )' )
-  ] )
+  assert_that( VIM_LOCATION_LISTS, equal_to( {
+    1: [ YcmLocationList( DIAGNOSTICS ) ]
+  } ) )
 
 
 @patch( 'ycm.vimsupport.VariableExists', return_value = True )
@@ -1340,7 +1348,32 @@ def _BuildChunk( start_line,
   }
 
 
-def GetDiagnosticMatchPattern_ErrorInMiddleOfLine_test():
+def GetCachedBufferNumberForFilename_test():
+  current_buffer = VimBuffer( 'current', number = 2 )
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    with patch( 'ycm.vimsupport.GetBufferNumberForFilename',
+                wraps = vimsupport.GetBufferNumberForFilename ) as get_bufnr:
+      for _ in range( 3 ):
+        assert_that(
+          vimsupport.GetCachedBufferNumberForFilename( current_buffer.name ),
+          equal_to( 2 ) )
+        assert_that(
+          vimsupport.GetCachedBufferNumberForFilename( 'not_open' ),
+          equal_to( -1 ) )
+      assert_that( get_bufnr.call_count, equal_to( 2 ) )
+
+      # A missing buffer is looked up again when it would be created.
+      vimsupport.GetCachedBufferNumberForFilename(
+        'not_open', create_buffer_if_needed = True )
+      assert_that( get_bufnr.call_count, equal_to( 3 ) )
+
+      # Buffers were created, wiped out or renamed.
+      vimsupport.ClearBufferNumberCache()
+      vimsupport.GetCachedBufferNumberForFilename( current_buffer.name )
+      assert_that( get_bufnr.call_count, equal_to( 4 ) )
+
+
+def GetDiagnosticMatchPositions_ErrorInMiddleOfLine_test():
   current_buffer = VimBuffer(
     'some_file',
     contents = [ 'Highlight this error please' ]
@@ -1348,8 +1381,8 @@ def GetDiagnosticMatchPattern_ErrorInMiddleOfLine_test():
 
   with patch( 'vim.current.buffer', current_buffer ):
     assert_that(
-      vimsupport.GetDiagnosticMatchPattern( 1, 16, 1, 21 ),
-      equal_to( '\\%1l\\%16c\\_.\\{-}\\%1l\\%21c' )
+      vimsupport.GetDiagnosticMatchPositions( 1, 16, 1, 21 ),
+      contains_exactly( ( 1, 16, 5 ) )
     )
 
 
@@ -1361,8 +1394,8 @@ def AddDiagnosticSyntaxMatch_WarningAtEndOfLine_test():
 
   with patch( 'vim.current.buffer', current_buffer ):
     assert_that(
-      vimsupport.GetDiagnosticMatchPattern( 1, 16, 1, 23 ),
-      equal_to( '\\%1l\\%16c\\_.\\{-}\\%1l\\%23c' )
+      vimsupport.GetDiagnosticMatchPositions( 1, 16, 1, 23 ),
+      contains_exactly( ( 1, 16, 7 ) )
     )
 
 
@@ -1374,8 +1407,8 @@ def AddDiagnosticSyntaxMatch_UnicodeAtEndOfLine_test():
 
   with patch( 'vim.current.buffer', current_buffer ):
     assert_that(
-      vimsupport.GetDiagnosticMatchPattern( 1, 16, 1, 19 ),
-      equal_to( '\\%1l\\%16c\\_.\\{-}\\%1l\\%19c' )
+      vimsupport.GetDiagnosticMatchPositions( 1, 16, 1, 19 ),
+      contains_exactly( ( 1, 16, 3 ) )
     )
 
 
@@ -1387,13 +1420,37 @@ def AddDiagnosticSyntaxMatch_NonPositivePosition_test():
 
   with patch( 'vim.current.buffer', current_buffer ):
     assert_that(
-      vimsupport.GetDiagnosticMatchPattern( 0, 0, 0, 0 ),
-      equal_to( '\\%1l\\%1c\\_.\\{-}\\%1l\\%1c' )
+      vimsupport.GetDiagnosticMatchPositions( 0, 0, 0, 0 ),
+      contains_exactly( ( 1, 1, 1 ) )
+    )
+
+    assert_that(
+      vimsupport.GetDiagnosticMatchPositions( -1, -2, -3, -4 ),
+      contains_exactly( ( 1, 1, 1 ) )
+    )
+
+
+def GetDiagnosticMatchPositions_MultipleLines_test():
+  current_buffer = VimBuffer(
+    'some_file',
+    contents = [ 'Highlight', 'this', 'error', 'please' ]
+  )
+
+  with patch( 'vim.current.buffer', current_buffer ):
+    assert_that(
+      vimsupport.GetDiagnosticMatchPositions( 1, 5, 4, 3 ),
+      contains_exactly( ( 1, 5, 6 ), ( 2, ), ( 3, ), ( 4, 1, 2 ) )
     )
 
+    # The range ends at the start of the last line.
     assert_that(
-      vimsupport.GetDiagnosticMatchPattern( -1, -2, -3, -4 ),
-      equal_to( '\\%1l\\%1c\\_.\\{-}\\%1l\\%1c' )
+      vimsupport.GetDiagnosticMatchPositions( 1, 5, 2, 1 ),
+      contains_exactly( ( 1, 5, 6 ) )
+    )
+
+    assert_that(
+      vimsupport.GetDiagnosticMatchPositions( 2, 3 ),
+      contains_exactly( ( 2, 3, 1 ) )
     )
 
 
@@ -1659,6 +1716,23 @@ def SelectFromList_Negative_test( vim_eval ):
                raises( RuntimeError, vimsupport.NO_SELECTION_MADE_MSG ) )
 
 
+def TruncateMessage_test():
+  assert_that( vimsupport.TruncateMessage( 'short\nmessage', 20 ),
+               equal_to( 'short message' ) )
+  assert_that( vimsupport.TruncateMessage( 'x' * 20, 20 ),
+               equal_to( 'x' * 16 + '...' ) )
+
+
+@patch( 'vim.command', new_callable = ExtendedMock )
+def EchoTruncatedMessage_test( vim_command ):
+  vimsupport.EchoTruncatedMessage( "it's a | b" )
+  vim_command.assert_has_exact_calls( [
+    call( "redraw | "
+          "execute 'set noruler noshowcmd | echo ''it''''s a | b'' | "
+          "let &ruler = ' . &ruler . ' | let &showcmd = ' . &showcmd" )
+  ] )
+
+
 def Filetypes_IntegerFiletype_test():
   current_buffer = VimBuffer( 'buffer', number = 1, filetype = '42' )
   with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
@@ -41,7 +41,7 @@ from ycm.tests import ( StopServer,
                         WaitUntilReady,
                         YouCompleteMeInstance )
 from ycm.client.base_request import _LoadExtraConfFile
-from ycm.youcompleteme import YouCompleteMe
+from ycm.youcompleteme import SawCompletions, YouCompleteMe
 from ycmd.responses import ServerError
 from ycm.tests.mock_utils import ( MockAsyncServerResponseDone,
                                    MockAsyncServerResponseInProgress,
@@ -202,7 +202,9 @@ def YouCompleteMe_DebugInfo_ServerRunning_test( ycm ):
         'Server process ID: \\d+\n'
         'Server logfiles:\n'
         '  .+\n'
-        '  .+' )
+        '  .+\n'
+        'Omnifunc cache: \\d+ hits, \\d+ misses\n'
+        'Diagnostics updates dropped by coalescing: 0' )
     )
 
 
@@ -221,7 +223,9 @@ def YouCompleteMe_DebugInfo_ServerNotRunning_test( ycm ):
         'Server process ID: \\d+\n'
         'Server logfiles:\n'
         '  .+\n'
-        '  .+' )
+        '  .+\n'
+        'Omnifunc cache: \\d+ hits, \\d+ misses\n'
+        'Diagnostics updates dropped by coalescing: 0' )
     )
 
 
@@ -393,6 +397,29 @@ def YouCompleteMe_ShowDetailedDiagnostic_Exception_test(
   ] )
 
 
+@YouCompleteMeInstance()
+def YouCompleteMe_FiletypeCompleterExistsForFiletype_DoesNotBlock_test( ycm ):
+  current_buffer = VimBuffer( 'buffer', filetype = 'ycmtest' )
+  with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
+    with patch( 'ycm.client.completer_available_request.'
+                'CompleterAvailableRequest.PostDataToHandlerAsync',
+                return_value = MockAsyncServerResponseInProgress() ) as post:
+      assert_that( ycm.FiletypeCompleterExistsForFiletype( 'ycmtest' ),
+                   equal_to( False ) )
+      assert_that( ycm.NativeFiletypeCompletionPending() )
+
+      request = ycm._completer_available_requests[ 'ycmtest' ]
+      request._response_future = MockAsyncServerResponseDone( True )
+      assert_that( ycm.FiletypeCompleterExistsForFiletype( 'ycmtest' ),
+                   equal_to( True ) )
+      assert_that( ycm.NativeFiletypeCompletionPending(), equal_to( False ) )
+
+      # The answer is kept.
+      assert_that( ycm.FiletypeCompleterExistsForFiletype( 'ycmtest' ),
+                   equal_to( True ) )
+      post.assert_called_once()
+
+
 @YouCompleteMeInstance()
 @patch( 'ycm.vimsupport.PostVimMessage', new_callable = ExtendedMock )
 def YouCompleteMe_ShowDiagnostics_FiletypeNotSupported_test( post_vim_message,
@@ -526,7 +553,10 @@ def YouCompleteMe_ShowDiagnostics_DiagnosticsFound_OpenLocationList_test(
   open_location_list.assert_called_once_with( focus = True )
 
 
-def YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message, *args ):
+def YouCompleteMe_UpdateDiagnosticInterface( ycm,
+                                             post_vim_message,
+                                             echo_truncated_message,
+                                             *args ):
 
   contents = """int main() {
   int x, y;
@@ -607,18 +637,16 @@ def YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message, *args ):
       ycm.HandleFileParseRequest( block = True )
 
     # The error on the current line is echoed, not the warning.
-    post_vim_message.assert_called_once_with(
-      "expected ';' after expression (FixIt)",
-      truncate = True, warning = False )
+    echo_truncated_message.assert_called_once_with(
+      "expected ';' after expression (FixIt)" )
 
     # Error match is added after warning matches.
     assert_that(
       test_utils.VIM_MATCHES_FOR_WINDOW,
       has_entries( {
         1: contains_exactly(
-          VimMatch( 'YcmWarningSection', '\\%3l\\%5c\\_.\\{-}\\%3l\\%7c' ),
-          VimMatch( 'YcmWarningSection', '\\%3l\\%3c\\_.\\{-}\\%3l\\%9c' ),
-          VimMatch( 'YcmErrorSection', '\\%3l\\%8c' )
+          VimMatch( 'YcmWarningSection', [ [ 3, 5, 2 ], [ 3, 3, 6 ] ] ),
+          VimMatch( 'YcmErrorSection', [ [ 3, 8, 1 ] ] )
         )
       } )
     )
@@ -634,8 +662,10 @@ def YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message, *args ):
   # The error is not echoed again when moving the cursor along the line.
   with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 3, 2 ) ):
     post_vim_message.reset_mock()
+    echo_truncated_message.reset_mock()
     ycm.OnCursorMoved()
     post_vim_message.assert_not_called()
+    echo_truncated_message.assert_not_called()
 
   # The error is cleared when moving the cursor to another line.
   with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 2, 2 ) ):
@@ -645,11 +675,10 @@ def YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message, *args ):
 
   # The error is echoed when moving the cursor back.
   with MockVimBuffers( [ current_buffer ], [ current_buffer ], ( 3, 2 ) ):
-    post_vim_message.reset_mock()
+    echo_truncated_message.reset_mock()
     ycm.OnCursorMoved()
-    post_vim_message.assert_called_once_with(
-      "expected ';' after expression (FixIt)",
-      truncate = True, warning = False )
+    echo_truncated_message.assert_called_once_with(
+      "expected ';' after expression (FixIt)" )
 
     with patch( 'ycm.client.event_notification.EventNotification.Response',
                 return_value = diagnostics[ 1 : ] ):
@@ -660,8 +689,7 @@ def YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message, *args ):
       test_utils.VIM_MATCHES_FOR_WINDOW,
       has_entries( {
         1: contains_exactly(
-          VimMatch( 'YcmWarningSection', '\\%3l\\%5c\\_.\\{-}\\%3l\\%7c' ),
-          VimMatch( 'YcmWarningSection', '\\%3l\\%3c\\_.\\{-}\\%3l\\%9c' )
+          VimMatch( 'YcmWarningSection', [ [ 3, 5, 2 ], [ 3, 3, 6 ] ] )
         )
       } )
     )
@@ -679,12 +707,19 @@ def YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message, *args ):
                           'g:ycm_enable_diagnostic_highlighting': 1 } )
 @patch( 'ycm.youcompleteme.YouCompleteMe.FiletypeCompleterExistsForFiletype',
         return_value = True )
+@patch( 'ycm.vimsupport.EchoTruncatedMessage', new_callable = ExtendedMock )
 @patch( 'ycm.vimsupport.PostVimMessage', new_callable = ExtendedMock )
 @patch( 'ycm.client.event_notification.EventNotification.Done',
         return_value = True )
 def YouCompleteMe_UpdateDiagnosticInterface_OldVim_test(
-    request_done, post_vim_message, filetype_completer_exists, ycm ):
-  YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message )
+    request_done,
+    post_vim_message,
+    echo_truncated_message,
+    filetype_completer_exists,
+    ycm ):
+  YouCompleteMe_UpdateDiagnosticInterface( ycm,
+                                           post_vim_message,
+                                           echo_truncated_message )
 
 
 @YouCompleteMeInstance( { 'g:ycm_echo_current_diagnostic': 1,
@@ -692,13 +727,20 @@ def YouCompleteMe_UpdateDiagnosticInterface_OldVim_test(
                           'g:ycm_enable_diagnostic_highlighting': 1 } )
 @patch( 'ycm.youcompleteme.YouCompleteMe.FiletypeCompleterExistsForFiletype',
         return_value = True )
+@patch( 'ycm.vimsupport.EchoTruncatedMessage', new_callable = ExtendedMock )
 @patch( 'ycm.vimsupport.PostVimMessage', new_callable = ExtendedMock )
 @patch( 'ycm.tests.test_utils.VIM_VERSION', Version( 8, 1, 614 ) )
 @patch( 'ycm.client.event_notification.EventNotification.Done',
         return_value = True )
 def YouCompleteMe_UpdateDiagnosticInterface_NewVim_test(
-    request_done, post_vim_message, filetype_completer_exists, ycm ):
-  YouCompleteMe_UpdateDiagnosticInterface( ycm, post_vim_message )
+    request_done,
+    post_vim_message,
+    echo_truncated_message,
+    filetype_completer_exists,
+    ycm ):
+  YouCompleteMe_UpdateDiagnosticInterface( ycm,
+                                           post_vim_message,
+                                           echo_truncated_message )
 
 
 @YouCompleteMeInstance( { 'g:ycm_enable_diagnostic_highlighting': 1 } )
@@ -708,9 +750,10 @@ def YouCompleteMe_UpdateMatches_ClearDiagnosticMatchesInNewBuffer_test( ycm ):
                               number = 5 )
 
   test_utils.VIM_MATCHES_FOR_WINDOW[ 1 ] = [
-    VimMatch( 'YcmWarningSection', '\\%3l\\%5c\\_.\\{-}\\%3l\\%7c' ),
-    VimMatch( 'YcmWarningSection', '\\%3l\\%3c\\_.\\{-}\\%3l\\%9c' ),
-    VimMatch( 'YcmErrorSection', '\\%3l\\%8c' )
+    VimMatch( 'YcmWarningSection', [ [ 3, 5, 2 ], [ 3, 3, 6 ] ] ),
+    VimMatch( 'YcmErrorSection', [ [ 3, 8, 1 ] ] ),
+    # Added with matchadd() by an older version.
+    VimMatch( 'YcmWarningSection', [] )
   ]
 
   with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
@@ -785,9 +828,11 @@ def YouCompleteMe_AsyncDiagnosticUpdate_UserDisabled_test(
                           'g:ycm_enable_diagnostic_highlighting': 1 } )
 @patch( 'ycm.youcompleteme.YouCompleteMe.FiletypeCompleterExistsForFiletype',
         return_value = True )
+@patch( 'ycm.vimsupport.EchoTruncatedMessage', new_callable = ExtendedMock )
 @patch( 'ycm.vimsupport.PostVimMessage', new_callable = ExtendedMock )
 def YouCompleteMe_AsyncDiagnosticUpdate_SingleFile_test(
     post_vim_message,
+    echo_truncated_message,
     filetype_completer_exists,
     ycm ):
 
@@ -895,8 +940,9 @@ def YouCompleteMe_AsyncDiagnosticUpdate_SingleFile_test(
       ycm.UpdateWithNewDiagnosticsForFile( '/current', diagnostics )
 
   # We update the diagnostic on the current cursor position
-  post_vim_message.assert_has_exact_calls( [
-    call( "error text in current buffer", truncate = True, warning = False ),
+  post_vim_message.assert_has_exact_calls( [] )
+  echo_truncated_message.assert_has_exact_calls( [
+    call( "error text in current buffer" ),
   ] )
 
   # Ensure we included all the diags though
@@ -936,7 +982,7 @@ def YouCompleteMe_AsyncDiagnosticUpdate_SingleFile_test(
     test_utils.VIM_MATCHES_FOR_WINDOW,
     has_entries( {
       1: contains_exactly(
-        VimMatch( 'YcmErrorSection', '\\%1l\\%1c\\_.\\{-}\\%1l\\%1c' )
+        VimMatch( 'YcmErrorSection', [ [ 1, 1, 1 ] ] )
       )
     } )
   )
@@ -947,9 +993,11 @@ def YouCompleteMe_AsyncDiagnosticUpdate_SingleFile_test(
                           'g:ycm_enable_diagnostic_highlighting': 1 } )
 @patch( 'ycm.youcompleteme.YouCompleteMe.FiletypeCompleterExistsForFiletype',
         return_value = True )
+@patch( 'ycm.vimsupport.EchoTruncatedMessage', new_callable = ExtendedMock )
 @patch( 'ycm.vimsupport.PostVimMessage', new_callable = ExtendedMock )
 def YouCompleteMe_AsyncDiagnosticUpdate_PerFile_test(
     post_vim_message,
+    echo_truncated_message,
     filetype_completer_exists,
     ycm ):
 
@@ -1088,8 +1136,9 @@ def YouCompleteMe_AsyncDiagnosticUpdate_PerFile_test(
         ycm.UpdateWithNewDiagnosticsForFile( filename, diagnostics )
 
   # We update the diagnostic on the current cursor position
-  post_vim_message.assert_has_exact_calls( [
-    call( "error text in current buffer", truncate = True, warning = False ),
+  post_vim_message.assert_has_exact_calls( [] )
+  echo_truncated_message.assert_has_exact_calls( [
+    call( "error text in current buffer" ),
   ] )
 
   # Ensure we included all the diags though
@@ -1123,12 +1172,80 @@ def YouCompleteMe_AsyncDiagnosticUpdate_PerFile_test(
     test_utils.VIM_MATCHES_FOR_WINDOW,
     has_entries( {
       1: contains_exactly(
-        VimMatch( 'YcmErrorSection', '\\%1l\\%1c\\_.\\{-}\\%1l\\%1c' )
+        VimMatch( 'YcmErrorSection', [ [ 1, 1, 1 ] ] )
       )
     } )
   )
 
 
+@YouCompleteMeInstance( { 'g:ycm_always_populate_location_list': 1 } )
+@patch( 'ycm.youcompleteme.YouCompleteMe.FiletypeCompleterExistsForFiletype',
+        return_value = True )
+def YouCompleteMe_AsyncDiagnosticUpdate_HiddenBuffer_test(
+    filetype_completer_exists,
+    ycm ):
+
+  def Diagnostic( filepath ):
+    location = { 'filepath': filepath, 'line_num': 2, 'column_num': 1 }
+    return { 'kind': 'ERROR',
+             'text': f'error text in { filepath }',
+             'location': location,
+             'location_extent': { 'start': location, 'end': location },
+             'ranges': [] }
+
+  current_buffer = VimBuffer( '/current',
+                              filetype = 'ycmtest',
+                              contents = [ 'current' ] * 10,
+                              number = 1 )
+  hidden_buffer = VimBuffer( '/hidden',
+                             filetype = 'ycmtest',
+                             contents = [ 'hidden' ] * 10,
+                             number = 2 )
+  buffers = [ current_buffer, hidden_buffer ]
+
+  for current in buffers:
+    with MockVimBuffers( buffers, [ current ] ):
+      ycm.OnFileReadyToParse()
+
+  with patch( 'ycm.vimsupport.SetLocationListForWindow',
+              new_callable = ExtendedMock ) as set_location_list_for_window:
+    with MockVimBuffers( buffers, [ current_buffer ] ):
+      ycm.UpdateWithNewDiagnosticsForFile( '/hidden',
+                                           [ Diagnostic( '/hidden' ) ] )
+      ycm.UpdateWithNewDiagnosticsForFile( '/not_open',
+                                           [ Diagnostic( '/not_open' ) ] )
+    set_location_list_for_window.assert_not_called()
+
+    # The diagnostics are shown as soon as the buffer is visited.
+    with patch( 'ycm.client.event_notification.EventNotification.'
+                'PostDataToHandlerAsync' ):
+      with MockVimBuffers( buffers, [ hidden_buffer ] ):
+        ycm.OnBufferVisit()
+    set_location_list_for_window.assert_has_exact_calls( [
+      call( 1, [ {
+        'lnum': 2,
+        'col': 1,
+        'bufnr': 2,
+        'valid': 1,
+        'type': 'E',
+        'text': 'error text in /hidden',
+      } ] )
+    ] )
+
+  with patch( 'ycm.vimsupport.SetQuickFixList' ) as set_quickfix_list:
+    with patch( 'ycm.vimsupport.OpenQuickFixList' ) as open_quickfix_list:
+      with patch( 'ycm.vimsupport.GetCachedBufferNumberForFilename',
+                  side_effect = lambda filepath, *args, **kwargs:
+                    { '/hidden': 2, '/not_open': 3 }[ filepath ] ):
+        ycm.ShowProjectDiagnostics()
+  set_quickfix_list.assert_called_once()
+  assert_that( set_quickfix_list.call_args[ 0 ][ 0 ], contains_exactly(
+    has_entries( { 'bufnr': 2, 'text': 'error text in /hidden' } ),
+    has_entries( { 'bufnr': 3, 'text': 'error text in /not_open' } )
+  ) )
+  open_quickfix_list.assert_called_once_with( focus = True )
+
+
 @YouCompleteMeInstance()
 def YouCompleteMe_OnPeriodicTick_ServerNotRunning_test( ycm ):
   with patch.object( ycm, 'IsServerAlive', return_value = False ):
@@ -1294,3 +1411,70 @@ def YouCompleteMe_ShouldResendFileParseRequest_NoParseRequest_test( ycm ):
   current_buffer = VimBuffer( 'current_buffer' )
   with MockVimBuffers( [ current_buffer ], [ current_buffer ] ):
     assert_that( ycm.ShouldResendFileParseRequest(), equal_to( False ) )
+
+
+def _SawCompletionsRequest( column_num, words, start_column = 1 ):
+  request = MagicMock( request_data = { 'line_num': 1,
+                                        'column_num': column_num,
+                                        'filepath': '/foo' } )
+  response = { 'completion_start_column': start_column,
+               'completions': [ { 'word': word } for word in words ] }
+  return request, response
+
+
+def SawCompletions_WordsAwayFromOffset_test():
+  saw_completions = SawCompletions()
+  request, response = _SawCompletionsRequest( 2, [ 'a', 'b', 'c' ] )
+  assert_that( list( saw_completions.saw( request, response ) ), empty() )
+  saw_completions.see( request, response )
+
+  # 'c' was never shown in the top two.
+  request, response = _SawCompletionsRequest( 3, [ 'c' ] )
+  saw = saw_completions.saw( request, response )
+  assert_that( 'a', is_not( is_in( saw ) ) )
+  assert_that( 'c', is_not( is_in( saw ) ) )
+
+  request, response = _SawCompletionsRequest( 4, [ 'c' ] )
+  saw = saw_completions.saw( request, response )
+  assert_that( list( saw ), contains_exactly( 'a', 'b' ) )
+
+  # A different completion start column starts over.
+  request, response = _SawCompletionsRequest( 4, [ 'c' ], start_column = 2 )
+  assert_that( list( saw_completions.saw( request, response ) ), empty() )
+  saw_completions.see( request, response )
+  request, response = _SawCompletionsRequest( 7, [], start_column = 2 )
+  saw = saw_completions.saw( request, response )
+  assert_that( list( saw ), contains_exactly( 'c' ) )
+
+
+def SawCompletions_LongSessionInSamePosition_IsBounded_test():
+  saw_completions = SawCompletions( max_size = 10 )
+  for column_num in range( 2, 10002 ):
+    request, response = _SawCompletionsRequest(
+      column_num,
+      [ f'word{ column_num }', f'other{ column_num }', 'never_seen' ] )
+    saw_completions.see( request, response )
+
+  assert_that( len( saw_completions._saw ), equal_to( 10 ) )
+  request, response = _SawCompletionsRequest( 10005, [] )
+  saw = saw_completions.saw( request, response )
+  # Only the most recent words are remembered.
+  assert_that( 'word10001', is_in( saw ) )
+  assert_that( 'other9997', is_in( saw ) )
+  assert_that( 'word9995', is_not( is_in( saw ) ) )
+  assert_that( 'never_seen', is_not( is_in( saw ) ) )
+  assert_that( len( saw ), equal_to( 10 ) )
+
+
+def SawCompletions_LongSessionInSamePosition_KeepsFirstOffset_test():
+  saw_completions = SawCompletions()
+  for column_num in range( 2, 1002 ):
+    request, response = _SawCompletionsRequest( column_num, [ 'a', 'b' ] )
+    saw_completions.see( request, response )
+
+  # The words were first seen at offset 1.
+  request, response = _SawCompletionsRequest( 3, [] )
+  assert_that( list( saw_completions.saw( request, response ) ), empty() )
+  request, response = _SawCompletionsRequest( 4, [] )
+  assert_that( list( saw_completions.saw( request, response ) ),
+               contains_exactly( 'a', 'b' ) )
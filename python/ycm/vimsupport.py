@@ -51,18 +51,16 @@ SIGN_BUFFER_ID_INITIAL_VALUE = 100000000
 # This holds the next sign's id to assign for each buffer.
 SIGN_ID_FOR_BUFFER = defaultdict( lambda: SIGN_BUFFER_ID_INITIAL_VALUE )
 
-# The ":sign place" command ouputs each sign on one line in the format
-#
-#    line=<line> id=<id> name=<name> priority=<priority>
-#
-# where the words "line", "id", "name", and "priority" are localized. On
-# versions older than Vim 8.1.0614, the "priority" property doesn't exist and
-# the output is
-#
-#    line=<line> id=<id> name=<name>
-#
-SIGN_PLACE_REGEX = re.compile(
-  r"^.*=(?P<line>\d+).*=(?P<id>\d+).*=(?P<name>Ycm\w+)" )
+# Buffer numbers by filename, as given to GetCachedBufferNumberForFilename.
+BUFFER_NUMBER_FOR_FILENAME = {}
+
+# Signs placed by YCM belong to this group so that they never conflict with the
+# signs of other plugins.
+SIGN_GROUP = 'ycm_signs'
+
+# Title of the location lists of diagnostics. These lists are replaced when the
+# diagnostics change instead of adding new lists to the stack of the window.
+LOCATION_LIST_TITLE = 'YcmDiags'
 
 NO_COMPLETIONS = {
   'line': -1,
@@ -185,6 +183,25 @@ def GetBufferNumberForFilename( filename, create_buffer_if_needed = False ):
              f"{ int( create_buffer_if_needed ) })" )
 
 
+def GetCachedBufferNumberForFilename( filename,
+                                      create_buffer_if_needed = False ):
+  """Same as GetBufferNumberForFilename but the result is kept until a buffer
+  is created, wiped out or renamed or the working directory changes (see
+  ClearBufferNumberCache). Diagnostics refer to files by name, many times
+  over."""
+  buffer_number = BUFFER_NUMBER_FOR_FILENAME.get( filename )
+  if buffer_number is None or ( buffer_number == -1 and
+                                create_buffer_if_needed ):
+    buffer_number = GetBufferNumberForFilename( filename,
+                                                create_buffer_if_needed )
+    BUFFER_NUMBER_FOR_FILENAME[ filename ] = buffer_number
+  return buffer_number
+
+
+def ClearBufferNumberCache():
+  BUFFER_NUMBER_FOR_FILENAME.clear()
+
+
 def GetCurrentBufferFilepath():
   return GetBufferFilepath( vim.current.buffer )
 
@@ -212,6 +229,33 @@ def GetBufferChangedTick( bufnr ):
   return GetIntValue( f'getbufvar({ bufnr }, "changedtick")' )
 
 
+@memoize
+def VimSupportsListeners():
+  return VimHasFunctions( 'listener_add', 'listener_flush', 'listener_remove' )
+
+
+def TrackLineChanges( bufnr ):
+  """Start recording the lines changed in the buffer |bufnr|. Return the id of
+  the listener."""
+  return GetIntValue( f'youcompleteme#TrackLineChanges( { bufnr } )' )
+
+
+def PopLineChanges( bufnr ):
+  """Return the changes recorded for the buffer |bufnr| since the last call, in
+  the order they were made, as [ lnum, end, added ] lists (see ":h
+  listener_add"). Return None if there were too many changes to record them
+  all."""
+  changes = vim.eval( f'youcompleteme#PopLineChanges( { bufnr } )' )
+  if not isinstance( changes, list ):
+    return None
+  return [ [ int( value ) for value in change ] for change in changes ]
+
+
+def StopTrackingLineChanges( bufnr, listener_id ):
+  vim.eval( f'youcompleteme#StopTrackingLineChanges( { bufnr }, '
+            f'{ listener_id } )' )
+
+
 def CaptureVimCommand( command ):
   vim.command( 'redir => b:ycm_command' )
   vim.command( f'silent! { command }' )
@@ -221,27 +265,18 @@ def CaptureVimCommand( command ):
   return output
 
 
+# Signs and matches are compared by these keys, regardless of their id.
+DiagnosticSignKey = namedtuple( 'DiagnosticSignKey',
+                                [ 'line', 'name', 'buffer_number' ] )
+DiagnosticMatchKey = namedtuple( 'DiagnosticMatchKey',
+                                 [ 'group', 'positions' ] )
+
+
 class DiagnosticSign( namedtuple( 'DiagnosticSign',
                                   [ 'id', 'line', 'name', 'buffer_number' ] ) ):
-  # We want two signs that have different ids but the same location to compare
-  # equal. ID doesn't matter.
-  def __eq__( self, other ):
-    return ( self.line == other.line and
-             self.name == other.name and
-             self.buffer_number == other.buffer_number )
-
-
-def GetSignsInBuffer( buffer_number ):
-  sign_output = CaptureVimCommand( f'sign place buffer={ buffer_number }' )
-  signs = []
-  for line in sign_output.split( '\n' ):
-    match = SIGN_PLACE_REGEX.search( line )
-    if match:
-      signs.append( DiagnosticSign( int( match.group( 'id' ) ),
-                                    int( match.group( 'line' ) ),
-                                    match.group( 'name' ),
-                                    buffer_number ) )
-  return signs
+  @property
+  def key( self ):
+    return DiagnosticSignKey( self.line, self.name, self.buffer_number )
 
 
 def CreateSign( line, name, buffer_number ):
@@ -250,70 +285,226 @@ def CreateSign( line, name, buffer_number ):
   return DiagnosticSign( sign_id, line, name, buffer_number )
 
 
-def UnplaceSign( sign ):
-  vim.command( f'sign unplace { sign.id } buffer={ sign.buffer_number }' )
+def PlaceSigns( signs ):
+  """Place |signs| in a single call to Vim."""
+  if not signs:
+    return
+  vim_signs = json.dumps( [ { 'group': SIGN_GROUP,
+                              'id': sign.id,
+                              'name': sign.name,
+                              'buffer': sign.buffer_number,
+                              'lnum': sign.line } for sign in signs ] )
+  vim.eval( f'sign_placelist({ vim_signs })' )
+
+
+def UnplaceSigns( signs ):
+  """Unplace |signs| in a single call to Vim."""
+  if not signs:
+    return
+  vim_signs = json.dumps( [ { 'group': SIGN_GROUP,
+                              'id': sign.id,
+                              'buffer': sign.buffer_number }
+                            for sign in signs ] )
+  vim.eval( f'sign_unplacelist({ vim_signs })' )
 
 
-def PlaceSign( sign ):
-  vim.command( f'sign place { sign.id } name={ sign.name } '
-               f'line={ sign.line } buffer={ sign.buffer_number }' )
+def UnplaceAllSignsInBuffer( buffer_number ):
+  vim.eval( f"sign_unplace('{ SIGN_GROUP }', {{'buffer': { buffer_number }}})" )
+
+
+# Older Vim versions accept at most 8 positions per matchaddpos() call.
+MATCHADDPOS_MAX_POSITIONS = 8
 
 
 class DiagnosticMatch( namedtuple( 'DiagnosticMatch',
-                                   [ 'id', 'group', 'pattern' ] ) ):
-  def __eq__( self, other ):
-    return ( self.group == other.group and
-             self.pattern == other.pattern )
+                                   [ 'id', 'group', 'positions' ] ) ):
+  @property
+  def key( self ):
+    return DiagnosticMatchKey( self.group, self.positions )
 
 
 def GetDiagnosticMatchesInCurrentWindow():
   vim_matches = vim.eval( 'getmatches()' )
   return [ DiagnosticMatch( match[ 'id' ],
                             match[ 'group' ],
-                            match[ 'pattern' ] )
+                            _GetMatchPositions( match ) )
            for match in vim_matches if match[ 'group' ].startswith( 'Ycm' ) ]
 
 
-def AddDiagnosticMatch( match ):
-  # TODO: Use matchaddpos which is much faster given that we always are using a
-  # location rather than an actual pattern
-  return GetIntValue( f"matchadd('{ match.group }', '{ match.pattern }', -1)" )
-
-
-def RemoveDiagnosticMatch( match ):
-  return GetIntValue( f"matchdelete({ match.id })" )
-
-
-def GetDiagnosticMatchPattern( line_num,
-                               column_num,
-                               line_end_num = None,
-                               column_end_num = None ):
+def _GetMatchPositions( match ):
+  # Matches added with matchadd() have no positions.
+  positions = []
+  for index in range( 1, MATCHADDPOS_MAX_POSITIONS + 1 ):
+    position = match.get( f'pos{ index }' )
+    if position is None:
+      break
+    positions.append( tuple( int( number ) for number in position ) )
+  return tuple( positions )
+
+
+def AddDiagnosticMatches( matches ):
+  """Add |matches| to the current window in a single call to Vim. Return their
+  ids."""
+  if not matches:
+    return []
+  vim_matches = json.dumps( [ [ match.group,
+                                [ list( position )
+                                  for position in match.positions ] ]
+                              for match in matches ] )
+  return vim.eval(
+    f"map({ vim_matches }, 'matchaddpos(v:val[0], v:val[1], -1)')" )
+
+
+def RemoveDiagnosticMatches( matches ):
+  """Remove |matches| from the current window in a single call to Vim."""
+  if not matches:
+    return
+  match_ids = json.dumps( [ int( match.id ) for match in matches ] )
+  vim.eval( f"map({ match_ids }, 'matchdelete(v:val)')" )
+
+
+def GetDiagnosticMatchPositions( line_num,
+                                 column_num,
+                                 line_end_num = None,
+                                 column_end_num = None ):
+  """Return the positions, as accepted by matchaddpos(), that highlight the
+  range from |line_num| and |column_num| to |line_end_num| and
+  |column_end_num| (excluded) or the character at |line_num| and |column_num|.
+  Numbers are 1-based byte offsets. A range over several lines is split in the
+  end of its first line, the lines in between and the start of its last
+  line."""
   line_num, column_num = LineAndColumnNumbersClamped( line_num, column_num )
   column_num = max( column_num, 1 )
 
   if line_end_num is None or column_end_num is None:
-    return f'\\%{ line_num }l\\%{ column_num }c'
+    return [ ( line_num, column_num, 1 ) ]
 
   # -1 and then +1 to account for column end not included in the range.
   line_end_num, column_end_num = LineAndColumnNumbersClamped(
       line_end_num, column_end_num - 1 )
   column_end_num = max( column_end_num + 1, 1 )
 
-  return ( f'\\%{ line_num }l\\%{ column_num }c\\_.\\{{-}}'
-           f'\\%{ line_end_num }l\\%{ column_end_num }c' )
+  if line_end_num <= line_num:
+    return [ ( line_num, column_num, max( column_end_num - column_num, 1 ) ) ]
+
+  # Like a pattern matching the end of the line, highlight one character past
+  # the last one.
+  line_length = len( ToBytes( vim.current.buffer[ line_num - 1 ] ) )
+  positions = [ ( line_num, column_num, line_length - column_num + 2 ) ]
+  positions.extend( ( line, ) for line in range( line_num + 1, line_end_num ) )
+  if column_end_num > 1:
+    positions.append( ( line_end_num, 1, column_end_num - 1 ) )
+  return positions
 
 
 # Clamps the line and column numbers so that they are not past the contents of
 # the buffer. Numbers are 1-based byte offsets.
 def LineAndColumnNumbersClamped( line_num, column_num ):
-  line_num = max( min( line_num, len( vim.current.buffer ) ), 1 )
+  return _LineAndColumnNumbersClampedInBuffer( vim.current.buffer,
+                                               line_num,
+                                               column_num )
+
+
+def _LineAndColumnNumbersClampedInBuffer( buffer_object, line_num, column_num ):
+  line_num = max( min( line_num, len( buffer_object ) ), 1 )
 
   # Vim buffers are a list of Unicode objects on Python 3.
-  max_column = len( ToBytes( vim.current.buffer[ line_num - 1 ] ) )
+  max_column = len( ToBytes( buffer_object[ line_num - 1 ] ) )
 
   return line_num, min( column_num, max_column )
 
 
+@memoize
+def VimSupportsTextProperties():
+  return VimHasFunctions( 'prop_add', 'prop_remove', 'prop_type_add' )
+
+
+@memoize
+def VimSupportsWinScrolled():
+  return GetBoolValue( "exists( '##WinScrolled' )" )
+
+
+def GetVisibleLineRanges( bufnr ):
+  """Return the first and last lines displayed by each window of the current
+  tab page showing buffer |bufnr|."""
+  return [ ( int( first ), int( last ) ) for first, last in vim.eval(
+    'map( filter( getwininfo(), '
+    f'"v:val.tabnr == tabpagenr() && v:val.bufnr == { bufnr }" ), '
+    '"[ line( \'w0\', v:val.winid ), line( \'w$\', v:val.winid ) ]" )' ) ]
+
+
+DiagnosticProperty = namedtuple( 'DiagnosticProperty',
+                                 [ 'type', 'line', 'column',
+                                   'line_end', 'column_end' ] )
+
+
+def GetDiagnosticPropertyRange( buffer_object,
+                                line_num,
+                                column_num,
+                                line_end_num = None,
+                                column_end_num = None ):
+  """Return the range, as accepted by prop_add(), of the text from |line_num|
+  and |column_num| to |line_end_num| and |column_end_num| (excluded) in
+  |buffer_object| or of the character at |line_num| and |column_num|. Numbers
+  are 1-based byte offsets."""
+  line_num, column_num = _LineAndColumnNumbersClampedInBuffer(
+    buffer_object, line_num, column_num )
+  column_num = max( column_num, 1 )
+
+  if line_end_num is None or column_end_num is None:
+    line_end_num, column_end_num = line_num, column_num + 1
+  else:
+    # -1 and then +1 to account for column end not included in the range.
+    line_end_num, column_end_num = _LineAndColumnNumbersClampedInBuffer(
+      buffer_object, line_end_num, column_end_num - 1 )
+    column_end_num = max( column_end_num + 1, 1 )
+
+  if ( line_end_num, column_end_num ) <= ( line_num, column_num ):
+    line_end_num, column_end_num = line_num, column_num + 1
+
+  # A property can't end past the character following the end of the line.
+  max_column_end = len( ToBytes( buffer_object[ line_end_num - 1 ] ) ) + 1
+  return ( line_num,
+           column_num,
+           line_end_num,
+           min( column_end_num, max_column_end ) )
+
+
+def RemoveDiagnosticProperties( buffer_number, property_types ):
+  """Remove the properties of |property_types| from the buffer
+  |buffer_number| in a single call to Vim."""
+  vim.eval( f"map({ json.dumps( property_types ) }, "
+            f"'prop_remove({{\"type\": v:val, \"bufnr\": { buffer_number }, "
+            f"\"all\": 1}})')" )
+
+
+def AddDiagnosticProperties( buffer_number, properties ):
+  """Add |properties| to the buffer |buffer_number| in a single call to Vim.
+  prop_add_list() adds all the properties of a type at once when it's
+  available."""
+  if not properties:
+    return
+
+  if VimHasFunction( 'prop_add_list' ):
+    ranges_by_type = defaultdict( list )
+    for prop in properties:
+      ranges_by_type[ prop.type ].append( list( prop[ 1 : ] ) )
+    vim.eval( f"map({ json.dumps( list( ranges_by_type.items() ) ) }, "
+              f"'prop_add_list({{\"type\": v:val[0], "
+              f"\"bufnr\": { buffer_number }}}, v:val[1])')" )
+    return
+
+  vim_properties = json.dumps( [ [ prop.line,
+                                   prop.column,
+                                   { 'type': prop.type,
+                                     'bufnr': buffer_number,
+                                     'end_lnum': prop.line_end,
+                                     'end_col': prop.column_end } ]
+                                 for prop in properties ] )
+  vim.eval( f"map({ vim_properties }, "
+            "'prop_add(v:val[0], v:val[1], v:val[2])')" )
+
+
 def SetLocationList( diagnostics ):
   """Set the location list for the current window to the supplied diagnostics"""
   SetLocationListForWindow( 0, diagnostics )
@@ -328,15 +519,39 @@ def GetWindowsForBufferNumber( buffer_number ):
 
 def SetLocationListsForBuffer( buffer_number, diagnostics ):
   """Populate location lists for all windows containing the buffer with number
-  |buffer_number|. See SetLocationListForWindow for format of diagnostics."""
-  for window in GetWindowsForBufferNumber( buffer_number ):
-    SetLocationListForWindow( window.number, diagnostics )
+  |buffer_number|, unless they already contain these diagnostics. See
+  SetLocationListForWindow for format of diagnostics."""
+  windows = GetWindowsForBufferNumber( buffer_number )
+  if not windows:
+    return
+
+  # The fingerprint of the diagnostics is the context of the list.
+  fingerprint = _LocationListFingerprint( diagnostics )
+  window_numbers = [ window.number for window in windows ]
+  contexts = vim.eval(
+    f'map( { json.dumps( window_numbers ) }, '
+    '"getloclist( v:val, { \'context\': 0 } ).context" )' )
+  for window_number, context in zip( window_numbers, contexts ):
+    if context != fingerprint:
+      SetLocationListForWindow( window_number, diagnostics )
 
 
 def SetLocationListForWindow( window_number, diagnostics ):
   """Populate the location list with diagnostics. Diagnostics should be in
-  qflist format; see ":h setqflist" for details."""
-  vim.eval( f'setloclist( { window_number }, { json.dumps( diagnostics ) } )' )
+  qflist format; see ":h setqflist" for details. The list set by a previous
+  call is replaced, if it is still the current list of the window, so that
+  the stack of location lists doesn't grow on each update."""
+  what = json.dumps( { 'title': LOCATION_LIST_TITLE,
+                       'context': _LocationListFingerprint( diagnostics ),
+                       'items': diagnostics } )
+  vim.eval( f'setloclist( { window_number }, [], '
+            f'getloclist( { window_number }, {{ "title": 0 }} ).title ==# '
+            f'"{ LOCATION_LIST_TITLE }" ? "r" : " ", { what } )' )
+
+
+def _LocationListFingerprint( diagnostics ):
+  return str( hash( tuple( tuple( diagnostic.items() )
+                           for diagnostic in diagnostics ) ) )
 
 
 def OpenLocationList( focus = False, autoclose = False ):
@@ -425,8 +640,8 @@ def ConvertDiagnosticsToQfList( diagnostics ):
       text += ' (FixIt available)'
 
     return {
-      'bufnr' : GetBufferNumberForFilename( location[ 'filepath' ],
-                                            create_buffer_if_needed = True ),
+      'bufnr' : GetCachedBufferNumberForFilename(
+        location[ 'filepath' ], create_buffer_if_needed = True ),
       'lnum'  : line_num,
       'col'   : location[ 'column_num' ],
       'text'  : text,
@@ -618,11 +833,7 @@ def PostVimMessage( message, warning = True, truncate = False ):
   message = ToUnicode( message )
 
   if truncate:
-    vim_width = GetIntValue( '&columns' )
-
-    message = message.replace( '\n', ' ' )
-    if len( message ) >= vim_width:
-      message = message[ : vim_width - 4 ] + '...'
+    message = TruncateMessage( message, GetIntValue( '&columns' ) )
 
     old_ruler = GetIntValue( '&ruler' )
     old_showcmd = GetIntValue( '&showcmd' )
@@ -640,6 +851,27 @@ def PostVimMessage( message, warning = True, truncate = False ):
     vim.command( 'echohl None' )
 
 
+def TruncateMessage( message, width ):
+  """Return |message| on a single line, truncated so that it can be echoed
+  without a hit-enter prompt by a Vim that is |width| columns wide."""
+  message = ToUnicode( message ).replace( '\n', ' ' )
+  if len( message ) >= width:
+    message = message[ : width - 4 ] + '...'
+  return message
+
+
+def EchoTruncatedMessage( message ):
+  """Echo |message|, already truncated by TruncateMessage, in a single command.
+  Like PostVimMessage with |truncate| set, the ruler and showcmd options are
+  disabled while echoing. Their values are restored by the executed string,
+  which is built before the options are changed."""
+  message = EscapeForVim( EscapeForVim( message ) )
+  vim.command( "redraw | "
+               "execute 'set noruler noshowcmd | "
+               f"echo ''{ message }'' | "
+               "let &ruler = ' . &ruler . ' | let &showcmd = ' . &showcmd" )
+
+
 def PresentDialog( message, choices, default_choice_index = 0 ):
   """Presents the user with a dialog where a choice can be made.
   This will be a dialog for gvim users or a question in the message buffer
@@ -26,22 +26,28 @@ import vim
 from subprocess import PIPE
 from time import time
 from tempfile import NamedTemporaryFile
-from ycm import base, paths, signature_help, vimsupport
+from ycm import base, capabilities, paths, signature_help, vimsupport
 from ycm.buffer import BufferDict
+from ycm.pending_diagnostics import PendingDiagnostics
+from ycm.project_diagnostics import ProjectDiagnostics
 from ycmd import utils
 from ycmd.request_wrap import RequestWrap
 from ycm.omni_completer import OmniCompleter
+from ycm.identifier_completer import IdentifierCompleter
 from ycm import syntax_parse
 from ycm.client.ycmd_keepalive import YcmdKeepalive
 from ycm.client.base_request import BaseRequest, BuildRequestData
-from ycm.client.completer_available_request import SendCompleterAvailableRequest
+from ycm.client.completer_available_request import (
+  CompleterAvailableByFileType )
 from ycm.client.command_request import ( SendCommandRequest,
                                          SendCommandRequestAsync,
                                          GetCommandResponse )
 from ycm.client.completion_request import CompletionRequest
-from ycm.client.resolve_completion_request import ResolveCompletionItem
+from ycm.client.resolve_completion_request import ( ResolveCompletionItem,
+                                                    ResolvedCompletions )
 from ycm.client.signature_help_request import ( SignatureHelpRequest,
-                                                SigHelpAvailableByFileType )
+                                                SigHelpAvailableByFileType,
+                                                TrackedSignatureHelpRequest )
 from ycm.client.debug_info_request import ( SendDebugInfoRequest,
                                             FormatDebugInfoResponse )
 from ycm.client.omni_completion_request import OmniCompletionRequest
@@ -90,6 +96,9 @@ NO_PYTHON2_SUPPORT_MESSAGE = (
   'YCM has dropped support for python2. '
   'You need to recompile it with python3 instead.' )
 SERVER_IDLE_SUICIDE_SECONDS = 1800  # 30 minutes
+# Explicit commands wait this long for the server to say if it has a semantic
+# completer for the current filetype.
+CAPABILITY_WAIT_TIMEOUT = 5
 CLIENT_LOGFILE_FORMAT = 'ycm_'
 SERVER_LOGFILE_FORMAT = 'ycmd_{port}_{std}_'
 
@@ -126,21 +135,38 @@ class YouCompleteMe:
     self._saw_completions  = SawCompletions()
 
   def _SetUpServer( self ):
-    self._available_completers = {}
+    self._completer_available_requests = CompleterAvailableByFileType()
     self._user_notified_about_crash = False
     self._filetypes_with_keywords_loaded = set()
     self._server_is_ready_with_cache = False
     self._message_poll_requests = {}
 
     self._latest_completion_request = None
+    self._latest_completions = []
+    self._resolved_completions = ResolvedCompletions()
     self._latest_signature_help_request = None
     self._signature_help_available_requests = SigHelpAvailableByFileType()
     self._latest_command_reqeust = None
 
     self._signature_help_state = signature_help.SignatureHelpState()
+    self._active_parameter_tracker = signature_help.ActiveParameterTracker()
     self._user_options = base.GetUserOptions( self._default_options )
     self._omnicomp = OmniCompleter( self._user_options )
+    self._identifier_completer = IdentifierCompleter( self._user_options )
+    if self._user_options[ 'cache_server_capabilities' ]:
+      self._capabilities = capabilities.CapabilityCache(
+        capabilities.CAPABILITIES_FILE,
+        capabilities.ServerKey( self._user_options ) )
+    else:
+      self._capabilities = capabilities.CapabilityCache()
+    if self._user_options[ 'cache_syntax_keywords' ]:
+      self._syntax_keywords = syntax_parse.SyntaxKeywordsCache(
+        syntax_parse.SYNTAX_KEYWORDS_FILE )
+    else:
+      self._syntax_keywords = syntax_parse.SyntaxKeywordsCache()
     self._buffers = BufferDict( self._user_options )
+    self._project_diagnostics = ProjectDiagnostics()
+    self._pending_diagnostics = PendingDiagnostics()
 
     self._SetLogLevel()
 
@@ -241,6 +267,10 @@ class YouCompleteMe:
     if not self._server_is_ready_with_cache and self.IsServerAlive():
       self._server_is_ready_with_cache = BaseRequest().GetDataFromHandler(
           'ready', display_message = False )
+      if self._server_is_ready_with_cache:
+        # The server takes over identifier completion.
+        self._identifier_completer.Reset()
+        self._PrefetchCapabilities()
     return self._server_is_ready_with_cache
 
 
@@ -295,12 +325,23 @@ class YouCompleteMe:
   def SendCompletionRequest( self, force_semantic = False ):
     request_data = BuildRequestData()
     request_data[ 'force_semantic' ] = force_semantic
+    self._resolved_completions.DropPending()
+
+    if not self.IsServerReady():
+      # The server is still starting. Complete identifiers from the visible
+      # buffers in the meantime.
+      self._latest_completion_request = OmniCompletionRequest(
+          self._identifier_completer, RequestWrap( request_data ) )
+      self._latest_completion_request.Start()
+      return
 
     if not self.NativeFiletypeCompletionUsable():
       wrapped_request_data = RequestWrap( request_data )
       if self._omnicomp.ShouldUseNow( wrapped_request_data ):
         self._latest_completion_request = OmniCompletionRequest(
-            self._omnicomp, wrapped_request_data )
+            self._omnicomp,
+            wrapped_request_data,
+            deferred = self._omnicomp.ShouldDefer( wrapped_request_data ) )
         self._latest_completion_request.Start()
         return
 
@@ -314,13 +355,28 @@ class YouCompleteMe:
                  self._latest_completion_request.Done() )
 
 
+  def CompletionRequestDeferred( self ):
+    return ( isinstance( self._latest_completion_request,
+                         OmniCompletionRequest ) and
+             not self._latest_completion_request.Done() )
+
+
+  def RunDeferredCompletionRequest( self ):
+    if self.CompletionRequestDeferred():
+      self._latest_completion_request.Run()
+
+
   def GetCompletionResponse( self ):
     response = self._latest_completion_request.Response()
+    if 'completions' not in response:
+      # A resolve response.
+      return response
     response[ 'completions' ] = self._SortByUsage(
         response[ 'completions' ],
         self._saw_completions.saw(self._latest_completion_request, response))
     self._saw_completions.see(self._latest_completion_request, response)
     response[ 'completions' ] = self._prependNumber(response['completions'])
+    self._latest_completions = response[ 'completions' ]
     return response
 
   def _SortByUsage( self, completions, saw_words ):
@@ -387,27 +443,36 @@ class YouCompleteMe:
       return False
 
     for filetype in vimsupport.CurrentFiletypes():
-      if not self.SignatureHelpAvailableRequestComplete( filetype ):
-        continue
-
-      sig_help_available = self._signature_help_available_requests[
-          filetype ].Response()
-      if sig_help_available == 'NO':
-        continue
-
-      if sig_help_available == 'PENDING':
-        # Send another /signature_help_available request
-        self._signature_help_available_requests[ filetype ].Start( filetype )
+      self._PollCapability( capabilities.SIGNATURE_HELP,
+                            filetype,
+                            self._signature_help_available_requests )
+      if not self._capabilities.Available( capabilities.SIGNATURE_HELP,
+                                           filetype ):
         continue
 
       if not self._latest_completion_request:
         return False
 
+      line_num = vimsupport.CurrentLineAndColumn()[ 0 ]
+      line, column = vimsupport.CurrentLineContentsAndCodepointColumn()
+      if ( self._signature_help_state.state ==
+           signature_help.SignatureHelpState.ACTIVE ):
+        # Only the active parameter is likely to have changed since the last
+        # response.
+        signature_info = self._active_parameter_tracker.Track( line_num,
+                                                               line,
+                                                               column )
+        if signature_info is not None:
+          self._latest_signature_help_request = TrackedSignatureHelpRequest(
+            signature_info )
+          return True
+
       request_data = self._latest_completion_request.request_data.copy()
       request_data[ 'signature_help_state' ] = self._signature_help_state.state
 
       self._AddExtraConfDataIfNeeded( request_data )
 
+      self._active_parameter_tracker.OnRequest( line_num, line, column )
       self._latest_signature_help_request = SignatureHelpRequest( request_data )
       self._latest_signature_help_request.Start()
       return True
@@ -421,11 +486,14 @@ class YouCompleteMe:
 
 
   def GetSignatureHelpResponse( self ):
-    return self._latest_signature_help_request.Response()
+    signature_info = self._latest_signature_help_request.Response()
+    self._active_parameter_tracker.OnResponse( signature_info )
+    return signature_info
 
 
   def ClearSignatureHelp( self ):
     self.UpdateSignatureHelp( {} )
+    self._active_parameter_tracker.Reset()
     if self._latest_signature_help_request:
       self._latest_signature_help_request.Reset()
 
@@ -521,17 +589,52 @@ class YouCompleteMe:
 
 
   def FiletypeCompleterExistsForFiletype( self, filetype ):
-    try:
-      return self._available_completers[ filetype ]
-    except KeyError:
-      pass
+    # This never blocks. Until the server answers, the semantic completer is
+    # assumed to exist if it did in a previous session with the same server.
+    self._PollCapability( capabilities.SEMANTIC_COMPLETION,
+                          filetype,
+                          self._completer_available_requests )
+    return self._capabilities.Available( capabilities.SEMANTIC_COMPLETION,
+                                         filetype )
+
+
+  def NativeFiletypeCompletionPending( self ):
+    """Whether the server has yet to say if it has a semantic completer for
+    the current filetypes."""
+    filetypes = vimsupport.CurrentFiletypes()
+    for filetype in filetypes:
+      self.FiletypeCompleterExistsForFiletype( filetype )
+    return any( self._capabilities.State( capabilities.SEMANTIC_COMPLETION,
+                                          filetype ) == capabilities.PENDING
+                for filetype in filetypes )
 
-    exists_completer = SendCompleterAvailableRequest( filetype )
-    if exists_completer is None:
-      return False
 
-    self._available_completers[ filetype ] = exists_completer
-    return exists_completer
+  def _WaitForNativeFiletypeCompletion( self ):
+    """Block until the server said if it has a semantic completer for the
+    current filetypes. Only for commands that block anyway."""
+    for filetype in vimsupport.CurrentFiletypes():
+      self.FiletypeCompleterExistsForFiletype( filetype )
+      if ( self._capabilities.State( capabilities.SEMANTIC_COMPLETION,
+                                     filetype ) == capabilities.PENDING ):
+        self._completer_available_requests[ filetype ].Wait(
+          CAPABILITY_WAIT_TIMEOUT )
+        self.FiletypeCompleterExistsForFiletype( filetype )
+
+
+  def _PollCapability( self, capability, filetype, requests ):
+    """Advance the state of |capability| for |filetype|, sending the request
+    in |requests| once the server is ready, and return it."""
+    if not self.IsServerReady():
+      return self._capabilities.State( capability, filetype )
+    return self._capabilities.Poll( capability, filetype, requests )
+
+
+  def _PrefetchCapabilities( self ):
+    for filetype in vimsupport.CurrentFiletypes():
+      self.FiletypeCompleterExistsForFiletype( filetype )
+      self._PollCapability( capabilities.SIGNATURE_HELP,
+                            filetype,
+                            self._signature_help_available_requests )
 
 
   def NativeFiletypeCompletionAvailable( self ):
@@ -554,34 +657,29 @@ class YouCompleteMe:
     if not self._user_options[ 'show_diagnostics_ui' ]:
       return
 
-    bufnr = vimsupport.GetBufferNumberForFilename( filepath )
+    bufnr = vimsupport.GetCachedBufferNumberForFilename( filepath )
     if bufnr in self._buffers and vimsupport.BufferIsVisible( bufnr ):
       # Note: We only update location lists, etc. for visible buffers, because
       # otherwise we default to using the current location list and the results
       # are that non-visible buffer errors clobber visible ones.
       self._buffers[ bufnr ].UpdateWithNewDiagnostics( diagnostics )
+      self._project_diagnostics.Update( filepath, diagnostics )
     else:
       # The project contains errors in file "filepath", but that file is not
-      # open in any buffer. This happens for Language Server Protocol-based
-      # completers, as they return diagnostics for the entire "project"
-      # asynchronously (rather than per-file in the response to the parse
-      # request).
-      #
-      # There are a number of possible approaches for
-      # this, but for now we simply ignore them. Other options include:
-      # - Use the QuickFix list to report project errors?
-      # - Use a special buffer for project errors
-      # - Put them in the location list of whatever the "current" buffer is
-      # - Store them in case the buffer is opened later
-      # - add a :YcmProjectDiags command
-      # - Add them to errror/warning _counts_ but not any actual location list
-      #   or other
-      # - etc.
-      #
-      # However, none of those options are great, and lead to their own
-      # complexities. So for now, we just ignore these diagnostics for files not
-      # open in any buffer.
-      pass
+      # visible. This happens for Language Server Protocol-based completers, as
+      # they return diagnostics for the entire "project" asynchronously (rather
+      # than per-file in the response to the parse request). They are stored
+      # until the file is visited and can be listed with :YcmProjectDiags.
+      self._project_diagnostics.Update( filepath, diagnostics, pending = True )
+
+
+  def _ApplyProjectDiagnostics( self ):
+    """Show the diagnostics received while the current buffer was not visible
+    without waiting for the next parse."""
+    diagnostics = self._project_diagnostics.PopPending(
+      vimsupport.GetCurrentBufferFilepath() )
+    if diagnostics is not None:
+      self.CurrentBuffer().UpdateWithNewDiagnostics( diagnostics )
 
 
   def OnPeriodicTick( self ):
@@ -597,15 +695,24 @@ class YouCompleteMe:
         if filetype not in self._message_poll_requests:
           self._message_poll_requests[ filetype ] = MessagesPoll( w.buffer )
 
-        # None means don't poll this filetype
+        # None means don't poll this filetype. Diagnostics are coalesced and
+        # applied below, once no new ones are received for the file.
         if ( self._message_poll_requests[ filetype ] and
-             not self._message_poll_requests[ filetype ].Poll( self ) ):
+             not self._message_poll_requests[ filetype ].Poll(
+               self._pending_diagnostics ) ):
           self._message_poll_requests[ filetype ] = None
 
-    return any( self._message_poll_requests.values() )
+    for filepath, diagnostics in self._pending_diagnostics.PopIdle():
+      self.UpdateWithNewDiagnosticsForFile( filepath, diagnostics )
+
+    return ( any( self._message_poll_requests.values() ) or
+             len( self._pending_diagnostics ) > 0 )
 
 
   def OnFileReadyToParse( self ):
+    # The buffer changed outside of insert mode or another buffer was entered.
+    self._omnicomp.InvalidateCache()
+
     if not self.IsServerAlive():
       self.NotifyUserIfServerCrashed()
       return
@@ -622,6 +729,8 @@ class YouCompleteMe:
 
 
   def OnFileSave( self, saved_buffer_number ):
+    # Saving may change the details of the completion items.
+    self._resolved_completions.Clear()
     SendEventNotificationAsync( 'FileSave', saved_buffer_number )
 
 
@@ -633,6 +742,17 @@ class YouCompleteMe:
     self.CurrentBuffer().UpdateMatches()
 
 
+  def OnWinScrolled( self ):
+    for bufnr in { window.buffer.number for window in vim.windows }:
+      if bufnr in self._buffers:
+        self._buffers[ bufnr ].OnWinScrolled()
+
+
+  def OnVimResized( self ):
+    for buffer_object in self._buffers.values():
+      buffer_object.OnVimResized()
+
+
   def OnFileTypeSet( self ):
     buffer_number = vimsupport.GetCurrentBufferNumber()
     filetypes = vimsupport.CurrentFiletypes()
@@ -641,10 +761,10 @@ class YouCompleteMe:
 
 
   def OnBufferVisit( self ):
-    for filetype in vimsupport.CurrentFiletypes():
-      # Send the signature help available request for these filetypes if we need
-      # to (as a side effect of checking if it is complete)
-      self.SignatureHelpAvailableRequestComplete( filetype, True )
+    # Ask the server about the capabilities for these filetypes in advance so
+    # that they are known when completing.
+    self._PrefetchCapabilities()
+    self._ApplyProjectDiagnostics()
 
     extra_data = {}
     self._AddUltiSnipsDataIfNeeded( extra_data )
@@ -817,7 +937,10 @@ class YouCompleteMe:
     if not completion_request:
       return False
 
-    request  = ResolveCompletionItem( completion_request, item )
+    request  = ResolveCompletionItem( completion_request,
+                                      item,
+                                      self._latest_completions,
+                                      self._resolved_completions )
     if not request:
       return False
 
@@ -833,14 +956,21 @@ class YouCompleteMe:
     return self.CurrentBuffer().GetWarningCount()
 
 
+  def GetDiagnosticCounts( self ):
+    return self.CurrentBuffer().GetDiagnosticCounts()
+
+
   def _PopulateLocationListWithLatestDiagnostics( self ):
     return self.CurrentBuffer().PopulateLocationList()
 
 
   def FileParseRequestReady( self ):
     # Return True if server is not ready yet, to stop repeating check timer.
+    # Keep checking while the server has yet to say if it has a semantic
+    # completer, otherwise the response would be ignored.
     return ( not self.IsServerReady() or
-             self.CurrentBuffer().FileParseRequestReady() )
+             ( self.CurrentBuffer().FileParseRequestReady() and
+               not self.NativeFiletypeCompletionPending() ) )
 
 
   def HandleFileParseRequest( self, block = False ):
@@ -848,9 +978,9 @@ class YouCompleteMe:
       return
 
     current_buffer = self.CurrentBuffer()
-    # Order is important here:
-    # FileParseRequestReady has a low cost, while
-    # NativeFiletypeCompletionUsable is a blocking server request
+    # NativeFiletypeCompletionUsable doesn't block: the availability of the
+    # semantic completer is requested in the background (see
+    # FileParseRequestReady).
     if ( not current_buffer.IsResponseHandled() and
          current_buffer.FileParseRequestReady( block ) and
          self.NativeFiletypeCompletionUsable() ):
@@ -895,6 +1025,21 @@ class YouCompleteMe:
       debug_info += ( 'Server logfiles:\n'
                       f'  { self._server_stdout }\n'
                       f'  { self._server_stderr }' )
+    omnifunc_stats = self._omnicomp.Stats()
+    if not debug_info.endswith( '\n' ):
+      debug_info += '\n'
+    debug_info += ( 'Omnifunc cache: '
+                    f'{ omnifunc_stats[ "cache_hits" ] } hits, '
+                    f'{ omnifunc_stats[ "cache_misses" ] } misses' )
+    for filetype, timings in omnifunc_stats[ 'timings' ].items():
+      debug_info += ( f'\nOmnifunc timings for { filetype }: '
+                      f'{ timings[ "calls" ] } calls, '
+                      f'average { timings[ "average_ms" ]:.1f} ms, '
+                      f'max { timings[ "max_ms" ]:.1f} ms, '
+                      f'{ timings[ "over_budget" ] } over budget, '
+                      f'{ timings[ "mode" ] }' )
+    debug_info += ( '\nDiagnostics updates dropped by coalescing: '
+                    f'{ self._pending_diagnostics.dropped }' )
     return debug_info
 
 
@@ -983,6 +1128,7 @@ class YouCompleteMe:
 
 
   def ForceCompileAndDiagnostics( self ):
+    self._WaitForNativeFiletypeCompletion()
     if not self.NativeFiletypeCompletionUsable():
       vimsupport.PostVimMessage(
           'Native filetype completion not supported for current file, '
@@ -1010,6 +1156,21 @@ class YouCompleteMe:
       vimsupport.OpenLocationList( focus = True )
 
 
+  def ShowProjectDiagnostics( self, kind = None ):
+    """Fill the quickfix list with the diagnostics of the project received
+    from the server, of severity |kind| if set, and open it."""
+    diagnostics = self._project_diagnostics.Diagnostics(
+      kind.upper() if kind else None )
+    if not diagnostics:
+      vimsupport.PostVimMessage( 'No warnings or errors detected.',
+                                 warning = False )
+      return
+
+    vimsupport.SetQuickFixList(
+      vimsupport.ConvertDiagnosticsToQfList( diagnostics ) )
+    vimsupport.OpenQuickFixList( focus = True )
+
+
   def _AddSyntaxDataIfNeeded( self, extra_data ):
     if not self._user_options[ 'seed_identifiers_with_syntax' ]:
       return
@@ -1020,7 +1181,7 @@ class YouCompleteMe:
     if self.IsServerReady():
       self._filetypes_with_keywords_loaded.add( filetype )
     extra_data[ 'syntax_keywords' ] = list(
-       syntax_parse.SyntaxKeywordsForCurrentBuffer() )
+       self._syntax_keywords.KeywordsForCurrentBuffer( filetype ) )
 
 
   def _AddTagsFilesIfNeeded( self, extra_data ):
@@ -1070,34 +1231,72 @@ class YouCompleteMe:
     ]
 
 
+class SawWords(object):
+    """ words seen more than one column away from offset. membership is O(1)
+    and computed on lookup, so nothing is rebuilt per completion response """
+    __slots__ = ('_saw', '_offset')
+
+    def __init__(self, saw, offset):
+        self._saw = saw
+        self._offset = offset
+
+    def __contains__(self, word):
+        word_offset = self._saw.get(word)
+        return word_offset is not None and abs(word_offset - self._offset) > 1
+
+    def __iter__(self):
+        return (word for word in self._saw if word in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return any(True for _ in self)
+
+
+NO_SAW_WORDS = SawWords({}, 0)
+
+
 class SawCompletions(object):
     """ mark completion saw by user but not selected. it can use to calculate score """
-    def __init__(self):
+    # only the top 2 words of each response are recorded, so this is plenty
+    # for a completion position, while keeping long sessions bounded.
+    MAX_SAW_WORDS = 64
+
+    def __init__(self, max_size = MAX_SAW_WORDS):
         self._pos = None
-        self._saw = dict()
+        self._saw = dict() # word => offset, in insertion order
+        self._max_size = max_size
 
     def saw(self, request, response):
         """ return saw completions """
         d = request.request_data
         pos = (d['line_num'], response['completion_start_column'], d['filepath'])
         # only compare the filter, not new request
-        if pos != self._pos: return frozenset()
+        if pos != self._pos: return NO_SAW_WORDS
         # decide saw by the appear offset. currently it's word_offset - offset
         offset = d['column_num'] - pos[1]
         # logging.getLogger( 'ycm' ).info("saw %d (%s)", d['column_num'], pos) # type: logging.Logger
-        return frozenset( word for (word, word_offset) in self._saw.items() if abs(word_offset - offset) > 1 )
+        return SawWords(self._saw, offset)
 
     def see(self, request, response):
         """ record saw completions """
         d = request.request_data
         pos = (d['line_num'], response['completion_start_column'], d['filepath'])
         if self._pos != pos:
+            # start over at a new position
             self._saw = dict()
-            self._pos = pos;
+            self._pos = pos
 
         offset = d['column_num'] - pos[1]
+        saw = self._saw
         for i in response['completions'][:2]:
-            self._saw.setdefault(i['word'], offset)
+            word = i['word']
+            if word in saw: continue
+            if len(saw) >= self._max_size:
+                # forget the oldest word
+                del saw[next(iter(saw))]
+            saw[word] = offset
         # logging.getLogger( 'ycm' ).info("see %s", self._saw) # type: logging.Logger
 
 class UsedCompletions(object):